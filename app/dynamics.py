@@ -0,0 +1,274 @@
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .simulation_engine import ConfigurationA_2Ex1S
+
+# Holdup volumes (m³) and the strip electrolyte flow (m³/h).
+HOLDUP_DEFAULTS = {
+    'mixer_volume': 40.0,
+    'settler_organic_volume': 150.0,
+    'settler_aqueous_volume': 250.0,
+    'organic_tank_volume': 200.0,
+    'electrolyte_flow': 100.0,
+}
+
+# Copper-carrying streams held up in each stage, with their phase. PLS_Cu and LO
+# are the feed grade and loaded organic as they reach the next stage.
+STAGE_STREAMS = (
+    ('E1', 'C1Cuor_Ext', 'organic'),
+    ('E1', 'raffinate_E1', 'aqueous'),
+    ('E1', 'PLS_Cu', 'aqueous'),
+    ('E1', 'LO', 'organic'),
+    ('E2', 'C2Cuor_Ext', 'organic'),
+    ('E2', 'raffinate_E2', 'aqueous'),
+    ('E2', 'PLS_Cu', 'aqueous'),
+    ('E2', 'LO', 'organic'),
+    ('S1', 'C1Cuor_Str', 'organic'),
+)
+
+TRANSIENT_OUTPUTS = (
+    'LO',
+    'C1Cuor_Ext',
+    'raffinate_E1',
+    'C2Cuor_Ext',
+    'raffinate_E2',
+    'O_A_str',
+    'C1Cuor_Str',
+    'extraction_recovery',
+    'loaded_organic',
+    'net_transfer',
+)
+
+DEFAULT_SETTLER_CELLS = 4
+
+
+def _apply(P: np.ndarray, X: np.ndarray) -> np.ndarray:
+    """
+    Applies the per-chain matrices P to the state X (chains, positions, scenarios):
+    P is (chains, positions, positions), or has a leading scenario axis.
+    """
+    if P.ndim == 3:
+        return np.matmul(P, X)
+    return np.einsum('skij,kjs->kis', P, X)
+
+
+class MixerSettlerDynamics:
+    """
+    Dynamic model of the Configuration A circuit (E1, E2, S1) with phase holdups.
+
+    Each stage has a well-mixed mixer and, per phase, a settler of `cells`
+    well-mixed cells in series (close to plug flow). Residence times are the
+    holdup volumes over the phase flows (PLS_flow, PLS_flow * O_A_Ext, the
+    electrolyte flow); the organic tank sets how fast the loaded organic LO
+    follows a change of v/v% or SR. Every mixer relaxes towards the
+    ConfigurationA_2Ex1S stage relation of what currently enters it, so with
+    constant inputs the model settles exactly at ConfigurationA_2Ex1S.simulate.
+
+    The state is one chain per stream in STAGE_STREAMS (mixer, then settler
+    cells), after the organic tank, with one column per scenario: all inputs
+    may be arrays, so many scenarios are integrated at once.
+    """
+
+    def __init__(self, config: ConfigurationA_2Ex1S, holdups: Optional[Mapping[str, float]] = None,
+                 cells: int = DEFAULT_SETTLER_CELLS):
+        unknown = set(holdups or {}) - set(HOLDUP_DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown holdup setting {', '.join(sorted(unknown))}.")
+        if cells < 1:
+            raise ValueError("A settler needs at least one cell.")
+        self.config = config
+        self.holdups = dict(HOLDUP_DEFAULTS, **(holdups or {}))
+        self.cells = cells
+        # Chain 0 is the organic tank, a single well-mixed volume (its other positions stay 0)
+        self.chains = ('LO',) + tuple(f'{stage}.{stream}' for stage, stream, _ in STAGE_STREAMS)
+        self._outlets = np.array([0] + [cells] * len(STAGE_STREAMS))
+
+    def residence_times(self, inputs: Mapping) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Residence times (h) of the mixer (the tank for LO) and of one settler
+        cell of every chain, each of shape (chains, scenarios). The tank has no
+        cells (infinite residence time).
+        """
+        h = self.holdups
+        aqueous = np.asarray(inputs['PLS_flow'], dtype=float)
+        organic = aqueous * inputs['O_A_Ext']
+        mixers = [h['organic_tank_volume'] / organic]
+        settlers = [np.full_like(organic, np.inf)]
+        for stage, _, phase in STAGE_STREAMS:
+            mixers.append(h['mixer_volume'] / (organic + (h['electrolyte_flow'] if stage == 'S1' else aqueous)))
+            settlers.append((h['settler_organic_volume'] / organic if phase == 'organic'
+                             else h['settler_aqueous_volume'] / aqueous) / self.cells)
+        return np.stack(np.broadcast_arrays(*mixers)), np.stack(np.broadcast_arrays(*settlers))
+
+    def _stages(self, X: np.ndarray, inputs: Mapping) -> Dict[str, np.ndarray]:
+        """
+        Mixer targets for state X, keyed by chain name, plus O_A_str. The stage
+        relations are those of ConfigurationA_2Ex1S.calculate_C1Cuor_Ext and
+        the following methods, with the four extraction equilibria of E1 and E2
+        evaluated in one call.
+        """
+        sim = self.config.sim
+        out = dict(zip(self.chains, X[np.arange(len(self.chains)), self._outlets]))
+        mixer = dict(zip(self.chains, X[:, 0]))
+        PLS_Ac, v_v_percent, O_A_Ext = inputs['PLS_Ac'], inputs['v_v_percent'], inputs['O_A_Ext']
+        Mef1e, Mef2e = inputs['Mef1e'], inputs['Mef2e']
+        # E1 is fed with the PLS and the organic from the tank, E2 with what
+        # leaves the E1 settler, S1 with the loaded organic from the E2 settler.
+        PLS_Cu, LO = inputs['PLS_Cu'], out['LO']
+        PLS_E2, LO_E2, C1Cuor_Ext = out['E1.PLS_Cu'], out['E1.LO'], out['E1.C1Cuor_Ext']
+        LO_S1, C2Cuor_Ext = out['E2.LO'], out['E2.C2Cuor_Ext']
+
+        C_eq = sim.extraction_equilibrium_array(
+            np.stack([PLS_Cu, PLS_Cu, PLS_E2 - (C1Cuor_Ext - LO_E2) * O_A_Ext, out['E1.raffinate_E1']]),
+            PLS_Ac, v_v_percent,
+            np.stack([LO, mixer['E1.C1Cuor_Ext'], LO_E2, mixer['E2.C2Cuor_Ext']]))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            copper_to_strip = LO_S1 - C2Cuor_Ext
+            O_A_str = np.where(copper_to_strip != 0, (inputs['AD_Cu'] - inputs['SP_Cu']) / copper_to_strip, 1.0)
+        S_eq = sim.stripping_equilibrium_array(inputs['SP_Cu'], inputs['SP_Ac'], v_v_percent, LO_S1)
+
+        return {
+            'LO': sim.calculate_AML_array(v_v_percent) * inputs['SR'] / 100,
+            'E1.C1Cuor_Ext': LO + C_eq[0] * Mef1e / 100 / O_A_Ext,
+            'E1.raffinate_E1': C_eq[1] * Mef1e / 100 + PLS_Cu * (1 - Mef1e / 100),
+            'E1.PLS_Cu': PLS_Cu,
+            'E1.LO': LO,
+            'E2.C2Cuor_Ext': C1Cuor_Ext + C_eq[2] * Mef2e / 100 / O_A_Ext,
+            'E2.raffinate_E2': C_eq[3] * Mef2e / 100 + out['E1.raffinate_E1'] * (1 - Mef2e / 100),
+            'E2.PLS_Cu': PLS_E2,
+            'E2.LO': LO_E2,
+            'S1.C1Cuor_Str': LO_S1 - S_eq * inputs['Mef1s'] / 100 * O_A_str,
+            'O_A_str': O_A_str,
+        }
+
+    def targets(self, X: np.ndarray, inputs: Mapping) -> np.ndarray:
+        """
+        The values the tank and the mixers relax towards, shape (chains, scenarios).
+        """
+        stages = self._stages(X, inputs)
+        return np.stack([stages[name] for name in self.chains])
+
+    def steady_state(self, inputs: Mapping, scenarios: int) -> np.ndarray:
+        """
+        State at steady state for the given inputs. Every position only depends
+        on positions before it, in its chain or in earlier chains, so one pass
+        per position of the state reaches it exactly.
+        """
+        X = np.zeros((len(self.chains), self.cells + 1, scenarios))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for _ in range(X.shape[0] * X.shape[1]):
+                X[:, 0] = self.targets(X, inputs)
+                X[1:, 1:] = X[1:, :-1].copy()
+        return X
+
+    def propagators(self, inputs: Mapping, dt: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Along a chain the holdups are linear, dx/dt = M x + b f with f the
+        mixer target, so the ETD2RK step is exact for them. Returns per chain
+        e^(M dt), dt phi1(M dt) b and dt phi2(M dt) b, all from the exponential
+        of one augmented matrix. The vectors have a trailing scenario axis
+        (of length 1 when every scenario has the same residence times), the
+        matrices then a leading one.
+        """
+        from scipy.linalg import expm
+
+        m, L = len(self.chains), self.cells + 1
+        mixers, settlers = self.residence_times(inputs)
+        rates, index = np.unique(np.concatenate([1 / mixers, 1 / settlers]).T, axis=0, return_inverse=True)
+        mixer_rates, cell_rates = rates[:, :m] * dt, rates[:, m:, None] * dt
+
+        cells = np.arange(1, L)
+        W = np.zeros((len(rates), m, L + 2, L + 2))
+        W[:, :, 0, 0] = -mixer_rates
+        W[:, :, cells, cells] = -cell_rates
+        W[:, :, cells, cells - 1] = cell_rates
+        W[:, :, 0, L] = mixer_rates
+        W[:, :, L, L + 1] = 1
+        E = expm(W)
+
+        Phi, phi1, phi2 = E[..., :L, :L], E[..., :L, L], E[..., :L, L + 1]
+        if len(rates) == 1:
+            return Phi[0], phi1[0][..., None], phi2[0][..., None]
+        index = index.ravel()
+        return Phi[index], np.moveaxis(phi1[index], 0, -1), np.moveaxis(phi2[index], 0, -1)
+
+    def outputs(self, X: np.ndarray, inputs: Mapping) -> Dict[str, np.ndarray]:
+        """
+        Stage outlet values (settler outlets) of state X.
+        """
+        sim = self.config.sim
+        out = dict(zip(self.chains, X[np.arange(len(self.chains)), self._outlets]))
+        values = {
+            'LO': out['LO'],
+            'C1Cuor_Ext': out['E1.C1Cuor_Ext'],
+            'raffinate_E1': out['E1.raffinate_E1'],
+            'C2Cuor_Ext': out['E2.C2Cuor_Ext'],
+            'raffinate_E2': out['E2.raffinate_E2'],
+            'O_A_str': self._stages(X, inputs)['O_A_str'],
+            'C1Cuor_Str': out['S1.C1Cuor_Str'],
+        }
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values['extraction_recovery'] = sim.extraction_recovery(out['E2.PLS_Cu'], values['raffinate_E2'])
+            values['loaded_organic'] = values['C2Cuor_Ext']
+            values['net_transfer'] = sim.net_transfer(values['C2Cuor_Ext'], values['C1Cuor_Str'],
+                                                      inputs['v_v_percent'])
+        return values
+
+    def run(self, params: Mapping, steps: List[Tuple[float, str, object]], duration: float,
+            dt: float = 5 / 60, points: int = 289) -> Dict:
+        """
+        Integrates the circuit from the steady state of `params` (designer
+        parameters plus v_v_percent) over `duration` hours with step dt (h).
+        steps are (time in h, input name, new value) changes, applied at the
+        first time step at or after their time; values may be arrays, one per
+        scenario. Returns 'time' (h) and one (points, scenarios) array per
+        output in TRANSIENT_OUTPUTS, decimated to `points` evenly spaced samples.
+
+        The integrator is the second-order exponential Runge-Kutta method
+        (ETD2RK, see propagators): exact for the holdups and stable for any
+        step, so dt only has to resolve how fast the stage equilibria change.
+        """
+        for _, name, _ in steps:
+            if name not in params:
+                raise ValueError(f"Unknown input '{name}'.")
+        steps = sorted(steps, key=lambda change: change[0])
+        scenarios = int(np.broadcast(*([np.empty(1)] + [np.asarray(value) for value in params.values()]
+                                       + [np.asarray(value) for _, _, value in steps])).size)
+
+        # Whole steps between samples: dt is shortened to fit if needed
+        points = max(points, 2)
+        every = max(int(np.ceil(duration / dt / (points - 1) - 1e-9)), 1)
+        n_steps = every * (points - 1)
+        dt = duration / n_steps
+
+        # One value per scenario throughout, which is also what SimSXCu's compiled kernels take
+        inputs = {name: np.full(scenarios, value, dtype=float) for name, value in params.items()}
+        X = self.steady_state(inputs, scenarios)
+        times, records = [], {name: [] for name in TRANSIENT_OUTPUTS}
+        pending = 0
+        propagators = None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for n in range(n_steps + 1):
+                t = n * dt
+                while pending < len(steps) and steps[pending][0] <= t + 1e-9:
+                    _, name, value = steps[pending]
+                    inputs[name] = np.full(scenarios, value, dtype=float)
+                    pending += 1
+                    propagators = None
+                if n % every == 0:
+                    times.append(t)
+                    for name, value in self.outputs(X, inputs).items():
+                        records[name].append(value)
+                if n == n_steps:
+                    break
+
+                if propagators is None:
+                    Phi, phi1, phi2 = propagators = self.propagators(inputs, dt)
+                F0 = self.targets(X, inputs)
+                A = _apply(Phi, X) + phi1 * F0[:, None]
+                X = A + phi2 * (self.targets(A, inputs) - F0)[:, None]
+
+        result = {'time': np.array(times)}
+        result.update({name: np.stack(values) for name, values in records.items()})
+        return result
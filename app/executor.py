@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+
+class SolverPoolSaturated(Exception):
+    """Raised when the pool already holds its maximum number of pending solves."""
+
+
+class SolverPoolTimeout(Exception):
+    """Raised when a solve does not finish within the per-request timeout."""
+
+
+class SolverPoolUnavailable(Exception):
+    """Raised when the worker processes died and the pool cannot accept work."""
+
+
+class SolverPool:
+    """
+    Runs CPU-bound solver work off the asyncio event loop.
+
+    Jobs go to a process pool so solves scale across cores. The number of
+    pending jobs is bounded, and every job has a timeout, so callers can shed
+    load instead of queueing without limit. A job stays pending until it has
+    finished, even when its caller timed out. With max_workers=0 jobs run in a
+    thread pool, which keeps the event loop free but stays in-process.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 timeout: float = 30.0):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.max_pending = max_pending if max_pending is not None else 4 * max(self.max_workers, 1)
+        self.timeout = timeout
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> "SolverPool":
+        """
+        Builds a pool from SIMSXCU_SOLVER_WORKERS, SIMSXCU_SOLVER_MAX_PENDING
+        and SIMSXCU_SOLVER_TIMEOUT (seconds).
+        """
+        workers = os.environ.get('SIMSXCU_SOLVER_WORKERS')
+        max_pending = os.environ.get('SIMSXCU_SOLVER_MAX_PENDING')
+        return cls(
+            max_workers=int(workers) if workers else None,
+            max_pending=int(max_pending) if max_pending else None,
+            timeout=float(os.environ.get('SIMSXCU_SOLVER_TIMEOUT', 30.0))
+        )
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = (ThreadPoolExecutor() if self.max_workers == 0
+                              else ProcessPoolExecutor(max_workers=self.max_workers))
+        return self._executor
+
+    def _release(self, _future: Future):
+        # Runs in the executor's thread once the job is done or cancelled
+        with self._pending_lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None):
+        """
+        Runs fn(*args) in the pool and returns its result.
+        fn and its arguments must be picklable when worker processes are used.
+        """
+        with self._pending_lock:
+            if self.pending >= self.max_pending:
+                raise SolverPoolSaturated(f"Solver queue is full ({self.max_pending} pending solves).")
+            self.pending += 1
+
+        try:
+            job = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool as e:
+            self._executor = None
+            self._release(None)
+            raise SolverPoolUnavailable(str(e))
+        except Exception:
+            self._release(None)
+            raise
+        # Released when the worker is done with it, not when the caller stops waiting
+        job.add_done_callback(self._release)
+        try:
+            # A timeout cancels the job if it has not started yet; a running job
+            # keeps its worker (and stays pending) until it finishes.
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise SolverPoolTimeout(f"Solve did not finish within {timeout or self.timeout:g} s.")
+        except BrokenProcessPool as e:
+            self._executor = None
+            raise SolverPoolUnavailable(str(e))
+
+    def shutdown(self):
+        """
+        Stops the worker processes without waiting for queued jobs.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,437 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .simulation_engine import SimSXCu
+
+# Stream sources a stage can draw from besides other stages
+PLS = 'PLS'     # pregnant leach solution (aqueous feed)
+SP = 'SP'       # spent electrolyte (strip aqueous feed)
+BO = 'BO'       # barren organic, i.e. organic leaving the last strip stage
+
+
+class Stage:
+    """
+    One mixer-settler in a flowsheet.
+
+    aqueous_in / organic_in list (source, fraction) pairs: the stage receives
+    `fraction` of each source stream. A source is PLS, SP, BO or the name of
+    another stage, meaning that stage's aqueous (for aqueous_in) or organic
+    (for organic_in) outlet.
+    """
+
+    __slots__ = ('name', 'kind', 'aqueous_in', 'organic_in', 'efficiency')
+
+    def __init__(self, name: str, kind: str, aqueous_in: List[Tuple[str, float]],
+                 organic_in: List[Tuple[str, float]], efficiency: str):
+        self.name = name
+        self.kind = kind
+        self.aqueous_in = aqueous_in
+        self.organic_in = organic_in
+        self.efficiency = efficiency
+
+
+def _extraction_stages(trains: List[List[str]], organic_paths: List[List[str]],
+                       organic_merge: Optional[Tuple[str, List[str]]] = None) -> List[Stage]:
+    """
+    Builds extraction stages from aqueous trains and organic paths.
+
+    Each train lists the stages the aqueous passes in order; the PLS is split
+    equally between trains. Each organic path lists stages in the order the
+    organic meets them; the barren organic is split equally between paths.
+    organic_merge = (stage, sources) overrides that stage's organic feed, which
+    is how paths rejoin (e.g. an organic bypass).
+    """
+    aqueous = {}
+    for train in trains:
+        for position, name in enumerate(train):
+            aqueous[name] = [(PLS, 1.0 / len(trains))] if position == 0 else [(train[position - 1], 1.0)]
+
+    organic = {}
+    for path in organic_paths:
+        for position, name in enumerate(path):
+            organic[name] = [(BO, 1.0 / len(organic_paths))] if position == 0 else [(path[position - 1], 1.0)]
+    if organic_merge is not None:
+        stage, sources = organic_merge
+        organic[stage] = sources
+
+    stages = []
+    for name in aqueous:
+        efficiency = 'Mef1e' if name in ('E1', 'P1') else 'Mef2e'
+        stages.append(Stage(name, 'extraction', aqueous[name], organic[name], efficiency))
+    return stages
+
+
+def _strip_stages(n_strip: int, loaded_from: List[str]) -> List[Stage]:
+    """
+    Counter-current strip stages S1..Sn: loaded organic enters S1, spent
+    electrolyte enters Sn, advance electrolyte leaves S1.
+    """
+    stages = []
+    for number in range(1, n_strip + 1):
+        organic_in = [(source, 1.0) for source in loaded_from] if number == 1 else [(f'S{number - 1}', 1.0)]
+        aqueous_in = [(SP, 1.0)] if number == n_strip else [(f'S{number + 1}', 1.0)]
+        stages.append(Stage(f'S{number}', 'stripping', aqueous_in, organic_in, 'Mef1s'))
+    return stages
+
+
+# Extraction layouts shared by each pair of configurations (1 and 2 strip stages):
+# (aqueous trains, organic paths, organic merge, stages whose organic goes to strip)
+EXTRACTION_LAYOUTS = {
+    'AB': ([['E1', 'E2']], [['E2', 'E1']], None, ['E1']),
+    'CD': ([['E1', 'E2', 'E3']], [['E3', 'E2', 'E1']], None, ['E1']),
+    'EF': ([['E1', 'E2'], ['P1']], [['E2', 'P1', 'E1']], None, ['E1']),
+    'GH': ([['E1', 'E2'], ['P1']], [['P1', 'E2', 'E1']], None, ['E1']),
+    'IJ': ([['E1'], ['P1'], ['P2']], [['P2', 'P1', 'E1']], None, ['E1']),
+    'KL': ([['E1', 'E2'], ['P1', 'P2']], [['P2', 'E2', 'P1', 'E1']], None, ['E1']),
+    'MN': ([['E1', 'E2'], ['P1', 'P2']], [['E2', 'E1'], ['P2', 'P1']], None, ['E1', 'P1']),
+    'OP': ([['E1', 'E2'], ['P1'], ['P2']], [['E2', 'P2', 'P1', 'E1']], None, ['E1']),
+    # Half of the barren organic passes P2 -> P1, the other half bypasses it; both feed E2 -> E1
+    'QR': ([['E1', 'E2'], ['P1', 'P2']], [['P2', 'P1'], ['E2', 'E1']],
+           ('E2', [('P1', 1.0), (BO, 0.5)]), ['E1']),
+}
+
+
+def build_configuration(config_id: str) -> List[Stage]:
+    """
+    Stage list for one of the SimSXCu configurations A-R.
+    """
+    for ids, (trains, organic_paths, organic_merge, loaded_from) in EXTRACTION_LAYOUTS.items():
+        if config_id in ids and len(config_id) == 1:
+            n_strip = ids.index(config_id) + 1
+            return (_extraction_stages(trains, organic_paths, organic_merge)
+                    + _strip_stages(n_strip, loaded_from))
+    raise ValueError(f"Unknown configuration '{config_id}'.")
+
+
+class Flowsheet:
+    """
+    Data-driven steady-state model of an extraction/strip circuit.
+
+    Unknowns are the aqueous and organic outlet Cu of every stage plus the
+    strip electrolyte flow. Each stage contributes a Murphree-type efficiency
+    equation, a_out = a_in + M * (C_eq(a_in, acid, v/v%, o_out) - a_in), where
+    C_eq is the SimSXCu extraction or stripping isotherm, and a Cu mass balance
+    Qa * (a_in - a_out) = Qo * (o_out - o_in). The electrolyte flow closes the
+    advance electrolyte Cu at AD_Cu. All equations are solved simultaneously
+    by a damped Newton method vectorized over a batch of operating points.
+
+    Parameters follow DesignerParams plus v_v_percent. Any value may be an
+    array; all arrays are broadcast to one batch.
+    """
+
+    def __init__(self, sim_engine: SimSXCu, stages: List[Stage], name: str = ''):
+        self.sim = sim_engine
+        self.stages = stages
+        self.name = name
+        self.index = {stage.name: i for i, stage in enumerate(stages)}
+        self.n_stages = len(stages)
+        self.extraction = np.array([stage.kind == 'extraction' for stage in stages])
+        self.last_strip = max(i for i, stage in enumerate(stages) if stage.kind == 'stripping')
+
+        consumed_aqueous = {source for stage in stages for source, _ in stage.aqueous_in}
+        self.raffinate_stages = [i for i, stage in enumerate(stages)
+                                 if stage.kind == 'extraction' and stage.name not in consumed_aqueous]
+        self.loaded_sources = [source for source, _ in stages[self.index['S1']].organic_in]
+
+        self._flow_coefficients()
+
+    @classmethod
+    def for_configuration(cls, sim_engine: SimSXCu, config_id: str) -> 'Flowsheet':
+        return cls(sim_engine, build_configuration(config_id), sim_engine.configurations[config_id])
+
+    def _flow_coefficients(self):
+        """
+        Stage flows are linear in the three external flows. Aqueous flow of stage i
+        is aq_pls[i] * PLS_flow + aq_sp[i] * Q_electrolyte, and its organic flow is
+        org[i] * Q_organic. Solved by fixed-point propagation over the (acyclic once
+        BO is fixed) stream graph.
+        """
+        n = self.n_stages
+        aq_pls, aq_sp, org = np.zeros(n), np.zeros(n), np.zeros(n)
+        for _ in range(n + 1):
+            for i, stage in enumerate(self.stages):
+                aq_pls[i] = sum(f * (1.0 if s == PLS else 0.0 if s == SP else aq_pls[self.index[s]])
+                                for s, f in stage.aqueous_in)
+                aq_sp[i] = sum(f * (1.0 if s == SP else 0.0 if s == PLS else aq_sp[self.index[s]])
+                               for s, f in stage.aqueous_in)
+                org[i] = sum(f * (1.0 if s == BO else org[self.index[s]]) for s, f in stage.organic_in)
+        self.aq_pls, self.aq_sp, self.org = aq_pls, aq_sp, org
+
+    # --- Residuals ---
+
+    def _mix(self, sources: List[Tuple[str, float]], outlets: np.ndarray, flows: np.ndarray,
+             external: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Flow-weighted inlet concentration and total flow for a list of sources.
+        """
+        total_flow = 0.0
+        total_cu = 0.0
+        for source, fraction in sources:
+            if source in external:
+                concentration, flow = external[source]
+            else:
+                j = self.index[source]
+                concentration, flow = outlets[..., j], flows[j]
+            total_flow = total_flow + fraction * flow
+            total_cu = total_cu + fraction * flow * concentration
+        return total_cu / total_flow, total_flow
+
+    def _stage_flows(self, p: Dict, Q_el: np.ndarray):
+        Q_org = p['O_A_Ext'] * p['PLS_flow']
+        aqueous = [self.aq_pls[i] * p['PLS_flow'] + self.aq_sp[i] * Q_el for i in range(self.n_stages)]
+        organic = [self.org[i] * Q_org for i in range(self.n_stages)]
+        return aqueous, organic, Q_org
+
+    def residuals(self, x: np.ndarray, p: Dict) -> np.ndarray:
+        """
+        Residuals of all stage equations for unknowns x[..., :] =
+        [a_out (n stages), o_out (n stages), Q_electrolyte].
+        """
+        n = self.n_stages
+        a_out, o_out, Q_el = x[..., :n], x[..., n:2 * n], x[..., 2 * n]
+        aqueous, organic, Q_org = self._stage_flows(p, Q_el)
+        aq_external = {PLS: (p['PLS_Cu'], p['PLS_flow']), SP: (p['SP_Cu'], Q_el)}
+        org_external = {BO: (o_out[..., self.last_strip], Q_org)}
+
+        r = np.empty(x.shape[:-1] + (2 * n + 1,))
+        for i, stage in enumerate(self.stages):
+            a_in, Qa = self._mix(stage.aqueous_in, a_out, aqueous, aq_external)
+            o_in, Qo = self._mix(stage.organic_in, o_out, organic, org_external)
+            efficiency = p.get(f'Mef_{stage.name}', p[stage.efficiency]) / 100
+            if stage.kind == 'extraction':
+                C_eq = self.sim.extraction_equilibrium_array(a_in, p['PLS_Ac'], p['v_v_percent'], o_out[..., i])
+            else:
+                C_eq = self.sim.stripping_equilibrium_array(a_in, p['SP_Ac'], p['v_v_percent'], o_out[..., i])
+            r[..., i] = a_out[..., i] - (a_in + efficiency * (C_eq - a_in))
+            r[..., n + i] = (Qa * (a_in - a_out[..., i]) - Qo * (o_out[..., i] - o_in)) / Qa
+
+        advance, _ = self._mix([('S1', 1.0)], a_out, aqueous, aq_external)
+        r[..., 2 * n] = advance - p['AD_Cu']
+        return r
+
+    def _initial_guess(self, p: Dict, shape: Tuple[int, ...]) -> np.ndarray:
+        n = self.n_stages
+        AML = self.sim.calculate_AML_array(p['v_v_percent'])
+        Q_org = p['O_A_Ext'] * p['PLS_flow']
+        x = np.empty(shape + (2 * n + 1,))
+        x[..., :n] = np.where(self.extraction, 0.3 * np.asarray(p['PLS_Cu'])[..., None],
+                              np.asarray(p['AD_Cu'])[..., None])
+        x[..., n:2 * n] = np.where(self.extraction, 0.5, 0.2) * np.asarray(AML)[..., None]
+        x[..., 2 * n] = Q_org * 0.3 * AML / np.maximum(p['AD_Cu'] - p['SP_Cu'], 1e-6)
+        return x
+
+    # --- Newton solve ---
+
+    def solve(self, params: Dict, x0: Optional[np.ndarray] = None, tol: float = 1e-9,
+              max_iter: int = 50) -> Dict[str, np.ndarray]:
+        """
+        Steady state for every operating point in params.
+        Returns outlet concentrations per stage, product streams and a 'converged' mask.
+        """
+        shape = np.broadcast(*[np.asarray(value) for value in params.values()]).shape
+        p = {key: np.broadcast_to(np.asarray(value, dtype=float), shape) for key, value in params.items()}
+        size = 2 * self.n_stages + 1
+        x = self._initial_guess(p, shape) if x0 is None else np.array(x0, dtype=float)
+        x = x.reshape(-1, size)
+        flat = {key: value.reshape(-1) for key, value in p.items()}
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            r = self.residuals(x, flat)
+            norm = _norm(r)
+            active = ~(norm < tol)
+            for _ in range(max_iter):
+                if not active.any():
+                    break
+                idx = np.flatnonzero(active)
+                sub = {key: value[idx] for key, value in flat.items()}
+                step = self._newton_step(x[idx], r[idx], sub)
+
+                # Backtracking: halve the step for points whose residual got worse or undefined
+                scale = np.ones(len(idx))
+                trial_x = x[idx] - step
+                trial_r = self.residuals(trial_x, sub)
+                trial_norm = _norm(trial_r)
+                for _ in range(10):
+                    worse = ~(trial_norm < norm[idx])
+                    if not worse.any():
+                        break
+                    scale[worse] /= 2
+                    trial_x[worse] = x[idx][worse] - scale[worse, None] * step[worse]
+                    sub_worse = {key: value[worse] for key, value in sub.items()}
+                    trial_r[worse] = self.residuals(trial_x[worse], sub_worse)
+                    trial_norm[worse] = _norm(trial_r[worse])
+
+                improved = trial_norm < norm[idx]
+                x[idx[improved]] = trial_x[improved]
+                r[idx[improved]] = trial_r[improved]
+                norm[idx[improved]] = trial_norm[improved]
+                # Points that can no longer improve are stalled; stop iterating on them
+                active[idx[~improved]] = False
+                active &= ~(norm < tol)
+
+        return self._report(x.reshape(shape + (size,)), p, norm.reshape(shape) < tol)
+
+    def _jacobian(self, x: np.ndarray, r: np.ndarray, p: Dict) -> np.ndarray:
+        """
+        Forward-difference Jacobian of the residuals of every point, shape
+        (points, equations, unknowns), from one vectorized residual call over
+        all perturbed points.
+        """
+        size = x.shape[-1]
+        h = 1e-7 * np.maximum(np.abs(x), 1.0)
+        perturbed = x[:, None, :] + h[:, None, :] * np.eye(size)[None, :, :]
+        p_wide = {key: value[:, None] for key, value in p.items()}
+        jacobian = (self.residuals(perturbed, p_wide) - r[:, None, :]) / h[:, :, None]
+        return np.swapaxes(jacobian, 1, 2)
+
+    def _newton_step(self, x: np.ndarray, r: np.ndarray, p: Dict) -> np.ndarray:
+        """
+        Solves J dx = r for every point. Points with a singular Jacobian take
+        the least-squares step.
+        """
+        jacobian = self._jacobian(x, r, p)
+        ok = np.isfinite(jacobian).all(axis=(1, 2)) & np.isfinite(r).all(axis=1)
+        step = np.zeros_like(x)
+        if ok.any():
+            try:
+                step[ok] = np.linalg.solve(jacobian[ok], r[ok][..., None])[..., 0]
+            except np.linalg.LinAlgError:
+                # One singular Jacobian fails the stacked solve; solve point by point
+                for i in np.flatnonzero(ok):
+                    try:
+                        step[i] = np.linalg.solve(jacobian[i], r[i])
+                    except np.linalg.LinAlgError:
+                        step[i] = np.linalg.lstsq(jacobian[i], r[i], rcond=None)[0]
+        return step
+
+    def _products(self, x: np.ndarray, p: Dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Raffinate, loaded organic and stripped organic Cu of the states x.
+        """
+        n = self.n_stages
+        a_out, o_out = x[..., :n], x[..., n:2 * n]
+        aqueous, organic, _ = self._stage_flows(p, x[..., 2 * n])
+        raffinate, _ = self._mix([(self.stages[i].name, 1.0) for i in self.raffinate_stages],
+                                 a_out, aqueous, {})
+        loaded, _ = self._mix([(source, 1.0) for source in self.loaded_sources], o_out, organic, {})
+        return raffinate, loaded, o_out[..., self.last_strip]
+
+    def _report(self, x: np.ndarray, p: Dict, converged: np.ndarray) -> Dict[str, np.ndarray]:
+        n = self.n_stages
+        a_out, o_out, Q_el = x[..., :n], x[..., n:2 * n], x[..., 2 * n]
+        _, _, Q_org = self._stage_flows(p, Q_el)
+        raffinate, loaded, stripped = self._products(x, p)
+
+        report = {
+            'converged': converged,
+            'raffinate_Cu': raffinate,
+            'loaded_organic': loaded,
+            'stripped_organic': stripped,
+            'O_A_str': Q_org / Q_el,
+            'extraction_recovery': self.sim.extraction_recovery(p['PLS_Cu'], raffinate),
+            'net_transfer': self.sim.net_transfer(loaded, stripped, p['v_v_percent']),
+            'state': x,
+        }
+        for i, stage in enumerate(self.stages):
+            report[f'{stage.name}_aqueous'] = a_out[..., i]
+            report[f'{stage.name}_organic'] = o_out[..., i]
+        return report
+
+    def sensitivities(self, params: Dict, names: List[str]) -> Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]]:
+        """
+        Steady state of one operating point (scalar params) and the derivatives of
+        its raffinate_Cu, loaded_organic and stripped_organic with respect to the
+        params in `names`, one value per name (NaN unless the state converged).
+
+        At the steady state F(x, params) = 0, so dx/dparams = -J^-1 dF/dparams
+        (implicit function theorem): one Jacobian and one residual call instead
+        of a steady-state solve per parameter.
+        """
+        state = self.solve(params)
+        derivatives = {product: np.full(len(names), np.nan)
+                       for product in ('raffinate_Cu', 'loaded_organic', 'stripped_organic')}
+        if not state['converged']:
+            return state, derivatives
+
+        x = state['state'].reshape(1, -1)
+        p = {key: np.asarray(value, dtype=float).reshape(1) for key, value in params.items()}
+        h = np.array([1e-7 * max(abs(float(params[name])), 1.0) for name in names])
+        p_moved = {key: np.repeat(value, len(names)) for key, value in p.items()}
+        for k, name in enumerate(names):
+            p_moved[name][k] += h[k]
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            r = self.residuals(x, p)
+            jacobian = self._jacobian(x, r, p)[0]
+            dF = (self.residuals(np.repeat(x, len(names), axis=0), p_moved) - r) / h[:, None]
+            try:
+                dx = -np.linalg.solve(jacobian, dF.T).T
+            except np.linalg.LinAlgError:
+                return state, derivatives
+            # The products are flow-weighted means of outlet Cu, with flows that do
+            # not depend on the state, so they are linear in x: the difference is exact.
+            base = self._products(x, p)
+            moved = self._products(x + dx, p)
+        for product, value, value_moved in zip(derivatives, base, moved):
+            derivatives[product] = value_moved - value
+        return state, derivatives
+
+    # --- Solver objectives ---
+
+    def option1_residual(self, v_v_percent, params: Dict) -> np.ndarray:
+        """
+        Designer balance: loaded organic minus SR% of the AML at this v/v%.
+        Vectorized over v_v_percent and params.
+        """
+        state = self.solve(dict(params, v_v_percent=v_v_percent))
+        AML = self.sim.calculate_AML_array(v_v_percent)
+        return np.where(state['converged'], state['loaded_organic'] - AML * params['SR'] / 100, np.nan)
+
+    def option1_least_squares(self, x: List[float], params: Dict) -> Tuple[float, np.ndarray]:
+        """
+        Squared designer balance residual and its gradient with respect to x = [v/v%]
+        """
+        v_v_percent = x[0]
+        state, derivatives = self.sensitivities(dict(params, v_v_percent=v_v_percent), ['v_v_percent'])
+        AML = float(self.sim.calculate_AML_array(v_v_percent))
+        residual = float(state['loaded_organic']) - AML * params['SR'] / 100
+        # AML = 0.4108 * (v/v%)^1.1
+        gradient = derivatives['loaded_organic'] - 1.1 * AML / v_v_percent * params['SR'] / 100
+        if not (np.isfinite(residual) and np.isfinite(gradient).all()):
+            return 1e12, np.zeros(1)
+        return residual ** 2, 2 * residual * gradient
+
+    def option2_residuals(self, x: List[float], params: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Metallurgist residuals [loaded organic vs SR% of ML_plant, raffinate, stripped
+        organic] and their 3x4 Jacobian with respect to x = [v/v%, SR, Mef1e, Mef2e].
+        """
+        v_v_percent, SR, Mef1e, Mef2e = x[0], x[1], x[2], x[3]
+        state, derivatives = self.sensitivities(dict(params, v_v_percent=v_v_percent, Mef1e=Mef1e, Mef2e=Mef2e),
+                                                ['v_v_percent', 'Mef1e', 'Mef2e'])
+        residuals = np.array([
+            state['loaded_organic'] - params['ML_plant'] * SR / 100,
+            state['raffinate_Cu'] - params['raffinate_Cu_target'],
+            state['stripped_organic'] - params['stripped_organic_Cu_target'],
+        ], dtype=float)
+        # SR only enters the first residual
+        jacobian = np.array([
+            np.insert(derivatives['loaded_organic'], 1, -params['ML_plant'] / 100),
+            np.insert(derivatives['raffinate_Cu'], 1, 0.0),
+            np.insert(derivatives['stripped_organic'], 1, 0.0),
+        ])
+        return residuals, jacobian
+
+    def option2_least_squares(self, x: List[float], params: Dict) -> Tuple[float, np.ndarray]:
+        """
+        Sum of squared metallurgist residuals and its gradient
+        """
+        residuals, jacobian = self.option2_residuals(x, params)
+        if not (np.isfinite(residuals).all() and np.isfinite(jacobian).all()):
+            return 1e12, np.zeros(4)
+        return float(residuals @ residuals), 2 * residuals @ jacobian
+
+
+def _norm(r: np.ndarray) -> np.ndarray:
+    norm = np.max(np.abs(r), axis=-1)
+    return np.where(np.isfinite(norm), norm, np.inf)
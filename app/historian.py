@@ -0,0 +1,290 @@
+"""
+Rolling Option 2 parameter estimation from plant historian exports.
+
+    python -m app.historian history.csv fits.npy --window 60 --step 15
+    python -m app.historian history.parquet fits.csv --params plant.json
+
+The export is read in chunks, so memory stays bounded by one chunk plus one
+window whatever the file size. Every `step` records, v/v%, SR, Mef1e and
+Mef2e are fitted to the last `window` records (Configuration A, Option 2
+residuals of all records at once), starting from the previous window's fit;
+when that start fails, from Latin hypercube starts over the fit bounds.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .simulation_engine import CIRCUIT_FIELDS, ConfigurationA_2Ex1S, SimSXCu, SolverEngine
+
+# Historian column -> circuit parameter. Columns named after any other circuit
+# parameter (e.g. ML_plant, O_A_Ext) override the fixed value per record.
+HISTORIAN_COLUMNS = {
+    'PLS_flow': 'PLS_flow',
+    'PLS_Cu': 'PLS_Cu',
+    'PLS_Ac': 'PLS_Ac',
+    'raffinate_Cu': 'raffinate_Cu_target',
+    'stripped_organic_Cu': 'stripped_organic_Cu_target',
+}
+TIMESTAMP_COLUMN = 'timestamp'
+
+# Fitted variables, their bounds, and a first start with finite residuals at the
+# metallurgist solve's default parameters (MetallurgistParams).
+FIT_VARIABLES = ('v_v_percent', 'SR', 'Mef1e', 'Mef2e')
+FIT_BOUNDS = [(5.0, 30.0), (70.0, 100.0), (70.0, 100.0), (70.0, 100.0)]
+INITIAL_GUESS = (10.0, 90.0, 92.0, 95.0)
+# Latin hypercube starts tried, in turn, when a window's first start fails
+DEFAULT_RESTARTS = 8
+DEFAULT_PARAMS = {
+    'PLS_flow': 400.0, 'PLS_Cu': 2.5, 'PLS_Ac': 1.6, 'O_A_Ext': 1.0, 'ML_plant': 4.386,
+    'SP_Cu': 30.0, 'SP_Ac': 190.0, 'AD_Cu': 50.0, 'Mef1s': 98.0,
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_WINDOW = 60
+DEFAULT_STEP = 15
+
+RESULT_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[s]'),
+    ('first_record', np.int64),
+    ('records', np.int32),
+    ('v_v_percent', np.float64),
+    ('SR', np.float64),
+    ('Mef1e', np.float64),
+    ('Mef2e', np.float64),
+    ('rms_residual', np.float64),
+    ('iterations', np.int32),
+    ('starts', np.int32),
+    ('success', np.bool_),
+])
+
+
+def _column_map(header: List[str]) -> Dict[str, str]:
+    """
+    Maps the columns of an export to circuit parameters; raises ValueError when
+    a required column is missing.
+    """
+    mapping = {column: name for column, name in HISTORIAN_COLUMNS.items() if column in header}
+    mapping.update({column: column for column in header if column in CIRCUIT_FIELDS})
+    missing = [column for column, name in HISTORIAN_COLUMNS.items()
+               if name.endswith('_target') and name not in mapping.values()]
+    if missing:
+        raise ValueError(f"The historian export has no {', '.join(missing)} column.")
+    return mapping
+
+
+def _timestamps(values) -> np.ndarray:
+    try:
+        return np.array(values, dtype='datetime64[s]')
+    except ValueError as e:
+        raise ValueError(f"Timestamps must be ISO 8601 date-times: {e}") from None
+
+
+def _to_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return math.nan
+
+
+def read_csv_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Reads a historian CSV export and yields chunks of at most chunk_size records
+    as {circuit parameter: array, 'timestamp': datetime64 array}. Empty or
+    non-numeric cells become NaN.
+    """
+    with open(path, newline='') as handle:
+        reader = csv.reader(handle)
+        header = [column.strip() for column in next(reader)]
+        mapping = _column_map(header)
+        indices = [(header.index(column), name) for column, name in mapping.items()]
+        time_index = header.index(TIMESTAMP_COLUMN) if TIMESTAMP_COLUMN in header else None
+
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader) if row]
+            if not rows:
+                return
+            chunk = {name: np.array([_to_float(row[index]) for row in rows]) for index, name in indices}
+            if time_index is not None:
+                chunk[TIMESTAMP_COLUMN] = _timestamps([row[time_index] for row in rows])
+            yield chunk
+
+
+def read_parquet_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Parquet version of read_csv_chunks, read one record batch at a time.
+    Needs pyarrow.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Reading Parquet exports needs pyarrow, which is not installed.") from None
+
+    parquet = pq.ParquetFile(path)
+    header = parquet.schema_arrow.names
+    mapping = _column_map(header)
+    columns = list(mapping) + ([TIMESTAMP_COLUMN] if TIMESTAMP_COLUMN in header else [])
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+        chunk = {name: batch.column(column).to_numpy(zero_copy_only=False).astype(float)
+                 for column, name in mapping.items()}
+        if TIMESTAMP_COLUMN in header:
+            chunk[TIMESTAMP_COLUMN] = _timestamps(batch.column(TIMESTAMP_COLUMN).to_numpy(zero_copy_only=False))
+        yield chunk
+
+
+def read_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    read_parquet_chunks for .parquet/.pq files, read_csv_chunks otherwise.
+    """
+    if os.path.splitext(path)[1].lower() in ('.parquet', '.pq'):
+        return read_parquet_chunks(path, chunk_size)
+    return read_csv_chunks(path, chunk_size)
+
+
+def rolling_windows(chunks: Iterator[Dict[str, np.ndarray]], window: int,
+                    step: int) -> Iterator[Tuple[int, Dict[str, np.ndarray]]]:
+    """
+    Regroups chunks of records into windows of `window` consecutive records,
+    one every `step` records, and yields (index of the first record, window).
+    Only the records of windows still to come are kept between chunks.
+    """
+    if window < 1 or step < 1:
+        raise ValueError("window and step must be at least 1.")
+    buffer: Dict[str, np.ndarray] = {}
+    offset = 0  # index of the first buffered record
+    start = 0   # first record of the next window
+    for chunk in chunks:
+        buffer = {name: np.concatenate([buffer[name], values]) if name in buffer else values
+                  for name, values in chunk.items()}
+        size = len(next(iter(buffer.values())))
+        while start + window <= offset + size:
+            first = start - offset
+            yield start, {name: values[first:first + window] for name, values in buffer.items()}
+            start += step
+        keep = min(start - offset, size)
+        buffer = {name: values[keep:] for name, values in buffer.items()}
+        offset += keep
+
+
+def fit_window(config: ConfigurationA_2Ex1S, solver: SolverEngine, guess, window_params: Dict,
+               restarts: int = DEFAULT_RESTARTS, seed: Optional[int] = 0) -> Tuple[Dict, int]:
+    """
+    Fits one window from `guess`, then, while no fit has succeeded, from up to
+    `restarts` Latin hypercube starts (a start with non-finite residuals fails
+    at once). Returns the best fit, successful ones first, with the iterations
+    of every start tried, and the number of starts tried.
+    """
+    starts = [np.asarray(guess, dtype=float)]
+    if restarts > 0:
+        starts.extend(solver.latin_hypercube_starts(FIT_BOUNDS, restarts, seed))
+    fits = []
+    for start in starts:
+        fits.append(solver.solve_least_squares(config.option2_window_residuals, start, FIT_BOUNDS, window_params))
+        if fits[-1]['success'] and np.isfinite(fits[-1]['objective_value']):
+            break
+    best = min(fits, key=lambda fit: (not (fit['success'] and np.isfinite(fit['objective_value'])),
+                                      fit['objective_value'] if np.isfinite(fit['objective_value']) else np.inf))
+    return dict(best, iterations=sum(fit['iterations'] for fit in fits)), len(fits)
+
+
+def fit_windows(config: ConfigurationA_2Ex1S, windows: Iterator[Tuple[int, Dict[str, np.ndarray]]],
+                params: Optional[Dict] = None, initial_guess=INITIAL_GUESS,
+                solver: Optional[SolverEngine] = None, min_records: int = 1,
+                restarts: int = DEFAULT_RESTARTS) -> Iterator[np.ndarray]:
+    """
+    Fits v/v%, SR, Mef1e and Mef2e to each window of records and yields one
+    RESULT_DTYPE record per window. `params` holds the circuit parameters that
+    the export does not have a column for. Records with a missing value are left
+    out; windows with fewer than min_records complete records are not fitted
+    (NaN results). Each fit starts from the last successful one (initial_guess at
+    first), then from Latin hypercube starts if that fails (see fit_window).
+    """
+    solver = solver or SolverEngine()
+    fixed = dict(DEFAULT_PARAMS, **(params or {}))
+    guess = np.asarray(initial_guess, dtype=float)
+    for first_record, records in windows:
+        columns = {name: values for name, values in records.items() if name != TIMESTAMP_COLUMN}
+        complete = np.logical_and.reduce([np.isfinite(values) for values in columns.values()])
+        result = np.zeros((), dtype=RESULT_DTYPE)
+        result['timestamp'] = records[TIMESTAMP_COLUMN][-1] if TIMESTAMP_COLUMN in records else np.datetime64('NaT')
+        result['first_record'] = first_record
+        n = int(complete.sum())
+        result['records'] = n
+
+        if n < max(min_records, 1):
+            for name in FIT_VARIABLES + ('rms_residual',):
+                result[name] = np.nan
+            yield result
+            continue
+
+        window_params = dict(fixed, **{name: values[complete] for name, values in columns.items()})
+        fit, result['starts'] = fit_window(config, solver, guess, window_params, restarts)
+        for name, value in zip(FIT_VARIABLES, fit['x']):
+            result[name] = value
+        result['rms_residual'] = math.sqrt(fit['objective_value'] / (3 * n)) if fit['objective_value'] >= 0 else np.nan
+        result['iterations'] = fit['iterations']
+        result['success'] = fit['success'] and np.isfinite(fit['objective_value'])
+        if result['success']:
+            guess = np.array(fit['x'])
+        yield result
+
+
+def write_results(path: str, results: Iterator[np.ndarray]) -> int:
+    """
+    Writes the window fits as CSV (one line per window, written as they come)
+    or, for any other extension, as a NumPy .npy structured array. Returns the
+    number of windows.
+    """
+    if os.path.splitext(path)[1].lower() == '.csv':
+        count = 0
+        with open(path, 'w', newline='') as handle:
+            writer = csv.writer(handle)
+            writer.writerow(RESULT_DTYPE.names)
+            for result in results:
+                writer.writerow([str(result[name]) if name == 'timestamp' else result[name].item()
+                                 for name in RESULT_DTYPE.names])
+                count += 1
+        return count
+
+    rows = np.array(list(results), dtype=RESULT_DTYPE)
+    np.save(path, rows, allow_pickle=False)
+    return len(rows)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help='historian export (.csv, or .parquet with pyarrow installed)')
+    parser.add_argument('output', help='result file (.npy, or .csv)')
+    parser.add_argument('--window', type=int, default=DEFAULT_WINDOW, help='records per fit')
+    parser.add_argument('--step', type=int, default=DEFAULT_STEP, help='records between fits')
+    parser.add_argument('--min-records', type=int, default=None,
+                        help='complete records a window needs to be fitted (default: half the window)')
+    parser.add_argument('--restarts', type=int, default=DEFAULT_RESTARTS,
+                        help='Latin hypercube starts tried when a fit from the previous one fails')
+    parser.add_argument('--params', help='JSON file of fixed circuit parameters (ML_plant, SP_Cu, ...)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='records read at a time')
+    options = parser.parse_args(argv)
+
+    params = None
+    if options.params:
+        with open(options.params) as handle:
+            params = json.load(handle)
+    min_records = options.min_records if options.min_records is not None else max(options.window // 2, 1)
+
+    config = ConfigurationA_2Ex1S(SimSXCu())
+    try:
+        windows = rolling_windows(read_chunks(options.input, options.chunk_size), options.window, options.step)
+        count = write_results(options.output, fit_windows(config, windows, params, min_records=min_records,
+                                                               restarts=options.restarts))
+    except (OSError, RuntimeError, ValueError) as e:
+        parser.exit(1, f'error: {e}\n')
+    print(f'{count} windows written to {options.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
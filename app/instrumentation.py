@@ -0,0 +1,206 @@
+import cProfile
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Tuple
+
+from .simulation_engine import StatsCounter
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROFILERS = ('cprofile', 'pyinstrument')
+
+
+class Metrics:
+    """
+    Process-wide counters, gauges and latency histograms, rendered in the
+    Prometheus text exposition format. No client library is needed.
+    """
+
+    def __init__(self, prefix: str = 'simsxcu'):
+        self.prefix = prefix
+        self._kinds: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, list]] = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, kind: str, help_text: str):
+        """
+        Registers a metric; kind is 'counter', 'gauge' or 'histogram'.
+        """
+        self._kinds[name] = (kind, help_text)
+        if kind == 'histogram':
+            self._histograms.setdefault(name, {})
+        else:
+            self._values.setdefault(name, {})
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._values[name][tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms[name].get(key)
+            if series is None:
+                # Bucket counts, then sum and count
+                series = self._histograms[name][key] = [0] * len(LATENCY_BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in self._kinds.items():
+                full_name = f'{self.prefix}_{name}'
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} {kind}')
+                if kind != 'histogram':
+                    for labels, value in self._values[name].items():
+                        lines.append(f'{full_name}{_labels(labels)} {_number(value)}')
+                    continue
+                for labels, series in self._histograms[name].items():
+                    for bound, count in zip(LATENCY_BUCKETS, series):
+                        lines.append(f'{full_name}_bucket{_labels(labels + (("le", _number(bound)),))} {count}')
+                    lines.append(f'{full_name}_bucket{_labels(labels + (("le", "+Inf"),))} {series[-1]}')
+                    lines.append(f'{full_name}_sum{_labels(labels)} {_number(series[-2])}')
+                    lines.append(f'{full_name}_count{_labels(labels)} {series[-1]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels: Tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class PhaseTimer:
+    """
+    Accumulates wall time (seconds) per named phase of one request.
+    """
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+class SampledProfiler:
+    """
+    Decides which requests are profiled. Sampled requests run under cProfile
+    (or pyinstrument, when installed) and write their profile to directory.
+    With rate 0 (the default) the only cost is one comparison per request.
+    """
+
+    def __init__(self, rate: float = 0.0, directory: str = 'profiles', profiler: str = 'cprofile'):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler '{profiler}'. Must be one of {', '.join(PROFILERS)}.")
+        self.rate = rate
+        self.directory = directory
+        self.profiler = profiler
+
+    @classmethod
+    def from_env(cls) -> "SampledProfiler":
+        """
+        Builds a profiler from SIMSXCU_PROFILE_RATE (fraction of requests),
+        SIMSXCU_PROFILE_DIR and SIMSXCU_PROFILER ('cprofile' or 'pyinstrument').
+        """
+        return cls(
+            rate=float(os.environ.get('SIMSXCU_PROFILE_RATE', 0.0)),
+            directory=os.environ.get('SIMSXCU_PROFILE_DIR', 'profiles'),
+            profiler=os.environ.get('SIMSXCU_PROFILER', 'cprofile')
+        )
+
+    def sample(self, label: str) -> Optional[Dict]:
+        """
+        Profiling options for one request (passed to profile_call), or None.
+        """
+        if self.rate <= 0 or random.random() >= self.rate:
+            return None
+        return {'profiler': self.profiler, 'directory': self.directory, 'label': label}
+
+
+def profile_call(fn: Callable, *args, profiler: str = 'cprofile', directory: str = 'profiles',
+                 label: str = 'solve'):
+    """
+    Runs fn(*args) under a profiler and returns (result, profile path). cProfile
+    output is a .prof file (pstats / snakeviz); pyinstrument writes an HTML report.
+    Falls back to cProfile when pyinstrument is not installed.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, f'{label}-{time.strftime("%Y%m%dT%H%M%S")}-{os.getpid()}-{time.perf_counter_ns()}')
+
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            profiler = 'cprofile'
+        else:
+            sampler = Profiler()
+            sampler.start()
+            try:
+                result = fn(*args)
+            finally:
+                sampler.stop()
+            path = f'{stem}.html'
+            with open(path, 'w') as handle:
+                handle.write(sampler.output_html())
+            return result, path
+
+    tracer = cProfile.Profile()
+    try:
+        result = tracer.runcall(fn, *args)
+    finally:
+        path = f'{stem}.prof'
+        tracer.dump_stats(path)
+    return result, path
+
+
+def measure_call(fn: Callable, args: Tuple, profile: Optional[Dict] = None):
+    """
+    Runs fn(*args) and returns (result, breakdown). The breakdown holds the
+    worker wall time and every StatsCounter increment this thread made during
+    the call (other threads' calls are not included), plus the profile path
+    when profiled.
+    """
+    start = time.perf_counter()
+    with StatsCounter.record() as counts:
+        if profile:
+            result, profile_path = profile_call(fn, *args, **profile)
+        else:
+            result, profile_path = fn(*args), None
+    elapsed = time.perf_counter() - start
+
+    breakdown = {'worker_seconds': elapsed, 'counts': dict(counts)}
+    if profile_path:
+        breakdown['profile'] = profile_path
+    return result, breakdown
@@ -0,0 +1,277 @@
+"""
+Compiled kernels for the SimSXCu isotherms and the Configuration A stage chain.
+
+The functions below are scalar transcriptions of the NumPy code in
+simulation_engine, compiled with numba (`pip install numba`) into ufuncs and
+nopython functions. They perform the same floating-point operations in the
+same order, so both backends return the same values. Powers of v/v% are the
+one exception: NumPy's SIMD pow can differ from libm's in the last bit, so the
+kernels take them as inputs computed by NumPy (see v_powers).
+
+Without numba the module still imports, AVAILABLE is False and select()
+falls back to the NumPy code.
+"""
+import math
+import sys
+
+import numpy as np
+
+try:
+    from numba import njit, vectorize
+except ImportError:
+    njit = vectorize = None
+
+AVAILABLE = njit is not None
+BACKENDS = ('auto', 'numba', 'numpy')
+
+# Exponents of v/v% in the model: the closed-form isotherms use the first three
+# (extraction term1, stripping term1), their partial derivatives the next three
+# and the AML the last.
+V_EXPONENTS = np.array([-1.746, -0.646, -0.85, -2.746, -1.646, -1.85, 1.1])
+
+
+def _jit(fn):
+    return njit(cache=True, error_model='numpy')(fn) if AVAILABLE else fn
+
+
+def _ufunc(n_args: int):
+    def compile_ufunc(fn):
+        if not AVAILABLE:
+            return fn
+        return vectorize([f"float64({', '.join(['float64'] * n_args)})"], cache=True)(fn)
+    return compile_ufunc
+
+
+def v_powers(v_v_percent, count: int = len(V_EXPONENTS)) -> np.ndarray:
+    """
+    v/v% raised to the first `count` V_EXPONENTS, along a new last axis.
+    """
+    return np.asarray(v_v_percent, dtype=float)[..., None] ** V_EXPONENTS[:count]
+
+
+# --- Isotherms ---
+
+@_jit
+def _finite(value):
+    return value if math.isfinite(value) else np.nan
+
+
+@_jit
+def _quadratic_root(Cu, Ac, v_v_percent, C_org, term1):
+    inner_term = term1 * ((3.303 * v_v_percent - 3.0842 * C_org) ** 2 / C_org)
+    A = -1.299 * Ac - 2 * Cu - 0.422 * inner_term
+    discriminant = A ** 2 - 4 * (0.644 * Ac + Cu) ** 2
+    B = math.sqrt(discriminant) if discriminant >= 0 else np.nan
+    return _finite((-A - B) / 2)
+
+
+@_jit
+def _quadratic_partials(Cu, Ac, v_v_percent, C_org, term1, dterm1_dv, dterm1_dC, two):
+    u = 3.303 * v_v_percent - 3.0842 * C_org
+    term2 = u ** two / C_org
+    dterm2_dv = 2 * u * 3.303 / C_org
+    dterm2_dC = -2 * u * 3.0842 / C_org - term2 / C_org
+    inner_term = term1 * term2
+
+    A = -1.299 * Ac - 2 * Cu - 0.422 * inner_term
+    dA_dv = -0.422 * (dterm1_dv * term2 + term1 * dterm2_dv)
+    dA_dC = -0.422 * (dterm1_dC * term2 + term1 * dterm2_dC)
+
+    P = 0.644 * Ac + Cu
+    discriminant = A ** two - 4 * P ** two
+    B = math.sqrt(discriminant) if discriminant >= 0 else np.nan
+    return (_finite((-A - B) / 2),
+            _finite((2 - (A * -2 - 4 * P) / B) / 2),
+            _finite((1.299 - (A * -1.299 - 4 * P * 0.644) / B) / 2),
+            _finite((-dA_dv - A * dA_dv / B) / 2),
+            _finite((-dA_dC - A * dA_dC / B) / 2))
+
+
+@_jit
+def _extraction_term1(C_org, v_1746, v_0646):
+    return -28.511 * v_1746 * C_org + 11.711 * v_0646
+
+
+@_jit
+def _stripping_term1(v_v_percent, C_org, v_085):
+    return (4.8579 / 1000 * v_v_percent - 0.19183) * C_org + 11.365 * v_085
+
+
+@_ufunc(6)
+def extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org, v_1746, v_0646):
+    """
+    Extraction isotherm; v_1746 and v_0646 are v/v% ** -1.746 and ** -0.646.
+    """
+    return _quadratic_root(PLS_Cu, PLS_Ac, v_v_percent, C_org, _extraction_term1(C_org, v_1746, v_0646))
+
+
+@_ufunc(5)
+def stripping_equilibrium(SP_Cu, SP_Ac, v_v_percent, C_org, v_085):
+    """
+    Stripping isotherm; v_085 is v/v% ** -0.85.
+    """
+    return _quadratic_root(SP_Cu, SP_Ac, v_v_percent, C_org, _stripping_term1(v_v_percent, C_org, v_085))
+
+
+@_jit
+def _extraction_partials(PLS_Cu, PLS_Ac, v_v_percent, C_org, powers, two):
+    term1 = _extraction_term1(C_org, powers[0], powers[1])
+    dterm1_dv = (-28.511 * -1.746 * powers[3] * C_org
+                 + 11.711 * -0.646 * powers[4])
+    dterm1_dC = -28.511 * powers[0]
+    return _quadratic_partials(PLS_Cu, PLS_Ac, v_v_percent, C_org, term1, dterm1_dv, dterm1_dC, two)
+
+
+@_jit
+def _stripping_partials(SP_Cu, SP_Ac, v_v_percent, C_org, powers, two):
+    term1 = _stripping_term1(v_v_percent, C_org, powers[2])
+    dterm1_dv = 4.8579 / 1000 * C_org + 11.365 * -0.85 * powers[5]
+    dterm1_dC = 4.8579 / 1000 * v_v_percent - 0.19183
+    return _quadratic_partials(SP_Cu, SP_Ac, v_v_percent, C_org, term1, dterm1_dv, dterm1_dC, two)
+
+
+# --- Configuration A ---
+
+@_jit
+def _stage_chain(powers, PLS_Cu, PLS_Ac, O_A_Ext, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                 v_v_percent, dv, LO, dLO, Mef1e, dMef1e, Mef2e, dMef2e, with_raffinate, two):
+    """
+    ConfigurationA_2Ex1S._stage_chain_with_tangents for one operating point.
+    Returns the values and gradients of C1Cuor_Ext, C2Cuor_Ext, E_C1Cuor_Ext,
+    raffinate_E1, raffinate_E2, O_A_str and C1Cuor_Str, in that order; the
+    raffinate entries are NaN unless with_raffinate.
+    """
+    E, _, _, E_v, E_C = _extraction_partials(PLS_Cu, PLS_Ac, v_v_percent, LO, powers, two)
+    dE = E_v * dv + E_C * dLO
+    C1 = LO + E * Mef1e / 100 / O_A_Ext
+    dC1 = dLO + (dE * Mef1e + E * dMef1e) / 100 / O_A_Ext
+
+    raffinate_E1 = PLS_Cu - (C1 - LO) * O_A_Ext
+    draffinate_E1 = -(dC1 - dLO) * O_A_Ext
+    E, E_cu, _, E_v, E_C = _extraction_partials(raffinate_E1, PLS_Ac, v_v_percent, LO, powers, two)
+    dE = E_cu * draffinate_E1 + E_v * dv + E_C * dLO
+    C2 = C1 + E * Mef2e / 100 / O_A_Ext
+    dC2 = dC1 + (dE * Mef2e + E * dMef2e) / 100 / O_A_Ext
+
+    E_C1, R1, R2 = np.nan, np.nan, np.nan
+    dE_C1, dR1, dR2 = np.full_like(dv, np.nan), np.full_like(dv, np.nan), np.full_like(dv, np.nan)
+    if with_raffinate:
+        E, _, _, E_v, E_C = _extraction_partials(PLS_Cu, PLS_Ac, v_v_percent, C1, powers, two)
+        dE = E_v * dv + E_C * dC1
+        E_C1, dE_C1 = E, dE
+        R1 = E * Mef1e / 100 + PLS_Cu * (1 - Mef1e / 100)
+        dR1 = (dE * Mef1e + E * dMef1e) / 100 - PLS_Cu * dMef1e / 100
+
+        E, E_cu, _, E_v, E_C = _extraction_partials(R1, PLS_Ac, v_v_percent, C2, powers, two)
+        dE = E_cu * dR1 + E_v * dv + E_C * dC2
+        R2 = E * Mef2e / 100 + R1 * (1 - Mef2e / 100)
+        dR2 = (dE * Mef2e + E * dMef2e) / 100 + dR1 * (1 - Mef2e / 100) - R1 * dMef2e / 100
+
+    copper_to_strip = LO - C2
+    copper_transfer = AD_Cu - SP_Cu
+    if copper_to_strip != 0:
+        O_A_str = copper_transfer / copper_to_strip
+        dO_A_str = -copper_transfer / copper_to_strip ** two * (dLO - dC2)
+    else:
+        O_A_str, dO_A_str = 1.0, np.zeros_like(dv)
+
+    S, _, _, S_v, S_C = _stripping_partials(SP_Cu, SP_Ac, v_v_percent, LO, powers, two)
+    dS = S_v * dv + S_C * dLO
+    C1_str = LO - S * Mef1s / 100 * O_A_str
+    dC1_str = dLO - Mef1s / 100 * (dS * O_A_str + S * dO_A_str)
+
+    return (C1, dC1, C2, dC2, E_C1, dE_C1, R1, dR1, R2, dR2, O_A_str, dO_A_str, C1_str, dC1_str)
+
+
+# The objectives below take powers = v_powers(v_v_percent) and two = 2.0. NumPy
+# squares float64 scalars with libm's pow, which is not always x * x; an
+# exponent only known at run time keeps LLVM from turning x ** two into a
+# multiplication.
+
+@_jit
+def option1_residual(powers, PLS_Cu, PLS_Ac, O_A_Ext, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                     Mef1e, Mef2e, SR, v_v_percent, two):
+    """
+    ConfigurationA_2Ex1S.option1_residual: the balance residual and its gradient.
+    """
+    LO = _finite(0.4108 * powers[6]) * SR / 100
+    dLO = np.array([0.4108 * 1.1 * v_v_percent ** 0.1 * SR / 100])
+    zero = np.zeros(1)
+    chain = _stage_chain(powers, PLS_Cu, PLS_Ac, O_A_Ext, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                         v_v_percent, np.ones(1), LO, dLO, Mef1e, zero, Mef2e, zero, False, two)
+    C2Cuor_Ext, dC2Cuor_Ext = chain[2], chain[3]
+    C1Cuor_Str, dC1Cuor_Str = chain[12], chain[13]
+
+    residual = (C1Cuor_Str * Mef1s / 100 + LO * (1 - Mef1s / 100)) - C2Cuor_Ext
+    gradient = dC1Cuor_Str * Mef1s / 100 + dLO * (1 - Mef1s / 100) - dC2Cuor_Ext
+    return residual, gradient
+
+
+@_jit
+def option2_residuals(powers, PLS_Cu, PLS_Ac, O_A_Ext, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                      ML_plant, raffinate_Cu_target, stripped_organic_Cu_target,
+                      v_v_percent, SR, Mef1e, Mef2e, two):
+    """
+    ConfigurationA_2Ex1S.option2_residuals: the three residuals and their 3x4 Jacobian.
+    """
+    unit = np.eye(4)
+    LO = ML_plant * SR / 100
+    chain = _stage_chain(powers, PLS_Cu, PLS_Ac, O_A_Ext, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                         v_v_percent, unit[0], LO, unit[1] * ML_plant / 100,
+                         Mef1e, unit[2], Mef2e, unit[3], True, two)
+
+    residuals = np.empty(3)
+    residuals[0] = ML_plant - (PLS_Ac ** two / PLS_Cu - chain[4])
+    residuals[1] = chain[8] - raffinate_Cu_target
+    residuals[2] = chain[12] - stripped_organic_Cu_target
+    jacobian = np.empty((3, 4))
+    jacobian[0], jacobian[1], jacobian[2] = chain[5], chain[9], chain[13]
+    return residuals, jacobian
+
+
+@_ufunc(14)
+def option1_balance(PLS_Cu, PLS_Ac, O_A_Ext, Mef1e, Mef2e, SP_Cu, SP_Ac, AD_Cu, Mef1s,
+                    v_v_percent, LO, v_1746, v_0646, v_085):
+    """
+    ConfigurationA_2Ex1S.option1_balance given the loaded organic LO and the
+    v/v% powers of the closed-form isotherms.
+    """
+    term1 = _extraction_term1(LO, v_1746, v_0646)
+    C1 = LO + _quadratic_root(PLS_Cu, PLS_Ac, v_v_percent, LO, term1) * Mef1e / 100 / O_A_Ext
+    raffinate_E1 = PLS_Cu - (C1 - LO) * O_A_Ext
+    C2 = C1 + _quadratic_root(raffinate_E1, PLS_Ac, v_v_percent, LO, term1) * Mef2e / 100 / O_A_Ext
+
+    copper_to_strip = LO - C2
+    O_A_str = (AD_Cu - SP_Cu) / copper_to_strip if copper_to_strip != 0 else 1.0
+    S = _quadratic_root(SP_Cu, SP_Ac, v_v_percent, LO, _stripping_term1(v_v_percent, LO, v_085))
+    C1_str = LO - S * Mef1s / 100 * O_A_str
+    return (C1_str * Mef1s / 100 + LO * (1 - Mef1s / 100)) - C2
+
+
+# --- Selection ---
+
+def warm_up():
+    """
+    Compiles (or loads from numba's cache) every kernel signature the engines use.
+    """
+    powers = v_powers(10.0)
+    extraction_equilibrium(2.5, 1.6, 10.0, 3.0, powers[0], powers[1])
+    stripping_equilibrium(30.0, 190.0, 10.0, 3.0, powers[2])
+    option1_balance(2.5, 1.6, 1.0, 92.0, 95.0, 30.0, 190.0, 50.0, 98.0, 10.0, 3.8, powers[0], powers[1], powers[2])
+    option1_residual(powers, 2.5, 1.6, 1.0, 30.0, 190.0, 50.0, 98.0, 92.0, 95.0, 92.0, 10.0, 2.0)
+    option2_residuals(powers, 2.5, 1.6, 1.0, 30.0, 190.0, 50.0, 98.0, 4.386, 0.28, 1.8, 8.0, 90.0, 90.0, 95.0, 2.0)
+
+
+def select(backend: str = 'auto'):
+    """
+    Kernels to pass to SimSXCu.use_kernels: this module, compiled, for 'numba'
+    (or 'auto' when numba is installed), and None for the NumPy code.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{backend}'. Must be one of {', '.join(BACKENDS)}.")
+    if backend == 'numpy' or (backend == 'auto' and not AVAILABLE):
+        return None
+    if not AVAILABLE:
+        raise RuntimeError("The 'numba' kernel backend needs numba, which is not installed.")
+    warm_up()
+    return sys.modules[__name__]
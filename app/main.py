@@ -1,11 +1,32 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List
+from typing import Dict, List, Literal, Optional, Tuple, Union
+from contextlib import asynccontextmanager
+from itertools import islice
+import asyncio
+import json
+import os
+import time
+import numpy as np
 
 # Import the new simulation and solver engines
-from .simulation_engine import SimSXCu, ConfigurationA_2Ex1S, SolverEngine
+from .simulation_engine import SimSXCu, CircuitState, ConfigurationA_2Ex1S, SolutionIndex, SolverEngine, StatsCounter
+from .flowsheet import Flowsheet
+from .legacy import LegacySimulation
+from .executor import SolverPool, SolverPoolSaturated, SolverPoolTimeout, SolverPoolUnavailable
+from .response_cache import SolveResultCache
+from .run_store import EXPORT_FORMATS, RunStore
+from .sweep import (DEFAULT_CHUNK_SIZE, chunk_to_columns, evaluate_sweep_chunk, npy_header, sweep_dtype,
+                    sweep_size)
+from .streaming import STREAM_FORMATS, coalesce, event_message, format_event, json_safe, run_ordered
+from .uncertainty import DEFAULT_PERCENTILES, propagate
+from .session import CircuitSession
+from .dynamics import DEFAULT_SETTLER_CELLS, TRANSIENT_OUTPUTS, MixerSettlerDynamics
+from .instrumentation import Metrics, PhaseTimer, SampledProfiler, measure_call
 
 # --- API Data Models ---
 
@@ -43,6 +64,572 @@ class MetallurgistParams(BaseModel):
 class SolveRequest(BaseModel):
     mode: str = Field(..., description="Either 'designer' or 'metallurgist'")
     params: Dict
+    config: str = Field('A', description="Plant configuration, 'A' to 'R'")
+
+class BatchSolveRequest(BaseModel):
+    cases: List[SolveRequest] = Field(..., title="Cases to solve", max_length=10000)
+
+class BatchCaseResult(BaseModel):
+    index: int
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    # Run store key and validated parameters of a solved case (not sent to clients)
+    store_key: Optional[str] = Field(None, exclude=True)
+    params: Optional[Dict] = Field(None, exclude=True)
+
+class SweepAxis(BaseModel):
+    name: str = Field(..., description="'v_v_percent' or a designer parameter, e.g. 'PLS_Cu', 'Mef1e'")
+    values: Optional[List[float]] = Field(None, description="Explicit axis values")
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    num: Optional[int] = Field(None, ge=1)
+
+    def grid(self) -> List[float]:
+        if self.values is not None:
+            return self.values
+        if self.start is None or self.stop is None or self.num is None:
+            raise ValueError(f"Axis '{self.name}' needs either values or start/stop/num.")
+        return np.linspace(self.start, self.stop, self.num).tolist()
+
+class SweepRequest(BaseModel):
+    params: Dict = Field(default_factory=dict, description="Designer parameters held fixed")
+    v_v_percent: float = Field(10.0, title="Extractant v/v % when not swept")
+    axes: List[SweepAxis] = Field(..., min_length=1)
+    chunk_size: int = Field(4096, ge=1, le=65536, title="Rows per streamed chunk")
+
+class MultiStartRequest(BaseModel):
+    mode: str = Field(..., description="'designer' or 'metallurgist'")
+    params: Dict
+    config: str = Field('A', description="Plant configuration, 'A' to 'R'")
+    n_starts: int = Field(16, ge=1, le=256, title="Number of Latin hypercube starts")
+    tolerance: float = Field(1e-6, ge=0, title="Stop once a start reaches this objective value")
+    seed: Optional[int] = Field(None, title="Random seed for reproducible starts")
+
+class SimulationParameters(BaseModel):
+    """
+    Inputs of the simplified model behind /api/v1/simulate.
+    Values are based on the original prototype's defaults.
+    """
+    PLS_flow: float = Field(400, title="PLS Flow", description="m³/h")
+    PLS_Cu: float = Field(2.5, title="PLS Copper Concentration", description="g/L")
+    PLS_Ac: float = Field(1.6, title="PLS Acidity", description="g/L")
+    SR: float = Field(92, title="Saturation Ratio", description="%")
+    Ratio_O_A_Ext: float = Field(1, title="Organic/Aqueous Ratio in Extraction")
+    Mef1e: float = Field(92, title="Mixer Efficiency E1", description="%")
+    Mef2e: float = Field(95, title="Mixer Efficiency E2", description="%")
+    SP_Cu: float = Field(30, title="Spent Electrolyte Copper", description="g/L")
+    SPAc: float = Field(190, title="Spent Electrolyte Acidity", description="g/L")
+    AD_Cu: float = Field(50, title="Advanced Electrolyte Copper", description="g/L")
+    Mef1s: float = Field(98, title="Mixer Efficiency S1", description="%")
+    v_v_percent: float = Field(8.66, title="Extractant Volume Percentage", description="% v/v")
+
+class SimulationRequest(BaseModel):
+    option: Literal[1, 2] = Field(..., title="Simulation Option", description="Option 1 or Option 2")
+    config: str = Field("A", title="Plant Configuration", description="e.g., 'A', 'B', etc.")
+    parameters: SimulationParameters
+
+class InputDistribution(BaseModel):
+    distribution: Literal['normal', 'uniform', 'triangular'] = Field('normal')
+    mean: Optional[float] = Field(None, description="Mean of a normal distribution; defaults to the nominal value")
+    std: Optional[float] = Field(None, ge=0, description="Standard deviation of a normal distribution")
+    mode: Optional[float] = Field(None, description="Peak of a triangular distribution; defaults to the nominal value")
+    low: Optional[float] = Field(None, description="Lower bound (uniform, triangular) or clip limit (normal)")
+    high: Optional[float] = Field(None, description="Upper bound (uniform, triangular) or clip limit (normal)")
+
+class UncertaintyRequest(BaseModel):
+    mode: str = Field(..., description="'designer' or 'metallurgist'")
+    params: Dict
+    operating_point: Optional[Dict[str, float]] = Field(
+        None, description="v_v_percent, plus SR, Mef1e and Mef2e for 'metallurgist'; solved from params when omitted")
+    distributions: Dict[str, InputDistribution] = Field(..., min_length=1, description="Uncertain inputs, e.g. 'PLS_Cu', 'Mef1e'")
+    samples: int = Field(100_000, ge=1, title="Number of Monte Carlo samples")
+    seed: Optional[int] = Field(None, title="Random seed for reproducible samples")
+    percentiles: List[float] = Field(default_factory=lambda: list(DEFAULT_PERCENTILES), min_length=1)
+
+class StepChange(BaseModel):
+    time: float = Field(..., ge=0, description="h from the start")
+    name: str = Field(..., description="'v_v_percent' or a designer parameter, e.g. 'PLS_Cu', 'PLS_flow'")
+    value: Union[float, List[float]] = Field(..., description="New value, or one value per scenario")
+
+class TransientRequest(BaseModel):
+    params: Dict = Field(default_factory=dict, description="Designer parameters at the start")
+    v_v_percent: float = Field(10.0, title="Extractant v/v % at the start")
+    steps: List[StepChange] = Field(default_factory=list, description="Input changes during the run")
+    holdups: Dict[str, float] = Field(default_factory=dict, description="Holdup volumes (m³) and electrolyte_flow (m³/h)")
+    settler_cells: int = Field(DEFAULT_SETTLER_CELLS, ge=1, le=50, title="Cells in series per settler phase")
+    duration: float = Field(24.0, gt=0, title="Simulated time", description="h")
+    dt: float = Field(5 / 60, gt=0, title="Integration step", description="h")
+    points: int = Field(289, ge=2, le=100_000, title="Samples in the returned time series")
+
+class RunQuery(BaseModel):
+    ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = Field(
+        default_factory=dict, description="[low, high] per field, e.g. 'PLS_Cu' or 'v_v_percent'; null for open")
+    mode: Optional[str] = None
+    config: Optional[str] = None
+    success: Optional[bool] = None
+    limit: int = Field(100, ge=1, le=10000)
+    offset: int = Field(0, ge=0)
+
+class NearestRunsRequest(BaseModel):
+    point: Dict[str, float] = Field(..., min_length=1, description="Values of indexed fields, e.g. {'PLS_Cu': 3.1}")
+    k: int = Field(5, ge=1, le=1000, title="Number of runs")
+    mode: Optional[str] = None
+    config: Optional[str] = None
+    success: Optional[bool] = None
+
+MAX_SWEEP_POINTS = int(os.environ.get('SIMSXCU_MAX_SWEEP_POINTS', 20_000_000))
+MAX_UNCERTAINTY_SAMPLES = int(os.environ.get('SIMSXCU_MAX_UNCERTAINTY_SAMPLES', 2_000_000))
+# Integration steps times scenarios of one transient run.
+MAX_TRANSIENT_STEPS = int(os.environ.get('SIMSXCU_MAX_TRANSIENT_STEPS', 10_000_000))
+# What-if sessions apply a burst of input changes as one update: once no message
+# arrived for the debounce time, or at the latest after the maximum delay.
+SESSION_DEBOUNCE_SECONDS = float(os.environ.get('SIMSXCU_SESSION_DEBOUNCE_MS', 5)) / 1000
+SESSION_MAX_DELAY_SECONDS = float(os.environ.get('SIMSXCU_SESSION_MAX_DELAY_MS', 20)) / 1000
+BATCH_STREAM_CHUNK_SIZE = 8
+
+
+# --- Shared Engines ---
+
+# The engines are stateless between solves, so one set is shared by every request
+# in the worker instead of being rebuilt per call.
+sim_engine = SimSXCu()
+# Optional memoization of repeated operating points (standard plant PLS settings,
+# the shared first-stage equilibrium inside each objective) per worker process;
+# off by default. It applies to the NumPy scalar path only: with compiled kernels
+# (SIMSXCU_KERNELS) the Configuration A objectives do not go through it.
+EQUILIBRIUM_CACHE_SIZE = int(os.environ.get('SIMSXCU_EQUILIBRIUM_CACHE_SIZE', 0))
+if EQUILIBRIUM_CACHE_SIZE > 0:
+    sim_engine.enable_cache(
+        maxsize=EQUILIBRIUM_CACHE_SIZE,
+        tolerance=float(os.environ.get('SIMSXCU_EQUILIBRIUM_CACHE_TOLERANCE', 0.0))
+    )
+# Optional precomputed isotherm tables for scalar equilibrium calls (interpolated,
+# see IsothermTable for the error bound); off by default.
+if os.environ.get('SIMSXCU_ISOTHERM_TABLES', '').lower() in ('1', 'true', 'yes'):
+    sim_engine.enable_isotherm_tables()
+# Compiled objective kernels: 'auto' (default) uses numba when it is installed,
+# 'numba' requires it and 'numpy' keeps the NumPy code. Compiled at startup.
+KERNEL_BACKEND = os.environ.get('SIMSXCU_KERNELS', 'auto').lower()
+if KERNEL_BACKEND != 'numpy':
+    from . import kernels
+    sim_engine.use_kernels(kernels.select(KERNEL_BACKEND))
+# Solves of every configuration, A included, go through the generic flowsheet
+# engine, so results are comparable across configurations. The sweep,
+# uncertainty, what-if session, transient and historian tools evaluate
+# Configuration A with the SimSXCu stage chain (ConfigurationA_2Ex1S).
+config = ConfigurationA_2Ex1S(sim_engine)
+flowsheets: Dict[str, Flowsheet] = {}
+# The simplified /api/v1/simulate model runs on the same engine and caches.
+legacy = LegacySimulation(sim_engine)
+# Solves are warm-started from the nearest previously converged cases. Set
+# SIMSXCU_WARM_START_PATH to persist the index across restarts.
+WARM_START_SIZE = int(os.environ.get('SIMSXCU_WARM_START_SIZE', 10000))
+solver = SolverEngine(
+    SolutionIndex(max_size=WARM_START_SIZE, path=os.environ.get('SIMSXCU_WARM_START_PATH') or None)
+    if WARM_START_SIZE > 0 else None
+)
+
+PARAM_MODELS = {'designer': DesignerParams, 'metallurgist': MetallurgistParams}
+SOLVE_MODES = tuple(PARAM_MODELS)
+# Box bounds and names of the solved variables per mode.
+SOLVE_BOUNDS = {
+    'designer': [(5.0, 30.0)],  # v/v % bounds
+    'metallurgist': [
+        (5.0, 30.0),   # v/v%
+        (70.0, 100.0), # SR
+        (70.0, 100.0), # Mef1e
+        (70.0, 100.0)  # Mef2e
+    ]
+}
+SOLVE_VARIABLES = {
+    'designer': ['v_v_percent'],
+    'metallurgist': ['v_v_percent', 'saturation_ratio', 'mixer_eff1', 'mixer_eff2']
+}
+# Request fields of the initial guess. A request that sets any of them is solved
+# from exactly that guess; otherwise the solver may warm-start it.
+INITIAL_GUESS_FIELDS = {
+    'designer': ['initial_vv_guess'],
+    'metallurgist': ['initial_guess_vv', 'initial_guess_sr', 'initial_guess_mef1e', 'initial_guess_mef2e']
+}
+# Circuit parameters of the solved variables, in SOLVE_VARIABLES order.
+OPERATING_POINT_FIELDS = {
+    'designer': ['v_v_percent'],
+    'metallurgist': ['v_v_percent', 'SR', 'Mef1e', 'Mef2e']
+}
+INVALID_MODE_MESSAGE = "Invalid mode specified. Must be 'designer' or 'metallurgist'."
+INVALID_CONFIG_MESSAGE = f"Invalid configuration specified. Must be one of {', '.join(sim_engine.configurations)}."
+
+
+# Time spent looking up or building the engine objects of a solve (per worker).
+setup_stats = StatsCounter(engine_seconds=0.0)
+
+
+def get_objectives(config_id: str):
+    """
+    Returns (option1 objective, option2 objective, jac, option1 residual, option2
+    residuals) for a configuration. The signed, vectorized Option 1 residual is used
+    for root finding; the Option 2 residuals report the objective value.
+    """
+    started = time.perf_counter()
+    try:
+        return _get_objectives(config_id)
+    finally:
+        setup_stats.add(engine_seconds=time.perf_counter() - started)
+
+
+def _get_objectives(config_id: str):
+    if config_id not in sim_engine.configurations:
+        raise ValueError(INVALID_CONFIG_MESSAGE)
+    if config_id not in flowsheets:
+        flowsheets[config_id] = Flowsheet.for_configuration(sim_engine, config_id)
+    flowsheet = flowsheets[config_id]
+    return (flowsheet.option1_least_squares, flowsheet.option2_least_squares, True, flowsheet.option1_residual,
+            flowsheet.option2_residuals)
+
+
+def explicit_guess(mode: str, params: Dict) -> bool:
+    """
+    Whether the (unvalidated) request parameters set an initial guess.
+    """
+    return any(name in params for name in INITIAL_GUESS_FIELDS.get(mode, ()))
+
+
+def solve_key(mode: str, params: Dict, validated_params: Dict, config_id: str, trace: bool = False) -> str:
+    """
+    Result cache and run store key of a solve. Without an explicit initial guess
+    the solve may be warm-started, so it is keyed apart from one that starts
+    exactly at the default guess.
+    """
+    if not explicit_guess(mode, params):
+        validated_params = {name: value for name, value in validated_params.items()
+                            if name not in INITIAL_GUESS_FIELDS[mode]}
+    return SolveResultCache.make_key(mode, validated_params, config_id, trace)
+
+
+def run_solve(mode: str, params: Dict, config_id: str = 'A', trace: bool = False,
+              warm_start: Optional[bool] = None) -> Dict:
+    """
+    Validates the parameters for the given mode and runs the matching optimization
+    for the given plant configuration. With trace=True the result carries the
+    solver's iteration trace. The objectives receive the parameters as one
+    CircuitState, built here once per solve. Unless warm_start says otherwise,
+    only requests without an explicit initial guess are warm-started.
+    """
+    option1_objective, option2_objective, jac, option1_residual, option2_residuals = get_objectives(config_id)
+    if warm_start is None:
+        warm_start = not explicit_guess(mode, params)
+
+    if mode == 'designer':
+        validated_params = DesignerParams(**params)
+        initial_guess = [validated_params.initial_vv_guess]
+        bounds = SOLVE_BOUNDS[mode]
+
+        return solver.solve_option1(
+            option1_objective,
+            initial_guess,
+            bounds,
+            CircuitState.from_params(validated_params.dict()),
+            jac=jac,
+            residual=option1_residual,
+            trace=trace,
+            warm_start=warm_start,
+            squared=True
+        )
+
+    elif mode == 'metallurgist':
+        validated_params = MetallurgistParams(**params)
+        initial_guess = [
+            validated_params.initial_guess_vv,
+            validated_params.initial_guess_sr,
+            validated_params.initial_guess_mef1e,
+            validated_params.initial_guess_mef2e
+        ]
+        bounds = SOLVE_BOUNDS[mode]
+
+        return solver.solve_option2(
+            option2_objective,
+            initial_guess,
+            bounds,
+            CircuitState.from_params(validated_params.dict()),
+            jac=jac,
+            residuals=option2_residuals,
+            trace=trace,
+            warm_start=warm_start
+        )
+
+    raise ValueError(INVALID_MODE_MESSAGE)
+
+
+def run_start(mode: str, validated_params: Dict, config_id: str, initial_guess: List[float]) -> Dict:
+    """
+    Runs one start of a multi-start solve from the given initial guess.
+    """
+    option1_objective, option2_objective, jac, _, _ = get_objectives(config_id)
+    objective = option1_objective if mode == 'designer' else option2_objective
+    return solver.solve_local(objective, initial_guess, SOLVE_BOUNDS[mode],
+                              CircuitState.from_params(validated_params), jac=jac)
+
+
+def prepare_sweep(request: SweepRequest):
+    """
+    Validates a sweep request and returns (base_params, axes).
+    """
+    base_params = DesignerParams(**request.params).dict()
+    axes = []
+    for axis in request.axes:
+        if axis.name != 'v_v_percent' and axis.name not in base_params:
+            raise ValueError(f"Unknown sweep axis '{axis.name}'.")
+        if any(name == axis.name for name, _ in axes):
+            raise ValueError(f"Sweep axis '{axis.name}' is given more than once.")
+        axes.append((axis.name, axis.grid()))
+
+    total = sweep_size(axes)
+    if total > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep has {total} points; the limit is {MAX_SWEEP_POINTS}.")
+    return base_params, axes
+
+
+def run_sweep_rows(base_params: Dict, v_v_percent: float, axes: List, start: int, stop: int) -> bytes:
+    """
+    Evaluates one slice of a sweep grid and returns its raw .npy record bytes.
+    """
+    return evaluate_sweep_chunk(config, base_params, v_v_percent, axes, start, stop).tobytes()
+
+
+def run_sweep_chunk(base_params: Dict, v_v_percent: float, axes: List, start: int, stop: int) -> Dict:
+    """
+    Evaluates one slice of a sweep grid and returns it as JSON-ready columns.
+    """
+    chunk = evaluate_sweep_chunk(config, base_params, v_v_percent, axes, start, stop)
+    return chunk_to_columns(chunk)
+
+
+def run_uncertainty(request: UncertaintyRequest) -> Dict:
+    """
+    Validates an uncertainty request, solves the nominal operating point with
+    Configuration A unless one is given, and propagates the input distributions
+    around it. Metallurgist cases load the organic to ML_plant * SR / 100.
+    """
+    if request.samples > MAX_UNCERTAINTY_SAMPLES:
+        raise ValueError(f"{request.samples} samples requested; the limit is {MAX_UNCERTAINTY_SAMPLES}.")
+    nominal = PARAM_MODELS[request.mode](**request.params).dict()
+    fields = OPERATING_POINT_FIELDS[request.mode]
+    solution = None
+    if request.operating_point is None:
+        solution = run_solve(request.mode, request.params)
+        operating_point = {field: float(solution[variable])
+                           for field, variable in zip(fields, SOLVE_VARIABLES[request.mode])}
+    else:
+        missing = [field for field in fields if field not in request.operating_point]
+        if missing:
+            raise ValueError(f"The operating point is missing {', '.join(missing)}.")
+        operating_point = {field: request.operating_point[field] for field in fields}
+    nominal.update(operating_point)
+
+    result = propagate(config, nominal, {name: spec.dict() for name, spec in request.distributions.items()},
+                       request.samples, request.seed, request.percentiles,
+                       plant_loading=request.mode == 'metallurgist')
+    result['operating_point'] = operating_point
+    if solution is not None:
+        result['solve'] = {'success': solution['success'], 'message': solution['message']}
+    return result
+
+
+def run_transient(request: TransientRequest) -> Dict:
+    """
+    Validates a transient request and integrates the Configuration A holdup
+    model. Returns the time axis and, per output, one row per sample with one
+    value per scenario (NaN as None).
+    """
+    params = DesignerParams(**request.params).dict(exclude={'initial_vv_guess'})
+    params['v_v_percent'] = request.v_v_percent
+    scenarios = {len(step.value) for step in request.steps if isinstance(step.value, list)}
+    if len(scenarios) > 1:
+        raise ValueError("Step values given per scenario must all have the same length.")
+    n_scenarios = scenarios.pop() if scenarios else 1
+    n_steps = max(np.ceil(request.duration / request.dt), request.points - 1)
+    if n_steps * n_scenarios > MAX_TRANSIENT_STEPS:
+        raise ValueError(f"{int(n_steps)} steps of {n_scenarios} scenarios requested; "
+                         f"the limit is {MAX_TRANSIENT_STEPS} scenario steps.")
+
+    model = MixerSettlerDynamics(config, request.holdups, request.settler_cells)
+    result = model.run(params, [(step.time, step.name, step.value) for step in request.steps],
+                       request.duration, request.dt, request.points)
+    return {
+        'time': result['time'].tolist(),
+        'scenarios': n_scenarios,
+        'outputs': {name: np.where(np.isfinite(result[name]), result[name], None).tolist()
+                    for name in TRANSIENT_OUTPUTS}
+    }
+
+
+def run_designer_group(config_id: str, cases: List[Dict]) -> List[Dict]:
+    """
+    Solves many validated designer cases of one configuration in a single
+    vectorized root-finding pass, one value per case in each parameter array.
+    """
+    option1_residual = get_objectives(config_id)[3]
+    stacked = {name: np.array([case[name] for case in cases], dtype=float) for name in cases[0]}
+    return solver.solve_option1_roots(option1_residual, SOLVE_BOUNDS['designer'],
+                                      CircuitState.from_params(stacked), stacked['initial_vv_guess'])
+
+
+def run_batch(cases: List[SolveRequest], start_index: int = 0) -> List[BatchCaseResult]:
+    """
+    Solves every case with the shared engines and returns results in input order.
+    Identical cases are solved once, and a failing case only marks its own entry.
+    Designer cases are grouped per configuration and solved together; the
+    others may be warm-started from earlier cases of the same chunk. Solved
+    cases carry their run store key and validated parameters.
+    """
+    solved: Dict[str, BatchCaseResult] = {}
+    validated: Dict[str, Tuple[str, Dict]] = {}
+    designer_groups: Dict[str, Dict[str, Dict]] = {}
+    with solver.continuation():
+        for index, case in enumerate(cases, start=start_index):
+            key = json.dumps([case.mode, case.config, case.params], sort_keys=True)
+            if key in solved or key in designer_groups.get(case.config, {}):
+                continue
+            try:
+                if case.mode not in PARAM_MODELS:
+                    raise ValueError(INVALID_MODE_MESSAGE)
+                validated_params = PARAM_MODELS[case.mode](**case.params).dict()
+                validated[key] = (solve_key(case.mode, case.params, validated_params, case.config),
+                                  validated_params)
+                if case.mode == 'designer' and case.config in sim_engine.configurations:
+                    designer_groups.setdefault(case.config, {})[key] = validated_params
+                else:
+                    solved[key] = BatchCaseResult(index=index, result=run_solve(case.mode, case.params, case.config))
+            except Exception as e:
+                solved[key] = BatchCaseResult(index=index, error=str(e))
+
+    for config_id, group in designer_groups.items():
+        try:
+            outcomes = run_designer_group(config_id, list(group.values()))
+            for key, result in zip(group, outcomes):
+                solved[key] = BatchCaseResult(index=0, result=result)
+        except Exception as e:
+            for key in group:
+                solved[key] = BatchCaseResult(index=0, error=str(e))
+
+    results = []
+    for index, case in enumerate(cases, start=start_index):
+        key = json.dumps([case.mode, case.config, case.params], sort_keys=True)
+        outcome = solved[key]
+        store_key, validated_params = validated[key] if outcome.result is not None else (None, None)
+        results.append(BatchCaseResult(index=index, result=outcome.result, error=outcome.error,
+                                       store_key=store_key, params=validated_params))
+    return results
+
+
+# --- Solver Pool ---
+
+# Solves run in worker processes so a slow optimization never blocks the event loop.
+solver_pool = SolverPool.from_env()
+
+
+async def run_in_pool(fn, *args, timeout: Optional[float] = None):
+    """
+    Runs solver work in the pool and maps saturation/timeouts to HTTP errors.
+    """
+    try:
+        return await solver_pool.run(fn, *args, timeout=timeout)
+    except SolverPoolSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except (SolverPoolTimeout, SolverPoolUnavailable) as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def run_batch_chunk(cases: List[SolveRequest], start: int) -> List[BatchCaseResult]:
+    """
+    Solves a slice of a batch in the pool with the per-solve timeout for each of
+    its cases. If the pool rejects the slice or it times out, every case in it
+    gets that error instead of failing the whole batch.
+    """
+    try:
+        return await run_in_pool(run_batch, cases, start, timeout=solver_pool.timeout * len(cases))
+    except HTTPException as e:
+        error = str(e.detail)
+    except Exception as e:
+        error = f"An unexpected error occurred: {str(e)}"
+    return [BatchCaseResult(index=index, error=error) for index in range(start, start + len(cases))]
+
+
+# --- Instrumentation ---
+
+# Workers report a timing/call-count breakdown with every solve; the counters
+# below aggregate them in the web process and are exposed on /metrics.
+metrics = Metrics()
+metrics.describe('http_request_duration_seconds', 'histogram', 'HTTP request latency by route and status.')
+metrics.describe('solves_total', 'counter', 'Solve requests by mode, configuration and outcome.')
+metrics.describe('solve_phase_seconds_total', 'counter', 'Wall time spent per solve phase.')
+metrics.describe('objective_calls_total', 'counter', 'Objective and residual function evaluations.')
+metrics.describe('solver_iterations_total', 'counter', 'Optimizer and root-finder iterations.')
+metrics.describe('equilibrium_calls_total', 'counter', 'Isotherm kernel invocations (cache hits excluded).')
+metrics.describe('equilibrium_points_total', 'counter', 'Operating points evaluated by the isotherm kernels.')
+metrics.describe('result_cache_events_total', 'counter', 'Solve result cache hits, misses, coalesced requests and run store hits.')
+metrics.describe('solver_pool_pending', 'gauge', 'Solver jobs queued or running in the pool.')
+profiler = SampledProfiler.from_env()
+
+
+def run_instrumented(profile: Optional[Dict], fn, *args):
+    """
+    Runs fn(*args) in a worker and returns (result, breakdown) with the worker
+    time, the engine, solver and setup counters consumed by this call and, if
+    sampled, the profile path.
+    """
+    return measure_call(fn, args, profile)
+
+
+def record_breakdown(breakdown: Dict, timer: PhaseTimer, queued_seconds: float):
+    """
+    Adds a worker breakdown to the metrics and the request's phase timer. Solver
+    time is the worker time not spent inside objective evaluations (scipy/ITP
+    overhead, validation inside the worker and result assembly).
+    """
+    counts = breakdown['counts']
+    objective_seconds = counts.get('objective_seconds', 0.0)
+    engine_seconds = counts.get('engine_seconds', 0.0)
+    timer.add('queue', max(queued_seconds - breakdown['worker_seconds'], 0.0))
+    timer.add('engine', engine_seconds)
+    timer.add('objective', objective_seconds)
+    timer.add('solver', max(breakdown['worker_seconds'] - objective_seconds - engine_seconds, 0.0))
+    metrics.inc('objective_calls_total', counts.get('objective_calls', 0))
+    metrics.inc('solver_iterations_total', counts.get('iterations', 0))
+    metrics.inc('equilibrium_calls_total', counts.get('equilibrium_calls', 0))
+    metrics.inc('equilibrium_points_total', counts.get('equilibrium_points', 0))
+
+
+def timings_payload(timer: PhaseTimer, breakdown: Optional[Dict], total_seconds: float) -> Dict:
+    payload = {'phases_ms': {name: seconds * 1000 for name, seconds in timer.phases.items()},
+               'total_ms': total_seconds * 1000}
+    if breakdown is None:
+        payload['cache'] = 'hit'
+    else:
+        payload['counts'] = {name: value for name, value in breakdown['counts'].items()
+                             if not name.endswith('_seconds')}
+        if 'profile' in breakdown:
+            payload['profile'] = breakdown['profile']
+    return payload
+
+# Every solve is kept in an SQLite run store when SIMSXCU_RUN_STORE_PATH is set;
+# a case solved before (by any worker sharing the file) is then answered from it.
+RUN_STORE_PATH = os.environ.get('SIMSXCU_RUN_STORE_PATH') or None
+run_store = RunStore(RUN_STORE_PATH) if RUN_STORE_PATH else None
+
+# Identical solve requests are answered from this cache (per worker process).
+result_cache = SolveResultCache(
+    maxsize=int(os.environ.get('SIMSXCU_RESULT_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('SIMSXCU_RESULT_CACHE_TTL', 300.0))
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    solver_pool.shutdown()
+    if run_store is not None:
+        run_store.close()
 
 
 # --- FastAPI Application Setup ---
@@ -50,71 +637,521 @@ class SolveRequest(BaseModel):
 app = FastAPI(
     title="SimSXCu Simulation Engine v2.0",
     description="A web-based simulation tool using the full SimSXCu engine.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
-# Mount the static directory to serve frontend files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# Mount the static directory to serve frontend files (found next to this module,
+# whatever the working directory)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    metrics.observe('http_request_duration_seconds', time.perf_counter() - started,
+                    method=request.method, route=getattr(route, 'path', 'unmatched'),
+                    status=response.status_code)
+    return response
+
+
+@app.get("/metrics")
+async def read_metrics():
+    """Prometheus metrics of this web process."""
+    metrics.set('solver_pool_pending', solver_pool.pending)
+    return Response(metrics.render(), media_type='text/plain; version=0.0.4; charset=utf-8')
 
 
 @app.get("/")
 async def read_index():
     """Serves the main index.html file."""
-    return FileResponse('app/static/index.html')
+    return FileResponse(os.path.join(STATIC_DIR, 'index.html'))
 
 
 @app.post("/api/v1/solve")
-async def solve_simulation(request: SolveRequest):
+async def solve_simulation(request: SolveRequest, http_request: Request, timings: bool = False,
+                           trace: bool = False):
     """
-    Main solver endpoint. Instantiates engines and runs the optimization
-    based on the selected mode.
+    Main solver endpoint. Runs the optimization based on the selected mode
+    and plant configuration using the shared engines. Successful results are cached by their
+    validated inputs and carry an ETag, so an If-None-Match revalidation returns 304.
+    With ?timings=true the response also carries a per-phase timing breakdown (and
+    no ETag, as the body differs per request), and with ?trace=true the solver's
+    iteration trace. Non-finite numbers (e.g. the objective of a failed solve) are
+    returned as null.
     """
+    if request.mode not in SOLVE_MODES:
+        raise HTTPException(status_code=400, detail=INVALID_MODE_MESSAGE)
+    if request.config not in sim_engine.configurations:
+        raise HTTPException(status_code=400, detail=INVALID_CONFIG_MESSAGE)
+
+    started = time.perf_counter()
+    timer = PhaseTimer()
+    breakdown = None
+    stored = False
+    coalesced = result_cache.coalesced
+
+    async def solve():
+        nonlocal breakdown, stored
+        if run_store is not None:
+            # An SQLite read: off the event loop
+            result = await run_in_threadpool(run_store.get, key)
+            if result is not None and result.get('success'):
+                stored = True
+                return result
+        profile = profiler.sample(f'solve-{request.mode}-{request.config}')
+        submitted = time.perf_counter()
+        result, breakdown = await run_in_pool(run_instrumented, profile, run_solve, request.mode,
+                                              validated_params, request.config, trace,
+                                              not explicit_guess(request.mode, request.params))
+        record_breakdown(breakdown, timer, time.perf_counter() - submitted)
+        if run_store is not None:
+            run_store.add(key, request.mode, request.config, validated_params, result,
+                          breakdown['worker_seconds'])
+        return result
+
     try:
-        # Initialize the core engines
-        sim_engine = SimSXCu()
-        # For now, we only have Configuration A implemented
-        config = ConfigurationA_2Ex1S(sim_engine)
-        solver = SolverEngine()
-
-        if request.mode == 'designer':
-            validated_params = DesignerParams(**request.params)
-            initial_guess = [validated_params.initial_vv_guess]
-            bounds = [(5.0, 30.0)]  # v/v % bounds
-
-            result = solver.solve_option1(
-                config.option1_objective,
-                initial_guess,
-                bounds,
-                validated_params.dict()
-            )
-            return result
-
-        elif request.mode == 'metallurgist':
-            validated_params = MetallurgistParams(**request.params)
-            initial_guess = [
-                validated_params.initial_guess_vv,
-                validated_params.initial_guess_sr,
-                validated_params.initial_guess_mef1e,
-                validated_params.initial_guess_mef2e
-            ]
-            bounds = [
-                (5.0, 30.0),   # v/v%
-                (70.0, 100.0), # SR
-                (70.0, 100.0), # Mef1e
-                (70.0, 100.0)  # Mef2e
-            ]
-
-            result = solver.solve_option2(
-                config.option2_objective,
-                initial_guess,
-                bounds,
-                validated_params.dict()
-            )
-            return result
-
-        else:
-            raise HTTPException(status_code=400, detail="Invalid mode specified. Must be 'designer' or 'metallurgist'.")
+        with timer.phase('validation'):
+            validated_params = PARAM_MODELS[request.mode](**request.params).dict()
+            key = solve_key(request.mode, request.params, validated_params, request.config, trace)
+        etag = None if timings else f'"{key}"'
+        if etag and http_request.headers.get('if-none-match') == etag and result_cache.get(key) is not None:
+            metrics.inc('result_cache_events_total', event='revalidated')
+            return Response(status_code=304, headers={'ETag': etag})
 
+        result = await result_cache.get_or_solve(key, solve)
+    except HTTPException:
+        metrics.inc('solves_total', mode=request.mode, config=request.config, outcome='error')
+        raise
     except Exception as e:
+        metrics.inc('solves_total', mode=request.mode, config=request.config, outcome='error')
         # Catch any other errors during simulation
-        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    if breakdown is not None:
+        metrics.inc('result_cache_events_total', event='miss')
+        for phase, seconds in timer.phases.items():
+            metrics.inc('solve_phase_seconds_total', seconds, phase=phase)
+    elif stored:
+        metrics.inc('result_cache_events_total', event='stored')
+    else:
+        metrics.inc('result_cache_events_total',
+                    event='coalesced' if result_cache.coalesced > coalesced else 'hit')
+    metrics.inc('solves_total', mode=request.mode, config=request.config,
+                outcome='success' if result.get('success') else 'failure')
+
+    if timings:
+        result = dict(result, timings=timings_payload(timer, breakdown, time.perf_counter() - started))
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'} if etag else {'Cache-Control': 'no-store'}
+    return JSONResponse(json_safe(jsonable_encoder(result)), headers=headers)
+
+
+@app.post("/api/v1/simulate")
+async def run_simulation(request: SimulationRequest):
+    """
+    Runs the simplified model (formerly the separate backend/ service).
+    - Option 1: Optimizes for minimum extractant (v/v %) for a target recovery.
+    - Option 2: Simulates plant performance with a given extractant (v/v %).
+    These are closed-form evaluations, so they run inline rather than in the solver pool.
+    """
+    params_dict = request.parameters.model_dump()
+
+    if request.option == 1:
+        results = legacy.run_optimization(params_dict)
+    else:  # Option 2
+        results = legacy.run_simulation(params_dict)
+
+    return {"results": results}
+
+
+@app.post("/api/v1/solve/batch")
+async def solve_batch(request: BatchSolveRequest):
+    """
+    Batch solver endpoint. Solves many designer/metallurgist cases in one request
+    and reports a result or an error for each case, in input order.
+    """
+    cases = request.cases
+    # Split the batch so the chunks are solved on all workers at once.
+    chunk_size = max(1, -(-len(cases) // max(solver_pool.max_workers, 1)))
+    chunks = await asyncio.gather(*(
+        run_batch_chunk(cases[start:start + chunk_size], start)
+        for start in range(0, len(cases), chunk_size)
+    ))
+    results = [result for chunk in chunks for result in chunk]
+    if run_store is not None:
+        for case, outcome in zip(cases, results):
+            if outcome.store_key is not None:
+                run_store.add(outcome.store_key, case.mode, case.config, outcome.params, outcome.result)
+    return {"results": results}
+
+
+@app.post("/api/v1/solve/multistart")
+async def solve_multistart(request: MultiStartRequest):
+    """
+    Multi-start solver endpoint. Runs SLSQP from Latin hypercube starts within the
+    bounds on all workers at once, stops as soon as one start reaches the
+    tolerance, and returns the best solution plus the spread of the converged starts.
+    """
+    if request.mode not in SOLVE_MODES:
+        raise HTTPException(status_code=400, detail=INVALID_MODE_MESSAGE)
+    if request.config not in sim_engine.configurations:
+        raise HTTPException(status_code=400, detail=INVALID_CONFIG_MESSAGE)
+
+    try:
+        validated_params = PARAM_MODELS[request.mode](**request.params).dict()
+        starts = iter(SolverEngine.latin_hypercube_starts(SOLVE_BOUNDS[request.mode],
+                                                          request.n_starts, request.seed))
+
+        def submit(start):
+            return asyncio.ensure_future(run_in_pool(run_start, request.mode, validated_params,
+                                                     request.config, start.tolist()))
+
+        # One start per worker is in flight; the rest are only submitted if needed.
+        pending = {submit(start) for start in islice(starts, max(solver_pool.max_workers, 1))}
+        runs = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                runs.extend(task.result() for task in done)
+                if any(SolverEngine.reached_tolerance(run, request.tolerance) for run in runs):
+                    break
+                pending |= {submit(start) for start in islice(starts, len(done))}
+        finally:
+            for task in pending:
+                task.cancel()
+        result = SolverEngine.summarize_starts(runs, SOLVE_VARIABLES[request.mode],
+                                               request.n_starts, request.tolerance)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    return JSONResponse(jsonable_encoder(result))
+
+
+@app.post("/api/v1/sweep")
+async def sweep(request: SweepRequest, http_request: Request):
+    """
+    Parameter sweep endpoint. Simulates Configuration A over the Cartesian grid
+    of the requested axes and returns a NumPy .npy structured array with one
+    column per axis and per output, rows in C order of the axes. The file is
+    written as the grid is evaluated, a slice at a time, so the full array is
+    never held in memory; if a slice fails the body ends short of its
+    Content-Length.
+    """
+    try:
+        base_params, axes = prepare_sweep(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = sweep_size(axes)
+    dtype = sweep_dtype([name for name, _ in axes])
+    header = npy_header(dtype, total)
+
+    def chunk_jobs():
+        for start in range(0, total, DEFAULT_CHUNK_SIZE):
+            stop = min(start + DEFAULT_CHUNK_SIZE, total)
+            yield lambda start=start, stop=stop: run_in_pool(
+                run_sweep_rows, base_params, request.v_v_percent, axes, start, stop)
+
+    async def content():
+        yield header
+        async for rows in run_ordered(chunk_jobs(), max(solver_pool.max_workers, 1),
+                                      http_request.is_disconnected):
+            yield rows
+
+    return StreamingResponse(
+        content(),
+        media_type='application/octet-stream',
+        headers={
+            'Content-Disposition': 'attachment; filename="sweep.npy"',
+            'Content-Length': str(len(header) + total * dtype.itemsize),
+            'X-Sweep-Shape': ','.join(str(len(values)) for _, values in axes)
+        }
+    )
+
+
+def _stream_format(fmt: str) -> str:
+    if fmt not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of {', '.join(STREAM_FORMATS)}.")
+    return fmt
+
+
+@app.post("/api/v1/sweep/stream")
+async def sweep_stream(request: SweepRequest, http_request: Request, format: str = 'ndjson'):
+    """
+    Streaming sweep endpoint. Emits one 'chunk' event per evaluated slice of the
+    grid (columnar, with its start row) followed by a 'progress' event, as NDJSON
+    or Server-Sent Events. Stops computing when the client disconnects.
+    """
+    fmt = _stream_format(format)
+    try:
+        base_params, axes = prepare_sweep(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    total = sweep_size(axes)
+    chunk_size = request.chunk_size
+
+    def chunk_jobs():
+        for start in range(0, total, chunk_size):
+            stop = min(start + chunk_size, total)
+            yield lambda start=start, stop=stop: run_in_pool(
+                run_sweep_chunk, base_params, request.v_v_percent, axes, start, stop)
+
+    async def events():
+        yield format_event('start', {'total': total, 'shape': [len(values) for _, values in axes]}, fmt)
+        done = 0
+        try:
+            async for columns in run_ordered(chunk_jobs(), max(solver_pool.max_workers, 1),
+                                             http_request.is_disconnected):
+                size = len(next(iter(columns.values())))
+                yield format_event('chunk', {'start': done, 'columns': columns}, fmt)
+                done += size
+                yield format_event('progress', {'done': done, 'total': total}, fmt)
+        except HTTPException as e:
+            yield format_event('error', {'status': e.status_code, 'detail': e.detail}, fmt)
+            return
+        except Exception as e:
+            yield format_event('error', {'status': 500, 'detail': f"An unexpected error occurred: {str(e)}"}, fmt)
+            return
+        yield format_event('end', {'done': done, 'total': total}, fmt)
+
+    return StreamingResponse(events(), media_type=STREAM_FORMATS[fmt])
+
+
+@app.post("/api/v1/solve/batch/stream")
+async def solve_batch_stream(request: BatchSolveRequest, http_request: Request, format: str = 'ndjson'):
+    """
+    Streaming batch endpoint. Emits a 'result' event per case (with its input
+    index and result or error) as soon as its chunk is solved, plus 'progress'
+    events, as NDJSON or Server-Sent Events. Stops when the client disconnects.
+    """
+    fmt = _stream_format(format)
+    cases = request.cases
+    chunk_size = BATCH_STREAM_CHUNK_SIZE
+
+    def chunk_jobs():
+        for start in range(0, len(cases), chunk_size):
+            yield lambda start=start: run_batch_chunk(cases[start:start + chunk_size], start)
+
+    async def events():
+        yield format_event('start', {'total': len(cases)}, fmt)
+        done = 0
+        async for results in run_ordered(chunk_jobs(), max(solver_pool.max_workers, 1),
+                                         http_request.is_disconnected):
+            for result in results:
+                yield format_event('result', jsonable_encoder(result), fmt)
+            done += len(results)
+            yield format_event('progress', {'done': done, 'total': len(cases)}, fmt)
+        yield format_event('end', {'done': done, 'total': len(cases)}, fmt)
+
+    return StreamingResponse(events(), media_type=STREAM_FORMATS[fmt])
+
+
+@app.post("/api/v1/uncertainty")
+async def uncertainty(request: UncertaintyRequest):
+    """
+    Uncertainty endpoint. Draws `samples` values of the uncertain inputs around
+    the nominal operating point of Configuration A (solved from the parameters
+    unless given) and returns the nominal value, mean, standard deviation and
+    percentiles of raffinate Cu, recovery, loaded organic and strip O/A.
+    The same seed gives the same result; the response carries the seed used.
+    """
+    if request.mode not in SOLVE_MODES:
+        raise HTTPException(status_code=400, detail=INVALID_MODE_MESSAGE)
+
+    try:
+        result = await run_in_pool(run_uncertainty, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    return JSONResponse(jsonable_encoder(result))
+
+
+@app.post("/api/v1/transient")
+async def transient(request: TransientRequest):
+    """
+    Dynamic simulation endpoint. Starts Configuration A at steady state,
+    applies the step changes of the inputs and returns how the stage outlets
+    follow through the mixer and settler holdups, decimated to `points`
+    samples. A step value may be a list, one value per scenario; all
+    scenarios are integrated together.
+    """
+    try:
+        result = await run_in_pool(run_transient, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    return JSONResponse(result)
+
+
+def _run_store() -> RunStore:
+    if run_store is None:
+        raise HTTPException(status_code=404, detail="The run store is not enabled. Set SIMSXCU_RUN_STORE_PATH.")
+    return run_store
+
+
+@app.post("/api/v1/runs/query")
+def query_runs(request: RunQuery):
+    """
+    Stored solves with the indexed fields (PLS_flow, PLS_Cu, PLS_Ac, O_A_Ext,
+    v_v_percent) within the given ranges, newest first, with their inputs,
+    results, diagnostics and solve time. A plain function, so FastAPI runs it in
+    its thread pool: the query waits for queued writes and reads SQLite.
+    """
+    store = _run_store()
+    try:
+        runs = store.query(request.ranges, request.mode, request.config, request.success,
+                           request.limit, request.offset)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(jsonable_encoder({'runs': runs}))
+
+
+@app.post("/api/v1/runs/nearest")
+def nearest_runs(request: NearestRunsRequest):
+    """
+    The k stored solves closest to a point of the indexed fields (each field
+    scaled by its range over the matching runs), nearest first. Runs in the
+    thread pool, like query_runs.
+    """
+    store = _run_store()
+    try:
+        runs = store.nearest(request.point, request.k, request.mode, request.config, request.success)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JSONResponse(jsonable_encoder({'runs': runs}))
+
+
+@app.get("/api/v1/runs/export")
+async def export_runs(format: str = 'csv', mode: Optional[str] = None, config: Optional[str] = None,
+                      success: Optional[bool] = None):
+    """
+    Streams every stored solve (optionally of one mode, configuration or
+    outcome) as CSV or NDJSON, oldest first.
+    """
+    store = _run_store()
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Must be one of {', '.join(EXPORT_FORMATS)}.")
+    media_type = 'text/csv' if format == 'csv' else STREAM_FORMATS['ndjson']
+    return StreamingResponse(store.export(format, mode=mode, config_id=config, success=success),
+                             media_type=media_type,
+                             headers={'Content-Disposition': f'attachment; filename="runs.{format}"'})
+
+
+def session_changes(message: Dict, inputs: Dict) -> Dict[str, float]:
+    """
+    Validates the inputs of a session 'set' message; raises ValueError.
+    """
+    changes = message.get('inputs')
+    if not isinstance(changes, dict):
+        raise ValueError("A 'set' message needs an 'inputs' object.")
+    for name, value in changes.items():
+        if name not in inputs:
+            raise ValueError(f"Unknown input '{name}'.")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Input '{name}' must be a number.")
+    return changes
+
+
+def run_session_solve(inputs: Dict) -> Dict:
+    """
+    Solves Option 1 for a what-if session on the ConfigurationA_2Ex1S stage chain
+    the session evaluates, so a solution moves the session's own stages.
+    """
+    validated_params = DesignerParams(**inputs)
+    return solver.solve_option1(config.option1_least_squares, [validated_params.initial_vv_guess],
+                                SOLVE_BOUNDS['designer'], CircuitState.from_params(validated_params.dict()),
+                                jac=True, residual=config.option1_balance, warm_start=False, squared=True)
+
+
+@app.websocket("/api/v1/session")
+async def what_if_session(websocket: WebSocket):
+    """
+    What-if session for Configuration A. The circuit state (designer inputs and
+    v_v_percent) stays on the server, and each stage is a node of a dependency
+    graph, so a change only recomputes the stages after it.
+
+    Client messages: {"type": "set", "inputs": {...}} changes inputs, and
+    {"type": "solve"} solves Option 1 for the current inputs and moves
+    v_v_percent to the solution. Bursts of messages are coalesced (see
+    SIMSXCU_SESSION_DEBOUNCE_MS). The server sends a 'state' event on connect,
+    then a 'delta' event per update with only the changed inputs and values,
+    and 'error' events for invalid messages and failed solves; the session
+    carries on after an error.
+    """
+    await websocket.accept()
+    defaults = DesignerParams().dict()
+    defaults['v_v_percent'] = defaults.pop('initial_vv_guess')
+    session = CircuitSession(config, defaults)
+    messages: asyncio.Queue = asyncio.Queue()
+
+    async def receive():
+        try:
+            while True:
+                await messages.put(await websocket.receive_text())
+        except WebSocketDisconnect:
+            await messages.put(None)
+
+    reader = asyncio.ensure_future(receive())
+    sequence = 0
+    try:
+        await websocket.send_json(event_message('state', session.state()))
+        closed = False
+        while not closed:
+            batch = await coalesce(messages, SESSION_DEBOUNCE_SECONDS, SESSION_MAX_DELAY_SECONDS)
+            changes, solve = {}, False
+            for text in batch:
+                if text is None:
+                    closed = True
+                    continue
+                try:
+                    message = json.loads(text)
+                    if not isinstance(message, dict) or message.get('type') not in ('set', 'solve'):
+                        raise ValueError("Messages must be {'type': 'set', 'inputs': {...}} or {'type': 'solve'}.")
+                    if message['type'] == 'set':
+                        changes.update(session_changes(message, session.inputs))
+                    else:
+                        solve = True
+                except ValueError as e:
+                    await websocket.send_json(event_message('error', {'detail': str(e)}))
+            if closed:
+                break
+
+            updates = []
+            if changes:
+                updates.append((session.update(changes), {}))
+            if solve:
+                inputs = session.inputs
+                inputs['initial_vv_guess'] = inputs.pop('v_v_percent')
+                try:
+                    result = await run_in_pool(run_session_solve, inputs)
+                except HTTPException as e:
+                    await websocket.send_json(event_message('error', {'detail': str(e.detail)}))
+                except Exception as e:
+                    await websocket.send_json(event_message('error', {'detail': f"An unexpected error occurred: {str(e)}"}))
+                else:
+                    summary = {'success': bool(result['success']), 'v_v_percent': float(result['v_v_percent']),
+                               'objective_value': float(result['objective_value']), 'message': str(result['message'])}
+                    # A failed solve leaves the inputs as they are
+                    moved = {'v_v_percent': summary['v_v_percent']} if summary['success'] else {}
+                    updates.append((session.update(moved), {'solve': summary}))
+            for delta, extra in updates:
+                sequence += 1
+                await websocket.send_json(event_message('delta', dict(delta, seq=sequence, coalesced=len(batch), **extra)))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        reader.cancel()
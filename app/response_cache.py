@@ -0,0 +1,99 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class SolveResultCache:
+    """
+    TTL + LRU cache of solve results for identical requests.
+
+    Keys are a canonical hash of the mode, configuration and validated parameters, so
+    requests that differ only in key order or omitted defaults share an entry.
+    Concurrent misses for the same key are coalesced: the first caller starts
+    the solve as a task of its own and every caller, the first included, awaits
+    it, so a caller that goes away (e.g. a client disconnect) does not cancel
+    the solve for the others. Failed solves (an exception, or a result without
+    success) are not cached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(mode: str, params: Dict, config_id: str = 'A', trace: bool = False) -> str:
+        # Numbers are compared as floats so an explicit 400 matches a default of 400.0.
+        params = {name: float(value) if isinstance(value, (int, float)) else value
+                  for name, value in params.items()}
+        # Traced results are cached separately so untraced responses stay small
+        key = [mode, config_id, params] + (['trace'] if trace else [])
+        canonical = json.dumps(key, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Returns the cached result for key, or None if missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: str, result: Dict):
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def get_or_solve(self, key: str, solve: Callable[[], Awaitable[Dict]]) -> Dict:
+        """
+        Returns a cached result, joins an in-flight solve for the same key,
+        or starts solve() and caches its result if it succeeded.
+        """
+        result = self.get(key)
+        if result is not None:
+            self.hits += 1
+            return result
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            inflight = self._inflight[key] = asyncio.ensure_future(self._solve(key, solve))
+            # Retrieves the exception of a solve whose callers all went away
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+        # Cancelling a caller only stops its own wait
+        return await asyncio.shield(inflight)
+
+    async def _solve(self, key: str, solve: Callable[[], Awaitable[Dict]]) -> Dict:
+        try:
+            result = await solve()
+            if result.get('success'):
+                self.put(key, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def info(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl
+        }
@@ -0,0 +1,303 @@
+import csv
+import io
+import json
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Operating parameters with their own indexed column: the PLS inputs common to
+# both modes and the solved extractant v/v%.
+INDEXED_FIELDS = ('PLS_flow', 'PLS_Cu', 'PLS_Ac', 'O_A_Ext', 'v_v_percent')
+EXPORT_FORMATS = ('csv', 'ndjson')
+# Queue markers besides the (key, row) runs: write now, and write then stop.
+_FLUSH = 'flush'
+_STOP = 'stop'
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = (('id', 'created', 'mode', 'config') + INDEXED_FIELDS
+            + ('success', 'objective_value', 'iterations', 'solve_seconds', 'params', 'result'))
+_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        created REAL NOT NULL,
+        mode TEXT NOT NULL,
+        config TEXT NOT NULL,
+        {', '.join(f'{field} REAL' for field in INDEXED_FIELDS)},
+        success INTEGER NOT NULL,
+        objective_value REAL,
+        iterations INTEGER,
+        solve_seconds REAL,
+        params TEXT NOT NULL,
+        result TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS runs_created ON runs (created)",
+] + [f"CREATE INDEX IF NOT EXISTS runs_{field} ON runs ({field})" for field in INDEXED_FIELDS]
+_INSERT = (f"INSERT OR REPLACE INTO runs (key, {', '.join(_COLUMNS[1:])}) "
+           f"VALUES ({', '.join('?' * len(_COLUMNS))})")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class RunStore:
+    """
+    Persistent SQLite store of solved cases: inputs, result, solver
+    diagnostics and solve time, keyed like SolveResultCache.
+
+    add() only queues the run; a writer thread inserts queued runs in one
+    transaction per batch (batch_size runs, or whatever arrived within
+    flush_interval seconds). Queued runs are already visible to get(). The
+    database is in WAL mode, so reads do not wait for the writer and several
+    worker processes can share one file. The operating parameters in
+    INDEXED_FIELDS have indexed columns for range and nearest queries.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._reader = self._connect()
+        with self._reader:
+            for statement in _SCHEMA:
+                self._reader.execute(statement)
+        self._read_lock = threading.Lock()
+        self._pending: Dict[str, Tuple] = {}
+        self._pending_lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='run-store-writer', daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    # --- Writes ---
+
+    def add(self, key: str, mode: str, config_id: str, params: Mapping, result: Mapping,
+            solve_seconds: Optional[float] = None):
+        """
+        Queues a solved case for writing; a later run with the same key replaces it.
+        """
+        row = (
+            time.time(), mode, config_id,
+            *(_number(result.get(field, params.get(field))) for field in INDEXED_FIELDS),
+            int(bool(result.get('success'))), _number(result.get('objective_value')),
+            _number(result.get('iterations')), solve_seconds,
+            json.dumps(params, sort_keys=True, default=_json_default),
+            json.dumps(result, default=_json_default),
+        )
+        with self._pending_lock:
+            self._pending[key] = row
+        self._queue.put((key, row))
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while isinstance(item, tuple) and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                batch.append(item)
+            runs = [entry for entry in batch if isinstance(entry, tuple)]
+            try:
+                if runs:
+                    with connection:
+                        connection.executemany(_INSERT, [(key,) + row for key, row in runs])
+            except Exception:
+                # The writer must outlive a failed batch, or every later add()
+                # would pile up in _pending and flush() would never return
+                logger.exception("Could not write %d runs to %s; they are dropped", len(runs), self.path)
+            finally:
+                with self._pending_lock:
+                    for key, row in runs:
+                        if self._pending.get(key) is row:
+                            del self._pending[key]
+                for _ in batch:
+                    self._queue.task_done()
+            if batch[-1] == _STOP:
+                connection.close()
+                return
+
+    def flush(self):
+        """
+        Blocks until every queued run is written.
+        """
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        """
+        Writes the queued runs and stops the writer.
+        """
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._reader.close()
+
+    # --- Reads ---
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        The stored result for key, or None.
+        """
+        with self._pending_lock:
+            row = self._pending.get(key)
+        if row is not None:
+            return json.loads(row[-1])
+        with self._read_lock:
+            found = self._reader.execute('SELECT result FROM runs WHERE key = ?', (key,)).fetchone()
+        return json.loads(found[0]) if found is not None else None
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._read_lock:
+            return self._reader.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    @staticmethod
+    def _where(ranges: Optional[Mapping[str, Sequence[Optional[float]]]] = None, mode: Optional[str] = None,
+               config_id: Optional[str] = None, success: Optional[bool] = None) -> Tuple[str, List]:
+        clauses, args = [], []
+        for field, (low, high) in (ranges or {}).items():
+            if field not in INDEXED_FIELDS:
+                raise ValueError(f"Unknown run field '{field}'. Must be one of {', '.join(INDEXED_FIELDS)}.")
+            if low is not None:
+                clauses.append(f'{field} >= ?')
+                args.append(low)
+            if high is not None:
+                clauses.append(f'{field} <= ?')
+                args.append(high)
+        for column, value in (('mode', mode), ('config', config_id), ('success', success)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                args.append(int(value) if column == 'success' else value)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    @staticmethod
+    def _run(row: Sequence) -> Dict:
+        run = dict(zip(_COLUMNS, row))
+        run['success'] = bool(run['success'])
+        run['params'] = json.loads(run['params'])
+        run['result'] = json.loads(run['result'])
+        return run
+
+    def query(self, ranges: Optional[Mapping[str, Sequence[Optional[float]]]] = None, mode: Optional[str] = None,
+              config_id: Optional[str] = None, success: Optional[bool] = None,
+              limit: int = 100, offset: int = 0) -> List[Dict]:
+        """
+        Stored runs with every field of `ranges` within its (low, high) bounds
+        (None for open), newest first.
+        """
+        self.flush()
+        where, args = self._where(ranges, mode, config_id, success)
+        with self._read_lock:
+            rows = self._reader.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM runs{where} ORDER BY created DESC, id DESC LIMIT ? OFFSET ?",
+                args + [limit, offset]).fetchall()
+        return [self._run(row) for row in rows]
+
+    def nearest(self, point: Mapping[str, float], k: int = 5, mode: Optional[str] = None,
+                config_id: Optional[str] = None, success: Optional[bool] = None) -> List[Dict]:
+        """
+        The k stored runs closest to `point` (values of some INDEXED_FIELDS),
+        with each field scaled by its range over the runs that match the filters;
+        nearest first, with their 'distance'. Candidates are read through the index of the first field, in
+        a window around the point that widens until it holds k runs closer than
+        its half-width, so the result is exact.
+        """
+        if not point:
+            raise ValueError("A nearest query needs at least one field.")
+        fields = list(point)
+        unknown = [field for field in fields if field not in INDEXED_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown run field '{unknown[0]}'. Must be one of {', '.join(INDEXED_FIELDS)}.")
+        matching, args = self._where(None, mode, config_id, success)
+        matching += (' AND ' if matching else ' WHERE ') + ' AND '.join(f'{field} IS NOT NULL' for field in fields)
+        where = f'{matching} AND {fields[0]} BETWEEN ? AND ?'
+        self.flush()
+        with self._read_lock:
+            bounds = self._reader.execute(
+                'SELECT ' + ', '.join(f'{bound}({field})' for field in fields for bound in ('MIN', 'MAX'))
+                + f' FROM runs{matching}', args).fetchone()
+        lows, highs = np.array(bounds[0::2], dtype=float), np.array(bounds[1::2], dtype=float)
+        if np.isnan(lows).any():
+            return []
+        scale = highs - lows
+        scale[scale == 0] = 1.0
+        target = np.array([point[field] for field in fields], dtype=float)
+
+        extent = max(abs(target[0] - lows[0]), abs(highs[0] - target[0]))
+        half_width = scale[0] / 64
+        while True:
+            with self._read_lock:
+                rows = self._reader.execute(f"SELECT id, {', '.join(fields)} FROM runs{where}",
+                                            args + [target[0] - half_width, target[0] + half_width]).fetchall()
+            values = np.array(rows, dtype=float).reshape(len(rows), len(fields) + 1)
+            distances = np.sqrt((((values[:, 1:] - target) / scale) ** 2).sum(axis=1))
+            order = np.argsort(distances, kind='stable')[:k]
+            if half_width >= extent or (len(order) == k and distances[order[-1]] <= half_width / scale[0]):
+                break
+            half_width *= 4
+
+        ids = [rows[i][0] for i in order]
+        with self._read_lock:
+            found = self._reader.execute(f"SELECT {', '.join(_COLUMNS)} FROM runs WHERE id IN "
+                                         f"({', '.join('?' * len(ids))})", ids).fetchall()
+        runs = {row[0]: self._run(row) for row in found}
+        return [dict(runs[rows[i][0]], distance=float(distances[i])) for i in order]
+
+    def export(self, fmt: str = 'csv', ranges: Optional[Mapping[str, Sequence[Optional[float]]]] = None,
+               mode: Optional[str] = None, config_id: Optional[str] = None,
+               success: Optional[bool] = None, chunk_size: int = 1000) -> Iterator[str]:
+        """
+        Yields the matching runs, oldest first, as CSV (params and result as
+        JSON columns) or NDJSON text, a chunk of rows at a time.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format. Must be one of {', '.join(EXPORT_FORMATS)}.")
+        self.flush()
+        where, args = self._where(ranges, mode, config_id, success)
+        # Own connection: the export is read in chunks while other reads go on
+        connection = self._connect()
+        try:
+            cursor = connection.execute(f"SELECT {', '.join(_COLUMNS)} FROM runs{where} ORDER BY id", args)
+            if fmt == 'csv':
+                yield ','.join(_COLUMNS) + '\r\n'
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                if fmt == 'csv':
+                    buffer = io.StringIO()
+                    csv.writer(buffer).writerows(rows)
+                    yield buffer.getvalue()
+                else:
+                    yield ''.join(json.dumps(self._run(row)) + '\n' for row in rows)
+        finally:
+            connection.close()
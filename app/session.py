@@ -0,0 +1,109 @@
+import math
+import time
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+from .simulation_engine import ConfigurationA_2Ex1S
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+class DependencyGraph:
+    """
+    Input values and computed nodes, each a function of inputs and earlier
+    nodes. An update recomputes only the nodes downstream of a changed value,
+    and stops at nodes whose value comes out unchanged.
+    """
+
+    def __init__(self, inputs: Mapping[str, float]):
+        self.values: Dict[str, float] = {name: float(value) for name, value in inputs.items()}
+        self.inputs = tuple(inputs)
+        # Insertion order is a topological order: a node is added after its dependencies
+        self._nodes: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, dependencies: Sequence[str], compute: Callable[..., float]):
+        unknown = [dependency for dependency in dependencies if dependency not in self.values]
+        if unknown:
+            raise ValueError(f"Node '{name}' depends on unknown {', '.join(unknown)}.")
+        self._nodes[name] = (compute, tuple(dependencies))
+        self.values[name] = float(compute(*(self.values[dependency] for dependency in dependencies)))
+
+    def update(self, changes: Mapping[str, float]) -> Tuple[Dict[str, float], List[str]]:
+        """
+        Sets input values and recomputes what depends on them. Returns the values
+        that changed (inputs and nodes) and the names of the recomputed nodes.
+        """
+        unknown = [name for name in changes if name not in self.inputs]
+        if unknown:
+            raise ValueError(f"Unknown input {', '.join(unknown)}.")
+        changed = {}
+        for name, value in changes.items():
+            value = float(value)
+            if not _same(value, self.values[name]):
+                self.values[name] = changed[name] = value
+
+        recomputed = []
+        for node, (compute, dependencies) in self._nodes.items():
+            if not any(dependency in changed for dependency in dependencies):
+                continue
+            value = float(compute(*(self.values[dependency] for dependency in dependencies)))
+            recomputed.append(node)
+            if not _same(value, self.values[node]):
+                self.values[node] = changed[node] = value
+        return changed, recomputed
+
+
+class CircuitSession:
+    """
+    What-if state of one Configuration A circuit: the designer inputs plus
+    v_v_percent, and every stage of ConfigurationA_2Ex1S.simulate as a node of
+    a DependencyGraph, so changing an input only recomputes the stages after it.
+    """
+
+    def __init__(self, config: ConfigurationA_2Ex1S, inputs: Mapping[str, float]):
+        sim = config.sim
+        graph = self.graph = DependencyGraph(inputs)
+        graph.add('LO', ('v_v_percent', 'SR'), lambda v_v_percent, SR: sim.calculate_AML(v_v_percent) * SR / 100)
+        graph.add('C1Cuor_Ext', ('PLS_Cu', 'PLS_Ac', 'v_v_percent', 'Mef1e', 'O_A_Ext', 'LO'),
+                  config.calculate_C1Cuor_Ext)
+        graph.add('C2Cuor_Ext', ('PLS_Cu', 'PLS_Ac', 'v_v_percent', 'Mef1e', 'Mef2e', 'O_A_Ext', 'LO', 'C1Cuor_Ext'),
+                  config.calculate_C2Cuor_Ext)
+        graph.add('raffinate_E1', ('PLS_Cu', 'PLS_Ac', 'v_v_percent', 'C1Cuor_Ext', 'Mef1e'),
+                  config.calculate_raffinate_E1)
+        graph.add('raffinate_E2', ('PLS_Cu', 'PLS_Ac', 'v_v_percent', 'C2Cuor_Ext', 'Mef2e', 'raffinate_E1'),
+                  config.calculate_raffinate_E2)
+        graph.add('O_A_str', ('AD_Cu', 'SP_Cu', 'LO', 'C2Cuor_Ext', 'O_A_Ext', 'PLS_Cu', 'PLS_Ac',
+                              'v_v_percent', 'Mef1e', 'Mef2e', 'C1Cuor_Ext'),
+                  config.calculate_O_A_str)
+        graph.add('C1Cuor_Str', ('SP_Cu', 'SP_Ac', 'v_v_percent', 'LO', 'Mef1s', 'O_A_str', 'AD_Cu'),
+                  config.calculate_C1Cuor_Str)
+        graph.add('extraction_recovery', ('PLS_Cu', 'raffinate_E2'), sim.extraction_recovery)
+        graph.add('loaded_organic', ('C2Cuor_Ext',), lambda C2Cuor_Ext: C2Cuor_Ext)
+        graph.add('net_transfer', ('C2Cuor_Ext', 'C1Cuor_Str', 'v_v_percent'), sim.net_transfer)
+
+    @property
+    def inputs(self) -> Dict[str, float]:
+        return {name: self.graph.values[name] for name in self.graph.inputs}
+
+    def state(self) -> Dict:
+        """
+        All inputs and stage values.
+        """
+        values = self.graph.values
+        return {'inputs': self.inputs,
+                'values': {name: value for name, value in values.items() if name not in self.graph.inputs}}
+
+    def update(self, changes: Mapping[str, float]) -> Dict:
+        """
+        Applies input changes and returns the delta: changed inputs, changed stage
+        values, the recomputed stages and the compute time.
+        """
+        started = time.perf_counter()
+        changed, recomputed = self.graph.update(changes)
+        return {
+            'inputs': {name: value for name, value in changed.items() if name in self.graph.inputs},
+            'values': {name: value for name, value in changed.items() if name not in self.graph.inputs},
+            'recomputed': recomputed,
+            'compute_ms': (time.perf_counter() - started) * 1000
+        }
@@ -1,7 +1,295 @@
+import importlib
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, wait
 import numpy as np
-import pandas as pd
-from scipy.optimize import minimize, fsolve
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+
+
+def _mask_nonfinite(values: np.ndarray) -> np.ndarray:
+    """
+    Replace inf/-inf with NaN so callers only have one invalid marker to test for
+    """
+    return np.where(np.isfinite(values), values, np.nan)
+
+
+def _all_arrays(*values) -> bool:
+    """
+    True when no value is a scalar (or 0-d array). NumPy squares scalars with
+    libm's pow but arrays exactly, so the compiled kernels, which always
+    multiply, reproduce it only for arrays.
+    """
+    return all(np.ndim(value) for value in values)
+
+
+def _isotherm_inner_term(v_v_percent: np.ndarray, C_org: np.ndarray, term1: np.ndarray) -> np.ndarray:
+    """
+    Loading term of the isotherms: term1 * (3.303 v - 3.0842 C_org)^2 / C_org.
+    """
+    term2 = (3.303 * v_v_percent - 3.0842 * C_org) ** 2 / C_org
+    return term1 * term2
+
+
+def _solve_equilibrium_quadratic(Cu, Ac, v_v_percent: np.ndarray, C_org: np.ndarray,
+                                 term1: np.ndarray) -> np.ndarray:
+    """
+    Shared root of the extraction/stripping isotherm quadratic.
+    Must be called inside an np.errstate block; term1 is the isotherm-specific factor.
+    """
+    Cu = np.asarray(Cu, dtype=float)
+    Ac = np.asarray(Ac, dtype=float)
+
+    inner_term = _isotherm_inner_term(v_v_percent, C_org, term1)
+
+    A = -1.299 * Ac - 2 * Cu - 0.422 * inner_term
+    discriminant = A ** 2 - 4 * (0.644 * Ac + Cu) ** 2
+    B = np.where(discriminant >= 0, discriminant, np.nan) ** 0.5
+
+    C_aq = (-A - B) / 2
+    return _mask_nonfinite(C_aq)
+
+
+def _equilibrium_quadratic_partials(Cu, Ac, v_v_percent: np.ndarray, C_org: np.ndarray,
+                                    term1: np.ndarray, dterm1_dv: np.ndarray,
+                                    dterm1_dC: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Value and partial derivatives of the isotherm quadratic root.
+    Returns (C_aq, dC_aq/dCu, dC_aq/dAc, dC_aq/dv, dC_aq/dC_org).
+    Must be called inside an np.errstate block.
+    """
+    Cu = np.asarray(Cu, dtype=float)
+    Ac = np.asarray(Ac, dtype=float)
+
+    u = 3.303 * v_v_percent - 3.0842 * C_org
+    term2 = u ** 2 / C_org
+    dterm2_dv = 2 * u * 3.303 / C_org
+    dterm2_dC = -2 * u * 3.0842 / C_org - term2 / C_org
+    inner_term = term1 * term2
+
+    A = -1.299 * Ac - 2 * Cu - 0.422 * inner_term
+    dA_dv = -0.422 * (dterm1_dv * term2 + term1 * dterm2_dv)
+    dA_dC = -0.422 * (dterm1_dC * term2 + term1 * dterm2_dC)
+
+    P = 0.644 * Ac + Cu
+    discriminant = A ** 2 - 4 * P ** 2
+    B = np.where(discriminant >= 0, discriminant, np.nan) ** 0.5
+
+    # d(C_aq) = (-dA - dB) / 2 with dB = (A * dA - 4 * P * dP) / B
+    C_aq = _mask_nonfinite((-A - B) / 2)
+    dC_dCu = _mask_nonfinite((2 - (A * -2 - 4 * P) / B) / 2)
+    dC_dAc = _mask_nonfinite((1.299 - (A * -1.299 - 4 * P * 0.644) / B) / 2)
+    dC_dv = _mask_nonfinite((-dA_dv - A * dA_dv / B) / 2)
+    dC_dC = _mask_nonfinite((-dA_dC - A * dA_dC / B) / 2)
+    return C_aq, dC_dCu, dC_dAc, dC_dv, dC_dC
+
+
+class StatsCounter(dict):
+    """
+    Cumulative diagnostic counters (name -> value). Increments made with add()
+    are also credited to every record() block open in the calling thread, so
+    one call's counts can be measured while other threads share the counters.
+    """
+
+    _lock = threading.Lock()
+    _local = threading.local()
+
+    def add(self, **increments):
+        with StatsCounter._lock:
+            for name, value in increments.items():
+                self[name] = self.get(name, 0) + value
+        for counts in getattr(StatsCounter._local, 'records', ()):
+            for name, value in increments.items():
+                counts[name] = counts.get(name, 0) + value
+
+    @staticmethod
+    @contextmanager
+    def record():
+        """
+        Yields a dict that collects every add() made by this thread in the block
+        """
+        counts: Dict[str, float] = {}
+        records = StatsCounter._local.__dict__.setdefault('records', [])
+        records.append(counts)
+        try:
+            yield counts
+        finally:
+            records.remove(counts)
+
+
+class EquilibriumCache:
+    """
+    Bounded LRU memo for scalar equilibrium evaluations.
+
+    Inputs are quantized to multiples of `tolerance` before being used as a key,
+    so operating points closer than the tolerance share one cached value.
+    tolerance=0 keys on the exact floats. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 65536, tolerance: float = 0.0):
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _key(self, name: str, args: Tuple[float, ...]) -> Tuple:
+        if self.tolerance > 0:
+            return (name,) + tuple(round(arg / self.tolerance) for arg in args)
+        return (name,) + tuple(float(arg) for arg in args)
+
+    def get_or_compute(self, name: str, args: Tuple[float, ...], compute: Callable):
+        key = self._key(name, args)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute(*args)
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def info(self) -> Dict:
+        """
+        Hit/miss counters and current size
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'tolerance': self.tolerance
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class IsothermTable:
+    """
+    Precomputed McCabe-Thiele isotherm for a fixed acid and v/v% setting.
+
+    The closed-form isotherm C_aq = f(Cu_feed, C_org) is sampled once on a
+    uniform (Cu_feed, C_org) grid with a single vectorized call, then queried
+    by bilinear interpolation. Both axes are uniform, so locating a cell is
+    O(1) arithmetic and a lookup costs a handful of multiply-adds per point.
+
+    Error bound: for a function with bounded second derivatives the bilinear
+    error is at most (hx^2 * max|f_xx| + hy^2 * max|f_yy|) / 8 and peaks near
+    cell centres. max_error is that peak measured at every cell centre during
+    construction; halving both grid spacings cuts it by about 4x, except next to
+    the undefined region, where the isotherm's slope is unbounded and the peak
+    error shrinks more slowly. Cells with a NaN corner (undefined isotherm)
+    interpolate to NaN.
+    """
+
+    def __init__(self, isotherm: Callable, acid: float, v_v_percent: float,
+                 cu_range: Tuple[float, float], org_range: Tuple[float, float],
+                 n_cu: int = 129, n_org: int = 257):
+        self.acid = acid
+        self.v_v_percent = v_v_percent
+        self.cu_range = cu_range
+        self.org_range = org_range
+        self.cu_grid = np.linspace(cu_range[0], cu_range[1], n_cu)
+        self.org_grid = np.linspace(org_range[0], org_range[1], n_org)
+        self._cu_step = self.cu_grid[1] - self.cu_grid[0]
+        self._org_step = self.org_grid[1] - self.org_grid[0]
+
+        self.values = isotherm(self.cu_grid[:, None], acid, v_v_percent, self.org_grid[None, :])
+        self._flat_values = self.values.ravel()
+        # Plain-float copies for the scalar lookup path
+        self._rows = self.values.tolist()
+        self._cu_origin = float(self.cu_grid[0])
+        self._org_origin = float(self.org_grid[0])
+        self._last_cu_cell = n_cu - 2
+        self._last_org_cell = n_org - 2
+
+        cu_mid = (self.cu_grid[:-1] + self.cu_grid[1:]) / 2
+        org_mid = (self.org_grid[:-1] + self.org_grid[1:]) / 2
+        exact = isotherm(cu_mid[:, None], acid, v_v_percent, org_mid[None, :])
+        interpolated = self.evaluate(cu_mid[:, None], org_mid[None, :])
+        errors = np.abs(interpolated - exact)
+        self.max_error = float(np.nanmax(errors)) if np.isfinite(errors).any() else float('nan')
+
+    def contains_point(self, Cu: float, C_org: float) -> bool:
+        """
+        Scalar version of contains
+        """
+        return (self.cu_range[0] <= Cu <= self.cu_range[1]
+                and self.org_range[0] <= C_org <= self.org_range[1])
+
+    def evaluate_point(self, Cu: float, C_org: float) -> float:
+        """
+        Scalar version of evaluate using plain float arithmetic, which avoids the
+        per-call overhead of NumPy on 0-d arrays.
+        """
+        fx = (Cu - self._cu_origin) / self._cu_step
+        fy = (C_org - self._org_origin) / self._org_step
+        i = min(max(int(math.floor(fx)), 0), self._last_cu_cell)
+        j = min(max(int(math.floor(fy)), 0), self._last_org_cell)
+        tx = fx - i
+        ty = fy - j
+
+        row, next_row = self._rows[i], self._rows[i + 1]
+        lower = row[j] + ty * (row[j + 1] - row[j])
+        upper = next_row[j] + ty * (next_row[j + 1] - next_row[j])
+        return lower + tx * (upper - lower)
+
+    def contains(self, Cu, C_org) -> np.ndarray:
+        """
+        Mask of points inside the tabulated range
+        """
+        Cu = np.asarray(Cu, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        return ((Cu >= self.cu_range[0]) & (Cu <= self.cu_range[1])
+                & (C_org >= self.org_range[0]) & (C_org <= self.org_range[1]))
+
+    def evaluate(self, Cu, C_org) -> np.ndarray:
+        """
+        Interpolated C_aq for broadcastable arrays of feed Cu and organic Cu.
+        Points outside the grid are clamped to the edge cell; check contains() first.
+        """
+        Cu = np.asarray(Cu, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+
+        fx = (Cu - self.cu_grid[0]) / self._cu_step
+        fy = (C_org - self.org_grid[0]) / self._org_step
+        i = np.clip(np.floor(fx).astype(np.intp), 0, len(self.cu_grid) - 2)
+        j = np.clip(np.floor(fy).astype(np.intp), 0, len(self.org_grid) - 2)
+        tx = fx - i
+        ty = fy - j
+
+        n_org = len(self.org_grid)
+        corner = i * n_org + j
+        f = self._flat_values
+        lower = f.take(corner) + ty * (f.take(corner + 1) - f.take(corner))
+        upper = f.take(corner + n_org) + ty * (f.take(corner + n_org + 1) - f.take(corner + n_org))
+        return lower + tx * (upper - lower)
+
 
 class SimSXCu:
     """
@@ -32,49 +320,264 @@ class SimSXCu:
         }
 
         self.extractant = "Lix984N"
+        self.cache: Optional[EquilibriumCache] = None
+        self.isotherm_tables: Optional[OrderedDict] = None
+        self._tables_lock = threading.Lock()
+        self.kernels = None
+        # Kernel invocations and operating points evaluated (cache hits excluded)
+        self.stats = StatsCounter(equilibrium_calls=0, equilibrium_points=0)
+
+    def __getstate__(self):
+        # Locks cannot be pickled (e.g. when sent to a process pool); a fresh one is made on load.
+        # Kernel modules are pickled by name and imported again.
+        state = self.__dict__.copy()
+        del state['_tables_lock']
+        if self.kernels is not None:
+            state['kernels'] = self.kernels.__name__
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._tables_lock = threading.Lock()
+        if self.kernels is not None:
+            self.kernels = importlib.import_module(self.kernels)
+
+    # --- Compiled kernels ---
+
+    def use_kernels(self, kernels):
+        """
+        Evaluate array isotherms, and the ConfigurationA_2Ex1S stage chain and
+        balance, with compiled kernels (app.kernels.select()); None restores the
+        NumPy code. Only all-array isotherm calls are compiled: scalar calls keep
+        NumPy's scalar semantics, which the cache and tables also rely on. The
+        compiled objectives evaluate the whole stage chain in one call, so they
+        bypass the equilibrium cache and isotherm tables.
+        """
+        self.kernels = kernels
+
+    # --- Memoization ---
+
+    def enable_cache(self, maxsize: int = 65536, tolerance: float = 0.0) -> EquilibriumCache:
+        """
+        Turn on memoization of the scalar equilibrium functions
+        Inputs are quantized to `tolerance` when building keys; see EquilibriumCache.
+        """
+        self.cache = EquilibriumCache(maxsize=maxsize, tolerance=tolerance)
+        return self.cache
+
+    def disable_cache(self):
+        self.cache = None
+
+    def cache_info(self) -> Optional[Dict]:
+        """
+        Hit/miss counters of the equilibrium cache, or None when it is disabled
+        """
+        return self.cache.info() if self.cache is not None else None
+
+    def _cached(self, name: str, compute: Callable, *args):
+        if self.cache is None or any(np.ndim(arg) for arg in args):
+            return compute(*args)
+        return self.cache.get_or_compute(name, args, compute)
+
+    # --- Isotherm tables ---
+
+    def enable_isotherm_tables(self, maxsize: int = 64, n_cu: int = 129, n_org: int = 257,
+                               extraction_cu_range: Tuple[float, float] = (0.0, 10.0),
+                               stripping_cu_range: Tuple[float, float] = (0.0, 80.0)):
+        """
+        Turn on table mode for scalar equilibrium evaluations
+        Scalar points inside the table range are interpolated from a cached
+        IsothermTable (see its error bound); other points use the closed form.
+        Array calls always use the closed form, which vectorizes at least as fast
+        as a table lookup. Tables are kept per reagent, isotherm, acid and v/v% in
+        an LRU of `maxsize` entries, so table mode pays off when v/v% is fixed
+        (stage stepping, repeated simulation), not when a solver varies it.
+        """
+        self.isotherm_tables = OrderedDict()
+        self._table_settings = {
+            'maxsize': maxsize, 'n_cu': n_cu, 'n_org': n_org,
+            'cu_range': {'extraction': extraction_cu_range, 'stripping': stripping_cu_range}
+        }
+
+    def disable_isotherm_tables(self):
+        self.isotherm_tables = None
+
+    def isotherm_table(self, kind: str, acid: float, v_v_percent: float) -> IsothermTable:
+        """
+        Cached table of the 'extraction' or 'stripping' isotherm at a fixed acid and v/v%
+        The organic axis spans up to 1.2x the AML for that v/v%.
+        """
+        if self.isotherm_tables is None:
+            self.enable_isotherm_tables()
+        key = (self.extractant, kind, float(acid), float(v_v_percent))
+        with self._tables_lock:
+            table = self.isotherm_tables.get(key)
+            if table is not None:
+                self.isotherm_tables.move_to_end(key)
+                return table
+
+        settings = self._table_settings
+        isotherm = (self._extraction_equilibrium_closed_form if kind == 'extraction'
+                    else self._stripping_equilibrium_closed_form)
+        max_org = 1.2 * float(self.calculate_AML_array(v_v_percent))
+        table = IsothermTable(isotherm, acid, v_v_percent,
+                              cu_range=settings['cu_range'][kind],
+                              org_range=(max_org / settings['n_org'], max_org),
+                              n_cu=settings['n_cu'], n_org=settings['n_org'])
+        with self._tables_lock:
+            self.isotherm_tables[key] = table
+            if len(self.isotherm_tables) > settings['maxsize']:
+                self.isotherm_tables.popitem(last=False)
+        return table
+
+    def _tabulated(self, kind: str, closed_form: Callable, Cu, Ac, v_v_percent, C_org) -> np.ndarray:
+        if (self.isotherm_tables is None or np.ndim(Cu) or np.ndim(Ac)
+                or np.ndim(v_v_percent) or np.ndim(C_org)):
+            return self._counted(closed_form(Cu, Ac, v_v_percent, C_org))
+        table = self.isotherm_table(kind, Ac, v_v_percent)
+        if table.contains_point(Cu, C_org):
+            return self._counted(np.asarray(table.evaluate_point(Cu, C_org)))
+        return self._counted(closed_form(Cu, Ac, v_v_percent, C_org))
+
+    def _counted(self, result):
+        self._count(1, np.size(result[0] if isinstance(result, tuple) else result))
+        return result
+
+    def _count(self, calls: int, points: int):
+        self.stats.add(equilibrium_calls=calls, equilibrium_points=points)
 
     def calculate_AML(self, v_v_percent: float) -> float:
         """
         Calculate AML (Maximum loaded when free acid concentration in PLS is zero)
         AML = 0.4108 * (v/v%)^1.1
         """
-        return 0.4108 * (v_v_percent ** 1.1)
+        return float(self.calculate_AML_array(v_v_percent))
 
     def extraction_equilibrium(self, PLS_Cu: float, PLS_Ac: float, v_v_percent: float, C_org: float) -> float:
         """
         Calculate extraction equilibrium using the complex formula from Excel
         This represents the relationship between aqueous and organic copper concentrations
         """
-        term1 = -28.511 * (v_v_percent ** -1.746) * C_org + 11.711 * (v_v_percent ** -0.646)
-        term2 = (3.303 * v_v_percent - 3.0842 * C_org) ** 2 / C_org
-        inner_term = term1 * term2
-
-        A = -1.299 * PLS_Ac - 2 * PLS_Cu - 0.422 * inner_term
-        B = ((A ** 2) - 4 * ((0.644 * PLS_Ac + PLS_Cu) ** 2)) ** 0.5
-
-        C_aq = (-A - B) / 2
-        return C_aq
+        return float(self._cached('extraction', self.extraction_equilibrium_array,
+                                  PLS_Cu, PLS_Ac, v_v_percent, C_org))
 
     def stripping_equilibrium(self, SP_Cu: float, SP_Ac: float, v_v_percent: float, C_org: float) -> float:
         """
         Calculate stripping equilibrium using the formula from Excel
         """
-        term1 = (4.8579/1000 * v_v_percent - 0.19183) * C_org + 11.365 * (v_v_percent ** -0.85)
-        term2 = (3.303 * v_v_percent - 3.0842 * C_org) ** 2 / C_org
-        inner_term = term1 * term2
-
-        A = -1.299 * SP_Ac - 2 * SP_Cu - 0.422 * inner_term
-        B = ((A ** 2) - 4 * ((0.644 * SP_Ac + SP_Cu) ** 2)) ** 0.5
-
-        C_aq = (-A - B) / 2
-        return C_aq
+        return float(self._cached('stripping', self.stripping_equilibrium_array,
+                                  SP_Cu, SP_Ac, v_v_percent, C_org))
 
     def calculate_ML(self, PLS_Cu: float, PLS_Ac: float, v_v_percent: float, C_org: float) -> float:
         """
         Calculate ML (Maximum loaded - value of copper concentration in organic phase in steady state with PLS)
         """
-        equilibrium_term = self.extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org)
-        return (PLS_Ac ** 2 / PLS_Cu) - equilibrium_term
+        return float(self.calculate_ML_array(PLS_Cu, PLS_Ac, v_v_percent, C_org))
+
+    # --- Array kernels ---
+    # The methods below accept scalars or broadcastable NumPy arrays and evaluate
+    # every operating point in a single call. Points where the closed-form
+    # isotherm is undefined (negative discriminant, C_org == 0) come back as NaN.
+
+    def calculate_AML_array(self, v_v_percent) -> np.ndarray:
+        """
+        Array version of calculate_AML
+        """
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return _mask_nonfinite(0.4108 * v_v_percent ** 1.1)
+
+    def extraction_equilibrium_array(self, PLS_Cu, PLS_Ac, v_v_percent, C_org) -> np.ndarray:
+        """
+        Array version of extraction_equilibrium
+        """
+        return self._tabulated('extraction', self._extraction_equilibrium_closed_form,
+                               PLS_Cu, PLS_Ac, v_v_percent, C_org)
+
+    def _extraction_equilibrium_closed_form(self, PLS_Cu, PLS_Ac, v_v_percent, C_org) -> np.ndarray:
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            if self.kernels is not None and _all_arrays(PLS_Cu, PLS_Ac, v_v_percent, C_org):
+                return self.kernels.extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org,
+                                                           v_v_percent ** -1.746, v_v_percent ** -0.646)
+            term1 = -28.511 * v_v_percent ** -1.746 * C_org + 11.711 * v_v_percent ** -0.646
+            return _solve_equilibrium_quadratic(PLS_Cu, PLS_Ac, v_v_percent, C_org, term1)
+
+    def extraction_loading_term_array(self, v_v_percent, C_org) -> np.ndarray:
+        """
+        Loading term of the extraction isotherm at an organic concentration
+        (the simplified ML model uses PLS_Ac^2 / PLS_Cu minus this term at the AML)
+        """
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            term1 = -28.511 * v_v_percent ** -1.746 * C_org + 11.711 * v_v_percent ** -0.646
+            return _isotherm_inner_term(v_v_percent, C_org, term1)
+
+    def stripping_equilibrium_array(self, SP_Cu, SP_Ac, v_v_percent, C_org) -> np.ndarray:
+        """
+        Array version of stripping_equilibrium
+        """
+        return self._tabulated('stripping', self._stripping_equilibrium_closed_form,
+                               SP_Cu, SP_Ac, v_v_percent, C_org)
+
+    def _stripping_equilibrium_closed_form(self, SP_Cu, SP_Ac, v_v_percent, C_org) -> np.ndarray:
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            if self.kernels is not None and _all_arrays(SP_Cu, SP_Ac, v_v_percent, C_org):
+                return self.kernels.stripping_equilibrium(SP_Cu, SP_Ac, v_v_percent, C_org,
+                                                          v_v_percent ** -0.85)
+            term1 = (4.8579 / 1000 * v_v_percent - 0.19183) * C_org + 11.365 * v_v_percent ** -0.85
+            return _solve_equilibrium_quadratic(SP_Cu, SP_Ac, v_v_percent, C_org, term1)
+
+    def calculate_ML_array(self, PLS_Cu, PLS_Ac, v_v_percent, C_org) -> np.ndarray:
+        """
+        Array version of calculate_ML
+        """
+        PLS_Cu = np.asarray(PLS_Cu, dtype=float)
+        PLS_Ac = np.asarray(PLS_Ac, dtype=float)
+        equilibrium_term = self.extraction_equilibrium_array(PLS_Cu, PLS_Ac, v_v_percent, C_org)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return _mask_nonfinite(PLS_Ac ** 2 / PLS_Cu - equilibrium_term)
+
+    def extraction_equilibrium_partials(self, PLS_Cu, PLS_Ac, v_v_percent, C_org) -> Tuple[np.ndarray, ...]:
+        """
+        Extraction equilibrium and its exact partial derivatives
+        Returns (C_aq, dC_aq/dPLS_Cu, dC_aq/dPLS_Ac, dC_aq/dv_v_percent, dC_aq/dC_org)
+        """
+        return self._cached('extraction_partials', self._extraction_equilibrium_partials,
+                            PLS_Cu, PLS_Ac, v_v_percent, C_org)
+
+    def _extraction_equilibrium_partials(self, PLS_Cu, PLS_Ac, v_v_percent, C_org) -> Tuple[np.ndarray, ...]:
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            term1 = -28.511 * v_v_percent ** -1.746 * C_org + 11.711 * v_v_percent ** -0.646
+            dterm1_dv = (-28.511 * -1.746 * v_v_percent ** -2.746 * C_org
+                         + 11.711 * -0.646 * v_v_percent ** -1.646)
+            dterm1_dC = -28.511 * v_v_percent ** -1.746
+            return self._counted(_equilibrium_quadratic_partials(PLS_Cu, PLS_Ac, v_v_percent, C_org,
+                                                                 term1, dterm1_dv, dterm1_dC))
+
+    def stripping_equilibrium_partials(self, SP_Cu, SP_Ac, v_v_percent, C_org) -> Tuple[np.ndarray, ...]:
+        """
+        Stripping equilibrium and its exact partial derivatives
+        Returns (C_aq, dC_aq/dSP_Cu, dC_aq/dSP_Ac, dC_aq/dv_v_percent, dC_aq/dC_org)
+        """
+        return self._cached('stripping_partials', self._stripping_equilibrium_partials,
+                            SP_Cu, SP_Ac, v_v_percent, C_org)
+
+    def _stripping_equilibrium_partials(self, SP_Cu, SP_Ac, v_v_percent, C_org) -> Tuple[np.ndarray, ...]:
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+        C_org = np.asarray(C_org, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            term1 = (4.8579 / 1000 * v_v_percent - 0.19183) * C_org + 11.365 * v_v_percent ** -0.85
+            dterm1_dv = 4.8579 / 1000 * C_org + 11.365 * -0.85 * v_v_percent ** -1.85
+            dterm1_dC = 4.8579 / 1000 * v_v_percent - 0.19183
+            return self._counted(_equilibrium_quadratic_partials(SP_Cu, SP_Ac, v_v_percent, C_org,
+                                                                 term1, dterm1_dv, dterm1_dC))
 
     def extraction_recovery(self, PLS_Cu: float, raffinate_Cu: float) -> float:
         """
@@ -94,6 +597,57 @@ class SimSXCu:
         """
         return (loaded_organic_Cu - stripped_organic_Cu) / v_v_percent
 
+
+# Operating-point values of a circuit (DesignerParams / MetallurgistParams without the initial guesses)
+CIRCUIT_FIELDS = (
+    'PLS_flow', 'PLS_Cu', 'PLS_Ac', 'SR', 'O_A_Ext', 'Mef1e', 'Mef2e', 'SP_Cu', 'SP_Ac',
+    'AD_Cu', 'Mef1s', 'ML_plant', 'raffinate_Cu_target', 'stripped_organic_Cu_target'
+)
+
+
+class CircuitState(Mapping):
+    """
+    Fixed parameters of one solve as slot attributes (state.PLS_Cu), built once
+    per solve so objective evaluations read attributes instead of dict keys.
+    Values may be floats or broadcastable arrays, one entry per case of a batch.
+    Fields the mode does not define are left unset. Also a read-only mapping,
+    so code written against a params dict keeps working.
+    """
+
+    __slots__ = CIRCUIT_FIELDS
+
+    def __init__(self, **values):
+        for name, value in values.items():
+            setattr(self, name, value)
+
+    @classmethod
+    def from_params(cls, params) -> "CircuitState":
+        """
+        State for a params dict (keys outside CIRCUIT_FIELDS are ignored).
+        A CircuitState is returned unchanged.
+        """
+        if isinstance(params, CircuitState):
+            return params
+        return cls(**{name: params[name] for name in CIRCUIT_FIELDS if name in params})
+
+    def __getitem__(self, name: str):
+        try:
+            if name in CIRCUIT_FIELDS:
+                return getattr(self, name)
+        except AttributeError:
+            pass
+        raise KeyError(name)
+
+    def __iter__(self):
+        return (name for name in CIRCUIT_FIELDS if hasattr(self, name))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CircuitState({', '.join(f'{name}={value!r}' for name, value in self.items())})"
+
+
 class ConfigurationA_2Ex1S:
     """
     Configuration A: Series 2Ex1S (2 Extraction stages, 1 Stripping stage)
@@ -103,7 +657,7 @@ class ConfigurationA_2Ex1S:
         self.sim = sim_engine
         self.name = "Series 2Ex1S"
 
-    def option1_objective(self, x: List[float], params: Dict) -> float:
+    def option1_objective(self, x: List[float], params: Mapping) -> float:
         """
         Objective function for Option 1 - Find optimum extractant volume percentage
         x[0] = v/v%
@@ -111,17 +665,17 @@ class ConfigurationA_2Ex1S:
         v_v_percent = x[0]
 
         # Extract parameters
-        PLS_flow = params['PLS_flow']
-        PLS_Cu = params['PLS_Cu']
-        PLS_Ac = params['PLS_Ac']
-        SR = params['SR']
-        O_A_Ext = params['O_A_Ext']
-        Mef1e = params['Mef1e']
-        Mef2e = params['Mef2e']
-        SP_Cu = params['SP_Cu']
-        SP_Ac = params['SP_Ac']
-        AD_Cu = params['AD_Cu']
-        Mef1s = params['Mef1s']
+        state = CircuitState.from_params(params)
+        PLS_Cu = state.PLS_Cu
+        PLS_Ac = state.PLS_Ac
+        SR = state.SR
+        O_A_Ext = state.O_A_Ext
+        Mef1e = state.Mef1e
+        Mef2e = state.Mef2e
+        SP_Cu = state.SP_Cu
+        SP_Ac = state.SP_Ac
+        AD_Cu = state.AD_Cu
+        Mef1s = state.Mef1s
 
         # Calculate intermediate values
         AML = self.sim.calculate_AML(v_v_percent)
@@ -142,7 +696,7 @@ class ConfigurationA_2Ex1S:
 
         return abs(objective)
 
-    def option2_objective(self, x: List[float], params: Dict) -> float:
+    def option2_objective(self, x: List[float], params: Mapping) -> float:
         """
         Objective function for Option 2 - Find plant parameters
         x[0] = v/v%, x[1] = saturation ratio, x[2] = mixer efficiency 1, x[3] = mixer efficiency 2
@@ -153,15 +707,15 @@ class ConfigurationA_2Ex1S:
         Mef2e = x[3]
 
         # Extract fixed parameters
-        PLS_flow = params['PLS_flow']
-        PLS_Cu = params['PLS_Cu']
-        PLS_Ac = params['PLS_Ac']
-        O_A_Ext = params['O_A_Ext']
-        ML_plant = params['ML_plant']
-        SP_Cu = params['SP_Cu']
-        SP_Ac = params['SP_Ac']
-        AD_Cu = params['AD_Cu']
-        Mef1s = params['Mef1s']
+        state = CircuitState.from_params(params)
+        PLS_Cu = state.PLS_Cu
+        PLS_Ac = state.PLS_Ac
+        O_A_Ext = state.O_A_Ext
+        ML_plant = state.ML_plant
+        SP_Cu = state.SP_Cu
+        SP_Ac = state.SP_Ac
+        AD_Cu = state.AD_Cu
+        Mef1s = state.Mef1s
 
         # Calculate values
         AML = self.sim.calculate_AML(v_v_percent)
@@ -181,18 +735,242 @@ class ConfigurationA_2Ex1S:
 
         # Multiple objectives
         obj1 = ML_plant - self.sim.calculate_ML(PLS_Cu, PLS_Ac, v_v_percent, C1Cuor_Ext)
-        obj2 = raffinate_E2 - params['raffinate_Cu_target']
-        obj3 = C1Cuor_Str - params['stripped_organic_Cu_target']
+        obj2 = raffinate_E2 - state.raffinate_Cu_target
+        obj3 = C1Cuor_Str - state.stripped_organic_Cu_target
 
         return abs(obj1) + abs(obj2) + abs(obj3)
 
+    # --- Smooth objectives with exact gradients ---
+    # The least-squares forms below replace the abs() objectives for gradient-based
+    # solvers. Gradients are propagated forward through the stage chain using the
+    # analytic isotherm partials, so SLSQP does not need finite differences.
+
+    def option1_residual(self, x: List[float], params: Mapping) -> Tuple[float, np.ndarray]:
+        """
+        Signed Option 1 balance residual and its gradient with respect to x = [v/v%]
+        """
+        v_v_percent = x[0]
+        state = CircuitState.from_params(params)
+        SR = state.SR
+        kernels = self.sim.kernels
+        if kernels is not None:
+            self.sim._count(3, 3)
+            residual, gradient = kernels.option1_residual(
+                kernels.v_powers(v_v_percent), *self._kernel_fields(state),
+                float(state.Mef1e), float(state.Mef2e), float(SR), float(v_v_percent), 2.0
+            )
+            return residual, gradient
+
+        AML = self.sim.calculate_AML(v_v_percent)
+        LO = AML * SR / 100
+        dLO = np.array([0.4108 * 1.1 * v_v_percent ** 0.1 * SR / 100])
+        zero = np.zeros(1)
+
+        chain = self._stage_chain_with_tangents(
+            state, v_v_percent, np.ones(1), LO, dLO,
+            state.Mef1e, zero, state.Mef2e, zero, with_raffinate=False
+        )
+        Mef1s = state.Mef1s
+        C1Cuor_Str, dC1Cuor_Str = chain['C1Cuor_Str']
+        C2Cuor_Ext, dC2Cuor_Ext = chain['C2Cuor_Ext']
+
+        residual = (C1Cuor_Str * Mef1s / 100 + LO * (1 - Mef1s / 100)) - C2Cuor_Ext
+        gradient = dC1Cuor_Str * Mef1s / 100 + dLO * (1 - Mef1s / 100) - dC2Cuor_Ext
+        return float(residual), gradient
+
+    def option1_balance(self, v_v_percent, params: Mapping) -> np.ndarray:
+        """
+        Signed Option 1 balance residual for root finding.
+        Vectorized over v_v_percent and params.
+        """
+        state = CircuitState.from_params(params)
+        kernels = self.sim.kernels
+        fields = (state.PLS_Cu, state.PLS_Ac, state.O_A_Ext, state.Mef1e, state.Mef2e,
+                  state.SP_Cu, state.SP_Ac, state.AD_Cu, state.Mef1s)
+        if kernels is not None and _all_arrays(v_v_percent, state.SR, *fields):
+            v_v_percent = np.asarray(v_v_percent, dtype=float)
+            LO = self.sim.calculate_AML_array(v_v_percent) * state.SR / 100
+            powers = kernels.v_powers(v_v_percent, 3)
+            balance = kernels.option1_balance(*fields, v_v_percent, LO,
+                                              powers[..., 0], powers[..., 1], powers[..., 2])
+            self.sim._count(3, 3 * np.size(balance))
+            return balance
+        results = self.simulate(v_v_percent, state)
+        Mef1s = state.Mef1s
+        return (results['C1Cuor_Str'] * Mef1s / 100 + results['LO'] * (1 - Mef1s / 100)) - results['C2Cuor_Ext']
+
+    def option1_least_squares(self, x: List[float], params: Mapping) -> Tuple[float, np.ndarray]:
+        """
+        Smooth Option 1 objective: squared balance residual and its exact gradient
+        """
+        residual, gradient = self.option1_residual(x, params)
+        return residual ** 2, 2 * residual * gradient
+
+    def option2_residuals(self, x: List[float], params: Mapping) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Option 2 residuals [ML, raffinate, stripped organic] and their 3x4 Jacobian
+        with respect to x = [v/v%, SR, Mef1e, Mef2e]
+        """
+        v_v_percent, SR, Mef1e, Mef2e = x[0], x[1], x[2], x[3]
+        state = CircuitState.from_params(params)
+        ML_plant = state.ML_plant
+        kernels = self.sim.kernels
+        if kernels is not None:
+            self.sim._count(5, 5)
+            return kernels.option2_residuals(
+                kernels.v_powers(v_v_percent), *self._kernel_fields(state), float(ML_plant),
+                float(state.raffinate_Cu_target), float(state.stripped_organic_Cu_target),
+                float(v_v_percent), float(SR), float(Mef1e), float(Mef2e), 2.0
+            )
+        unit = np.eye(4)
+
+        LO = ML_plant * SR / 100
+        chain = self._stage_chain_with_tangents(
+            state, v_v_percent, unit[0], LO, unit[1] * ML_plant / 100,
+            Mef1e, unit[2], Mef2e, unit[3], with_raffinate=True
+        )
+        # calculate_ML(PLS_Cu, PLS_Ac, v, C1Cuor_Ext) = PLS_Ac^2 / PLS_Cu - E(PLS_Cu, PLS_Ac, v, C1Cuor_Ext)
+        E_C1, dE_C1 = chain['E_C1Cuor_Ext']
+        raffinate_E2, draffinate_E2 = chain['raffinate_E2']
+        C1Cuor_Str, dC1Cuor_Str = chain['C1Cuor_Str']
+        ML = state.PLS_Ac ** 2 / state.PLS_Cu - E_C1
+
+        residuals = np.array([
+            ML_plant - ML,
+            raffinate_E2 - state.raffinate_Cu_target,
+            C1Cuor_Str - state.stripped_organic_Cu_target
+        ], dtype=float)
+        jacobian = np.vstack([dE_C1, draffinate_E2, dC1Cuor_Str])
+        return residuals, jacobian
+
+    def option2_least_squares(self, x: List[float], params: Mapping) -> Tuple[float, np.ndarray]:
+        """
+        Smooth Option 2 objective: sum of squared residuals and its exact gradient
+        """
+        residuals, jacobian = self.option2_residuals(x, params)
+        return float(residuals @ residuals), 2 * residuals @ jacobian
+
+    def option2_window_residuals(self, x: List[float], params: Mapping) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Option 2 residuals of n operating records sharing one x = [v/v%, SR, Mef1e, Mef2e],
+        e.g. a window of plant history. Values in params are arrays with one value
+        per record, or scalars shared by all records. Returns the 3n residuals,
+        record by record, and their (3n, 4) Jacobian.
+        """
+        v_v_percent, SR, Mef1e, Mef2e = x[0], x[1], x[2], x[3]
+        state = CircuitState.from_params(params)
+        # Records along the first axis, the four tangent directions along the second
+        records = CircuitState(**{name: np.reshape(np.asarray(state[name], dtype=float), (-1, 1))
+                                   for name in state})
+        ML_plant = records.ML_plant
+        unit = np.eye(4)
+
+        LO = ML_plant * SR / 100
+        chain = self._stage_chain_with_tangents(
+            records, v_v_percent, unit[0], LO, unit[1] * ML_plant / 100,
+            Mef1e, unit[2], Mef2e, unit[3], with_raffinate=True
+        )
+        E_C1, dE_C1 = chain['E_C1Cuor_Ext']
+        raffinate_E2, draffinate_E2 = chain['raffinate_E2']
+        C1Cuor_Str, dC1Cuor_Str = chain['C1Cuor_Str']
+        ML = records.PLS_Ac ** 2 / records.PLS_Cu - E_C1
+
+        residuals = np.concatenate(np.broadcast_arrays(
+            ML_plant - ML,
+            raffinate_E2 - records.raffinate_Cu_target,
+            C1Cuor_Str - records.stripped_organic_Cu_target
+        ), axis=1)
+        jacobian = np.stack(np.broadcast_arrays(dE_C1, draffinate_E2, dC1Cuor_Str), axis=1)
+        return residuals.ravel(), jacobian.reshape(-1, 4)
+
+    def _stage_chain_with_tangents(self, state: CircuitState, v_v_percent: float, dv: np.ndarray,
+                                   LO: float, dLO: np.ndarray, Mef1e: float, dMef1e: np.ndarray,
+                                   Mef2e: float, dMef2e: np.ndarray,
+                                   with_raffinate: bool) -> Dict[str, Tuple[float, np.ndarray]]:
+        """
+        Evaluates the Configuration A stage chain with the same formulas as the
+        calculate_* methods, carrying each intermediate's gradient along with it.
+        """
+        PLS_Cu = state.PLS_Cu
+        PLS_Ac = state.PLS_Ac
+        O_A_Ext = state.O_A_Ext
+        SP_Cu = state.SP_Cu
+        SP_Ac = state.SP_Ac
+        AD_Cu = state.AD_Cu
+        Mef1s = state.Mef1s
+        ext = self.sim.extraction_equilibrium_partials
+        chain = {}
+
+        # calculate_C1Cuor_Ext
+        E, _, _, E_v, E_C = ext(PLS_Cu, PLS_Ac, v_v_percent, LO)
+        dE = E_v * dv + E_C * dLO
+        C1 = LO + E * Mef1e / 100 / O_A_Ext
+        dC1 = dLO + (dE * Mef1e + E * dMef1e) / 100 / O_A_Ext
+        chain['C1Cuor_Ext'] = (C1, dC1)
+
+        # calculate_C2Cuor_Ext
+        raffinate_E1 = PLS_Cu - (C1 - LO) * O_A_Ext
+        draffinate_E1 = -(dC1 - dLO) * O_A_Ext
+        E, E_cu, _, E_v, E_C = ext(raffinate_E1, PLS_Ac, v_v_percent, LO)
+        dE = E_cu * draffinate_E1 + E_v * dv + E_C * dLO
+        C2 = C1 + E * Mef2e / 100 / O_A_Ext
+        dC2 = dC1 + (dE * Mef2e + E * dMef2e) / 100 / O_A_Ext
+        chain['C2Cuor_Ext'] = (C2, dC2)
+
+        if with_raffinate:
+            # calculate_raffinate_E1 / calculate_raffinate_E2
+            E, _, _, E_v, E_C = ext(PLS_Cu, PLS_Ac, v_v_percent, C1)
+            dE = E_v * dv + E_C * dC1
+            chain['E_C1Cuor_Ext'] = (E, dE)
+            R1 = E * Mef1e / 100 + PLS_Cu * (1 - Mef1e / 100)
+            dR1 = (dE * Mef1e + E * dMef1e) / 100 - PLS_Cu * dMef1e / 100
+            chain['raffinate_E1'] = (R1, dR1)
+
+            E, E_cu, _, E_v, E_C = ext(R1, PLS_Ac, v_v_percent, C2)
+            dE = E_cu * dR1 + E_v * dv + E_C * dC2
+            R2 = E * Mef2e / 100 + R1 * (1 - Mef2e / 100)
+            dR2 = (dE * Mef2e + E * dMef2e) / 100 + dR1 * (1 - Mef2e / 100) - R1 * dMef2e / 100
+            chain['raffinate_E2'] = (R2, dR2)
+
+        # calculate_O_A_str
+        copper_to_strip = LO - C2
+        copper_transfer = AD_Cu - SP_Cu
+        if np.ndim(copper_to_strip):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                stripping = copper_to_strip != 0
+                O_A_str = np.where(stripping, copper_transfer / copper_to_strip, 1.0)
+                dO_A_str = np.where(stripping, -copper_transfer / copper_to_strip ** 2 * (dLO - dC2), 0.0)
+        elif copper_to_strip != 0:
+            O_A_str = copper_transfer / copper_to_strip
+            dO_A_str = -copper_transfer / copper_to_strip ** 2 * (dLO - dC2)
+        else:
+            O_A_str, dO_A_str = 1.0, np.zeros_like(dv)
+        chain['O_A_str'] = (O_A_str, dO_A_str)
+
+        # calculate_C1Cuor_Str
+        S, _, _, S_v, S_C = self.sim.stripping_equilibrium_partials(SP_Cu, SP_Ac, v_v_percent, LO)
+        dS = S_v * dv + S_C * dLO
+        C1_str = LO - S * Mef1s / 100 * O_A_str
+        dC1_str = dLO - Mef1s / 100 * (dS * O_A_str + S * dO_A_str)
+        chain['C1Cuor_Str'] = (C1_str, dC1_str)
+
+        return chain
+
+    @staticmethod
+    def _kernel_fields(state: CircuitState) -> Tuple[float, ...]:
+        """
+        The circuit fields every compiled objective takes, in kernel argument order
+        """
+        return (float(state.PLS_Cu), float(state.PLS_Ac), float(state.O_A_Ext), float(state.SP_Cu),
+                float(state.SP_Ac), float(state.AD_Cu), float(state.Mef1s))
+
     def calculate_C1Cuor_Ext(self, PLS_Cu: float, PLS_Ac: float, v_v_percent: float,
                            Mef1e: float, O_A_Ext: float, LO: float) -> float:
         """
         Calculate copper in organic after first extraction stage
         """
         # Simplified calculation - would need full formula from Excel
-        C_eq = self.sim.extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, LO)
+        C_eq = self._extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, LO)
         transfer = C_eq * Mef1e / 100
         C_org = LO + transfer / O_A_Ext
         return C_org
@@ -205,7 +983,7 @@ class ConfigurationA_2Ex1S:
         """
         # Simplified calculation
         raffinate_E1 = PLS_Cu - (C1Cuor_Ext - LO) * O_A_Ext
-        C_eq = self.sim.extraction_equilibrium(raffinate_E1, PLS_Ac, v_v_percent, LO)
+        C_eq = self._extraction_equilibrium(raffinate_E1, PLS_Ac, v_v_percent, LO)
         transfer = C_eq * Mef2e / 100
         C_org = C1Cuor_Ext + transfer / O_A_Ext
         return C_org
@@ -219,6 +997,9 @@ class ConfigurationA_2Ex1S:
         # Mass balance approach
         copper_to_strip = LO - C2Cuor_Ext
         copper_transfer = AD_Cu - SP_Cu
+        if np.ndim(copper_to_strip):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(copper_to_strip != 0, copper_transfer / copper_to_strip, 1.0)
         O_A_str = copper_transfer / copper_to_strip if copper_to_strip != 0 else 1.0
         return O_A_str
 
@@ -228,7 +1009,7 @@ class ConfigurationA_2Ex1S:
         Calculate copper in organic after stripping
         """
         # Simplified calculation
-        C_eq = self.sim.stripping_equilibrium(SP_Cu, SP_Ac, v_v_percent, LO)
+        C_eq = self._stripping_equilibrium(SP_Cu, SP_Ac, v_v_percent, LO)
         transfer = C_eq * Mef1s / 100
         C_org = LO - transfer * O_A_str
         return C_org
@@ -238,7 +1019,7 @@ class ConfigurationA_2Ex1S:
         """
         Calculate raffinate after first extraction
         """
-        C_eq = self.sim.extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org)
+        C_eq = self._extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org)
         raffinate = C_eq * Mef1e / 100 + PLS_Cu * (1 - Mef1e / 100)
         return raffinate
 
@@ -247,63 +1028,651 @@ class ConfigurationA_2Ex1S:
         """
         Calculate raffinate after second extraction
         """
-        C_eq = self.sim.extraction_equilibrium(raffinate_E1, PLS_Ac, v_v_percent, C_org)
+        C_eq = self._extraction_equilibrium(raffinate_E1, PLS_Ac, v_v_percent, C_org)
         raffinate = C_eq * Mef2e / 100 + raffinate_E1 * (1 - Mef2e / 100)
         return raffinate
 
+    # The stage methods above accept arrays as well as floats: scalar inputs go
+    # through SimSXCu's scalar path (cache, tables), arrays through its kernels.
+
+    def _extraction_equilibrium(self, PLS_Cu, PLS_Ac, v_v_percent, C_org):
+        if np.ndim(PLS_Cu) or np.ndim(PLS_Ac) or np.ndim(v_v_percent) or np.ndim(C_org):
+            return self.sim.extraction_equilibrium_array(PLS_Cu, PLS_Ac, v_v_percent, C_org)
+        return self.sim.extraction_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org)
+
+    def _stripping_equilibrium(self, SP_Cu, SP_Ac, v_v_percent, C_org):
+        if np.ndim(SP_Cu) or np.ndim(SP_Ac) or np.ndim(v_v_percent) or np.ndim(C_org):
+            return self.sim.stripping_equilibrium_array(SP_Cu, SP_Ac, v_v_percent, C_org)
+        return self.sim.stripping_equilibrium(SP_Cu, SP_Ac, v_v_percent, C_org)
+
+    def simulate(self, v_v_percent, params: Mapping, plant_loading: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Forward simulation of the circuit at a given v/v% (no optimization)
+        v_v_percent and any value in params may be a broadcastable array, so a
+        whole grid of operating points is evaluated in one pass.
+        With plant_loading=True the loaded organic is ML_plant * SR / 100, as in
+        Option 2, instead of AML * SR / 100.
+        """
+        state = CircuitState.from_params(params)
+        PLS_Cu = np.asarray(state.PLS_Cu, dtype=float)
+        PLS_Ac = state.PLS_Ac
+        O_A_Ext = state.O_A_Ext
+        Mef1e = state.Mef1e
+        Mef2e = state.Mef2e
+        v_v_percent = np.asarray(v_v_percent, dtype=float)
+
+        if plant_loading:
+            LO = np.asarray(state.ML_plant, dtype=float) * state.SR / 100
+        else:
+            LO = self.sim.calculate_AML_array(v_v_percent) * state.SR / 100
+        C1Cuor_Ext = self.calculate_C1Cuor_Ext(PLS_Cu, PLS_Ac, v_v_percent, Mef1e, O_A_Ext, LO)
+        C2Cuor_Ext = self.calculate_C2Cuor_Ext(PLS_Cu, PLS_Ac, v_v_percent, Mef1e, Mef2e, O_A_Ext, LO, C1Cuor_Ext)
+        raffinate_E1 = self.calculate_raffinate_E1(PLS_Cu, PLS_Ac, v_v_percent, C1Cuor_Ext, Mef1e)
+        raffinate_E2 = self.calculate_raffinate_E2(PLS_Cu, PLS_Ac, v_v_percent, C2Cuor_Ext, Mef2e, raffinate_E1)
+        O_A_str = self.calculate_O_A_str(state.AD_Cu, state.SP_Cu, LO, C2Cuor_Ext, O_A_Ext,
+                                         PLS_Cu, PLS_Ac, v_v_percent, Mef1e, Mef2e, C1Cuor_Ext)
+        C1Cuor_Str = self.calculate_C1Cuor_Str(state.SP_Cu, state.SP_Ac, v_v_percent, LO,
+                                               state.Mef1s, O_A_str, state.AD_Cu)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'LO': LO,
+                'C1Cuor_Ext': C1Cuor_Ext,
+                'C2Cuor_Ext': C2Cuor_Ext,
+                'raffinate_E1': raffinate_E1,
+                'raffinate_E2': raffinate_E2,
+                'O_A_str': O_A_str,
+                'C1Cuor_Str': C1Cuor_Str,
+                'extraction_recovery': self.sim.extraction_recovery(PLS_Cu, raffinate_E2),
+                'loaded_organic': C2Cuor_Ext,
+                'net_transfer': self.sim.net_transfer(C2Cuor_Ext, C1Cuor_Str, v_v_percent)
+            }
+
+class SolutionIndex:
+    """
+    Bounded nearest-neighbour index of converged solutions, used for warm starts.
+
+    Solutions are grouped by problem (objective and parameter layout). Inputs are
+    the numeric solve parameters, normalized per feature by their spread in the
+    index, and searched with a KD-tree that is rebuilt lazily after changes.
+    The oldest solutions are dropped beyond max_size per problem. With a path,
+    the index is loaded from and periodically saved to an .npz file.
+    """
+
+    def __init__(self, max_size: int = 10000, path: Optional[str] = None, save_every: int = 100):
+        self.max_size = max_size
+        self.path = path
+        self.save_every = save_every
+        self._entries: Dict[str, deque] = {}
+        self._trees: Dict[str, Tuple] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def add(self, problem: str, features: np.ndarray, solution: np.ndarray):
+        with self._lock:
+            entries = self._entries.setdefault(problem, deque(maxlen=self.max_size))
+            entries.append((np.asarray(features, dtype=float), np.asarray(solution, dtype=float)))
+            self._trees.pop(problem, None)
+            self._unsaved += 1
+            should_save = self.path is not None and self._unsaved >= self.save_every
+        if should_save:
+            self.save()
+
+    def nearest(self, problem: str, features: np.ndarray, k: int = 3) -> List[np.ndarray]:
+        """
+        Solutions of the k stored cases closest to `features`, nearest first.
+        """
+        with self._lock:
+            entries = self._entries.get(problem)
+            if not entries:
+                return []
+            if problem not in self._trees:
+                points = np.array([entry[0] for entry in entries])
+                scale = points.std(axis=0)
+                scale[scale == 0] = 1.0
+                from scipy.spatial import cKDTree
+                self._trees[problem] = (cKDTree(points / scale), scale,
+                                        [entry[1] for entry in entries])
+            tree, scale, solutions = self._trees[problem]
+
+        k = min(k, len(solutions))
+        _, indices = tree.query(np.asarray(features, dtype=float) / scale, k=k)
+        return [solutions[i] for i in np.atleast_1d(indices)]
+
+    def save(self, path: Optional[str] = None):
+        """
+        Writes the index atomically to an .npz file.
+        """
+        path = path or self.path
+        with self._lock:
+            arrays = {}
+            problems = list(self._entries)
+            for number, problem in enumerate(problems):
+                entries = self._entries[problem]
+                arrays[f'features_{number}'] = np.array([entry[0] for entry in entries])
+                arrays[f'solutions_{number}'] = np.array([entry[1] for entry in entries])
+            self._unsaved = 0
+        arrays['problems'] = np.array(json.dumps(problems))
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as handle:
+            np.savez_compressed(handle, **arrays)
+        os.replace(temporary, path)
+
+    def load(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            problems = json.loads(str(data['problems']))
+            with self._lock:
+                for number, problem in enumerate(problems):
+                    entries = deque(zip(data[f'features_{number}'], data[f'solutions_{number}']),
+                                    maxlen=self.max_size)
+                    self._entries[problem] = entries
+                self._trees.clear()
+
+
+class SolverTrace:
+    """
+    Bounded in-memory record of one solve, used as the optimizer callback.
+
+    Keeps the point and objective value (the signed residual for root finding)
+    of the last max_points iterations; older ones are counted as truncated.
+    """
+
+    def __init__(self, method: str, max_points: int = 100):
+        self.method = method
+        self.history = deque(maxlen=max_points)
+        self.iterations = 0
+
+    def __call__(self, intermediate_result):
+        # scipy passes an OptimizeResult to a callback with this parameter name;
+        # older versions pass only the current point.
+        x = getattr(intermediate_result, 'x', intermediate_result)
+        self.record(x, getattr(intermediate_result, 'fun', np.nan))
+
+    def record(self, x, value):
+        self.iterations += 1
+        self.history.append({
+            'iteration': self.iterations,
+            'x': np.atleast_1d(np.asarray(x, dtype=float)).tolist(),
+            'objective': float(value)
+        })
+
+    def report(self, nfev: int, njev: int, status: int, message: str) -> Dict:
+        return {
+            'method': self.method,
+            'nit': self.iterations,
+            'nfev': int(nfev),
+            'njev': int(njev),
+            'status': int(status),
+            'message': str(message),
+            'history': list(self.history),
+            'truncated': self.iterations - len(self.history)
+        }
+
+
 class SolverEngine:
     """
     Solver engine to optimize parameters
+    scipy is imported on first use, so importing this module (and starting an
+    API worker) stays cheap; bracketed root finding needs only NumPy.
     """
 
-    def __init__(self):
+    def __init__(self, solution_index: Optional[SolutionIndex] = None):
         self.method = 'SLSQP'  # Sequential Least Squares Programming
+        # Diagnostics are returned as a SolverTrace on request, never printed
+        self.options = {'ftol': 1e-8, 'disp': False}
+        # Cumulative counters; objective_seconds is the time spent inside objectives
+        self.stats = StatsCounter(solves=0, objective_calls=0, iterations=0, objective_seconds=0.0)
+        # Past converged solutions used to seed new solves (optional)
+        self.solution_index = solution_index
+        # Last solution per problem, only inside a continuation() block
+        self._continuation: Optional[Dict[str, np.ndarray]] = None
+
+    @contextmanager
+    def continuation(self):
+        """
+        Within the block, each warm-started solve may also start from the
+        previous solution of the same problem, e.g. along a batch or sweep.
+        Outside one, a solve never depends on the one solved before it.
+        """
+        previous = self._continuation
+        self._continuation = {}
+        try:
+            yield
+        finally:
+            self._continuation = previous
 
     def solve_option1(self, objective_func, initial_guess: List[float],
-                     bounds: List[Tuple], params: Dict) -> Dict:
+                     bounds: List[Tuple], params: Dict, jac=None, residual=None,
+                     trace: bool = False, warm_start: bool = True, squared: bool = False) -> Dict:
         """
         Solve Option 1: Find optimum extractant volume percentage
+        Pass jac=True when objective_func returns (value, gradient), and
+        squared=True when its value is the squared balance residual (the
+        option1_least_squares objectives): objective_value is then reported as
+        |g|, like the abs() objective and root finding report it.
+        Option 1 is a scalar equation g(v/v%) = 0; when its signed residual g is
+        given, it is solved by bracketed root finding instead of SLSQP.
+        With warm_start=False SLSQP starts exactly at initial_guess; the result's
+        'start' reports where it started. With trace=True the result includes
+        the iteration trace.
         """
-        result = minimize(
-            objective_func,
-            initial_guess,
-            args=(params,),
-            method=self.method,
-            bounds=bounds,
-            options={'ftol': 1e-8, 'disp': True}
-        )
+        if residual is not None and len(bounds) == 1:
+            return self.solve_option1_roots(residual, bounds, params, initial_guess[0], trace=trace)[0]
 
-        return {
+        tracer = SolverTrace(self.method) if trace else None
+        result, start = self._minimize(objective_func, initial_guess, bounds, params, jac, tracer, warm_start)
+
+        report = {
             'success': result.success,
             'v_v_percent': result.x[0],
-            'objective_value': result.fun,
-            'message': result.message
+            'objective_value': float(np.sqrt(result.fun)) if squared else result.fun,
+            'iterations': result.nit,
+            'message': result.message,
+            'start': start
+        }
+        if tracer is not None:
+            report['trace'] = self._trace_report(tracer, result)
+        return report
+
+    def solve_option1_roots(self, residual, bounds: List[Tuple], params: Dict,
+                            initial_guess=None, trace: bool = False) -> List[Dict]:
+        """
+        Solves Option 1 for every case in params at once (values may be arrays of
+        one value per case) and returns one result per case, in the form of
+        solve_option1. Cases without a root in the bracket are reported as failed,
+        at the bracket point with the smallest residual. With trace=True every
+        result carries its own iteration trace.
+        """
+        lower, upper = bounds[0]
+        tracers = None
+        callback = None
+        if trace:
+            tracers = {}
+
+            def callback(x, residual_values, active):
+                for i in np.flatnonzero(active):
+                    tracers.setdefault(i, SolverTrace('ITP')).record(x[i], residual_values[i])
+
+        scan_points = 16
+        root = self.solve_root(self._timed(residual), (lower, upper), params, initial_guess,
+                               scan_points=scan_points, callback=callback)
+        self.stats.add(solves=len(root['x']), iterations=int(root['iterations'].sum()))
+        guesses = np.broadcast_to(np.nan if initial_guess is None else initial_guess, root['x'].shape)
+        results = []
+        for i in range(len(root['x'])):
+            if root['converged'][i]:
+                message = 'Root found by bracketed (ITP) root finding'
+            elif not root['bracketed'][i] and np.isfinite(root['residual_min'][i]):
+                message = (f"No root in [{lower:g}, {upper:g}] v/v%: the balance residual does not "
+                           f"change sign (it ranges from {root['residual_min'][i]:.6g} "
+                           f"to {root['residual_max'][i]:.6g})")
+            elif not root['bracketed'][i]:
+                message = f"No root in [{lower:g}, {upper:g}] v/v%: the balance residual is undefined over the bracket"
+            else:
+                message = 'Root finding stopped: the balance residual is undefined inside the bracket'
+            results.append({
+                'success': bool(root['converged'][i]),
+                'v_v_percent': float(root['x'][i]),
+                'objective_value': float(abs(root['residual'][i])),
+                'iterations': int(root['iterations'][i]),
+                'message': message,
+                # The guess only picks the nearest sign change; there is no warm start
+                'start': {'source': 'initial_guess',
+                          'x': [float(guesses[i])] if np.isfinite(guesses[i]) else None}
+            })
+            if tracers is not None:
+                tracer = tracers.get(i, SolverTrace('ITP'))
+                # 0: converged, 1: no root in the bracket, 2: refinement stopped
+                status = 0 if root['converged'][i] else 1 if not root['bracketed'][i] else 2
+                results[-1]['trace'] = tracer.report(scan_points + tracer.iterations, 0, status, message)
+        return results
+
+    @staticmethod
+    def solve_root(residual_func, bracket: Tuple[float, float], params: Dict, initial_guess=None,
+                   xtol: float = 1e-9, scan_points: int = 16, max_iter: int = 100,
+                   callback: Optional[Callable] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized bracketed root finding of residual_func(x, params) = 0 on bracket.
+
+        The residual is scanned on scan_points grid values to find a sign change
+        (the one nearest initial_guess when there are several), which is then
+        refined with the ITP method (interpolate, truncate, project): regula falsi
+        speed with the worst case of bisection. residual_func must broadcast an
+        array of x against params given as arrays. Returns flat per-case arrays: x,
+        residual, converged, bracketed, iterations and the scanned residual_min
+        and residual_max. callback(x, residual, active), if given, is called after
+        every iteration with the evaluated points and their signed residuals.
+        """
+        lower, upper = bracket
+        shape = np.broadcast(*[np.asarray(value) for value in params.values()],
+                             np.asarray(lower if initial_guess is None else initial_guess)).shape
+        flat = {key: np.broadcast_to(np.asarray(value, dtype=float), shape).reshape(-1)
+                for key, value in params.items()}
+        guess = np.broadcast_to(np.asarray(lower if initial_guess is None else initial_guess, dtype=float),
+                                shape).reshape(-1)
+        n = guess.size
+        cases = np.arange(n)
+
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            grid = np.linspace(lower, upper, scan_points)
+            # One call over the whole (scan_points, n) grid
+            scan = np.broadcast_to(residual_func(np.repeat(grid[:, None], n, axis=1),
+                                                 {key: value[None, :] for key, value in flat.items()}),
+                                   (scan_points, n))
+            finite = np.isfinite(scan)
+            magnitude = np.where(finite, np.abs(scan), np.inf)
+            change = finite[:-1] & finite[1:] & (np.sign(scan[:-1]) * np.sign(scan[1:]) <= 0)
+            bracketed = change.any(axis=0)
+
+            # Bracket nearest the initial guess; unbracketed cases keep the best scan point
+            midpoints = (grid[:-1] + grid[1:]) / 2
+            k = np.where(change, np.abs(midpoints[:, None] - guess), np.inf).argmin(axis=0)
+            a, b = grid[k], grid[k + 1]
+            fa, fb = scan[k, cases], scan[k + 1, cases]
+            best = magnitude.argmin(axis=0)
+            x = np.where(bracketed, a, grid[best])
+            fx = np.where(bracketed, fa, scan[best, cases])
+
+            # Orient every bracket so that g = sign * residual goes from negative to positive
+            sign = np.where(fb > 0, 1.0, -1.0)
+            ga, gb = sign * fa, sign * fb
+            done = ~bracketed | (fa == 0) | (fb == 0)
+            x = np.where(bracketed & (fb == 0), b, x)
+            fx = np.where(bracketed & (fb == 0), fb, fx)
+            failed = np.zeros(n, dtype=bool)
+            iterations = np.zeros(n, dtype=int)
+
+            width = (upper - lower) / (scan_points - 1)
+            n_max = int(np.ceil(np.log2(width / (2 * xtol)))) + 1 if width > 2 * xtol else 0
+            k1, k2 = 0.2 / width, 2.0
+            for j in range(min(n_max, max_iter)):
+                active = ~done & (b - a > 2 * xtol)
+                if not active.any():
+                    break
+                x_half = (a + b) / 2
+                radius = xtol * 2.0 ** (n_max - j) - (b - a) / 2
+                delta = k1 * (b - a) ** k2
+                x_f = (gb * a - ga * b) / (gb - ga)
+                sigma = np.sign(x_half - x_f)
+                x_t = np.where(delta <= np.abs(x_half - x_f), x_f + sigma * delta, x_half)
+                x_itp = np.where(np.abs(x_t - x_half) <= radius, x_t, x_half - sigma * radius)
+
+                g = sign * np.broadcast_to(residual_func(x_itp, flat), (n,))
+                iterations += active
+                if callback is not None:
+                    callback(x_itp, sign * g, active)
+                right, left = active & (g > 0), active & (g < 0)
+                hit = active & (g == 0)
+                undefined = active & ~np.isfinite(g)
+                b, gb = np.where(right, x_itp, b), np.where(right, g, gb)
+                a, ga = np.where(left, x_itp, a), np.where(left, g, ga)
+                x, fx = np.where(hit, x_itp, x), np.where(hit, 0.0, fx)
+                failed |= undefined
+                done |= hit | undefined
+
+            # Converged brackets report the end with the smaller residual
+            refined = bracketed & ~done
+            use_a = np.abs(ga) <= np.abs(gb)
+            x = np.where(refined, np.where(use_a, a, b), x)
+            fx = np.where(refined, sign * np.where(use_a, ga, gb), fx)
+            residual_min = np.min(np.where(finite, scan, np.inf), axis=0)
+            residual_max = np.max(np.where(finite, scan, -np.inf), axis=0)
+
+        return {
+            'x': x,
+            'residual': fx,
+            'converged': bracketed & ~failed & ((b - a <= 2 * xtol) | done),
+            'bracketed': bracketed,
+            'iterations': iterations,
+            'residual_min': np.where(np.isfinite(residual_min), residual_min, np.nan),
+            'residual_max': np.where(np.isfinite(residual_max), residual_max, np.nan),
         }
 
     def solve_option2(self, objective_func, initial_guess: List[float],
-                     bounds: List[Tuple], params: Dict) -> Dict:
+                     bounds: List[Tuple], params: Dict, jac=None, residuals=None,
+                     trace: bool = False, warm_start: bool = True) -> Dict:
         """
         Solve Option 2: Find plant parameters
+        Pass jac=True when objective_func returns (value, gradient), and the
+        objective's option2_residuals as residuals when it is a least-squares
+        objective: objective_value is then reported as the sum of |residuals| at
+        the solution, like the abs() objective reports it.
+        With warm_start=False SLSQP starts exactly at initial_guess; the result's
+        'start' reports where it started. With trace=True the result includes
+        the iteration trace.
+        """
+        tracer = SolverTrace(self.method) if trace else None
+        result, start = self._minimize(objective_func, initial_guess, bounds, params, jac, tracer, warm_start)
+
+        report = {
+            'success': result.success,
+            'v_v_percent': result.x[0],
+            'saturation_ratio': result.x[1],
+            'mixer_eff1': result.x[2],
+            'mixer_eff2': result.x[3],
+            'objective_value': (float(np.abs(residuals(result.x, params)[0]).sum())
+                                if residuals is not None else result.fun),
+            'iterations': result.nit,
+            'message': result.message,
+            'start': start
+        }
+        if tracer is not None:
+            report['trace'] = self._trace_report(tracer, result)
+        return report
+
+    @staticmethod
+    def _trace_report(tracer: SolverTrace, result) -> Dict:
+        return tracer.report(result.nfev, getattr(result, 'njev', 0), result.status, result.message)
+
+    def _minimize(self, objective_func, initial_guess: List[float], bounds: List[Tuple],
+                  params: Dict, jac, callback: Optional[Callable] = None,
+                  warm_start: bool = True) -> Tuple[object, Dict]:
+        """
+        Runs SLSQP and returns scipy's result with the start used: its 'source'
+        ('initial_guess', 'continuation' or 'index') and 'x'.
         """
+        problem, features = self._problem_key(objective_func, params)
+        if warm_start:
+            start, source = self._warm_start(objective_func, problem, features, initial_guess, params, jac)
+        else:
+            start, source = np.asarray(initial_guess, dtype=float), 'initial_guess'
+
+        from scipy.optimize import minimize
         result = minimize(
-            objective_func,
-            initial_guess,
+            self._timed(objective_func),
+            start,
             args=(params,),
             method=self.method,
+            jac=jac,
             bounds=bounds,
-            options={'ftol': 1e-8, 'disp': True}
+            callback=callback,
+            options=self.options
         )
 
+        self.stats.add(solves=1, iterations=result.nit)
+        if result.success and np.isfinite(result.fun):
+            if self._continuation is not None:
+                self._continuation[problem] = result.x
+            if self.solution_index is not None:
+                self.solution_index.add(problem, features, result.x)
+        return result, {'source': source, 'x': start.tolist()}
+
+    def _timed(self, objective_func):
+        """
+        Wraps an objective so its calls and time are added to self.stats.
+        """
+        stats = self.stats
+
+        def timed(x, params):
+            start = time.perf_counter()
+            try:
+                return objective_func(x, params)
+            finally:
+                stats.add(objective_calls=1, objective_seconds=time.perf_counter() - start)
+
+        return timed
+
+    @staticmethod
+    def _problem_key(objective_func, params: Dict) -> Tuple[str, np.ndarray]:
+        """
+        Identifies the problem (objective, owning circuit, parameter layout) and
+        its numeric input features. Initial guesses are not part of the features.
+        """
+        names = sorted(name for name, value in params.items()
+                       if isinstance(value, (int, float)) and not name.startswith('initial_'))
+        owner = getattr(getattr(objective_func, '__self__', None), 'name', '')
+        problem = f"{getattr(objective_func, '__qualname__', repr(objective_func))}:{owner}:{','.join(names)}"
+        return problem, np.array([params[name] for name in names], dtype=float)
+
+    def _warm_start(self, objective_func, problem: str, features: np.ndarray,
+                    initial_guess: List[float], params: Dict, jac) -> Tuple[np.ndarray, str]:
+        """
+        Picks the best starting point among the caller's guess, the previous
+        solution of the same problem (inside a continuation() block) and the
+        nearest indexed solutions. Returns it with its source; ties keep the
+        caller's guess.
+        """
+        candidates = [(np.asarray(initial_guess, dtype=float), 'initial_guess')]
+        if self._continuation is not None and problem in self._continuation:
+            candidates.append((self._continuation[problem], 'continuation'))
+        if self.solution_index is not None:
+            candidates.extend((x, 'index') for x in self.solution_index.nearest(problem, features))
+        if len(candidates) == 1:
+            return candidates[0]
+
+        def value(x):
+            f = objective_func(x, params)
+            f = f[0] if jac is True else f
+            return f if np.isfinite(f) else np.inf
+
+        return min(candidates, key=lambda candidate: value(candidate[0]))
+
+    @staticmethod
+    def latin_hypercube_starts(bounds: List[Tuple], n_starts: int, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Samples n_starts starting points by Latin hypercube within the box bounds.
+        """
+        lower, upper = np.array(bounds, dtype=float).T
+        from scipy.stats import qmc
+        sample = qmc.LatinHypercube(d=len(bounds), seed=seed).random(n_starts)
+        return qmc.scale(sample, lower, upper)
+
+    def solve_local(self, objective_func, initial_guess: List[float], bounds: List[Tuple],
+                    params: Dict, jac=None) -> Dict:
+        """
+        One SLSQP run from exactly initial_guess (no warm start), as used for
+        each start of a multi-start solve.
+        """
+        from scipy.optimize import minimize
+        result = minimize(self._timed(objective_func), np.asarray(initial_guess, dtype=float), args=(params,),
+                          method=self.method, jac=jac, bounds=bounds, options=self.options)
+        self.stats.add(solves=1, iterations=result.nit)
         return {
-            'success': result.success,
-            'v_v_percent': result.x[0],
-            'saturation_ratio': result.x[1],
-            'mixer_eff1': result.x[2],
-            'mixer_eff2': result.x[3],
-            'objective_value': result.fun,
-            'message': result.message
+            'x': result.x.tolist(),
+            'objective_value': float(result.fun),
+            'success': bool(result.success),
+            'iterations': result.nit
+        }
+
+    def solve_least_squares(self, residual_func, initial_guess: List[float], bounds: List[Tuple],
+                            params: Mapping) -> Dict:
+        """
+        Bounded nonlinear least squares (scipy's trust region reflective method)
+        from exactly initial_guess, for overdetermined fits such as a window of
+        plant records. residual_func(x, params) returns (residuals, Jacobian);
+        both come from one evaluation per point. Scaling by the Jacobian copes
+        with the very different sensitivities of the residuals, where SLSQP on
+        the sum of squares stalls.
+        """
+        timed = self._timed(residual_func)
+        last = {}
+
+        def evaluate(x):
+            if 'x' not in last or not np.array_equal(last['x'], x):
+                last['x'], last['value'] = np.array(x), timed(x, params)
+            return last['value']
+
+        start = np.asarray(initial_guess, dtype=float)
+        self.stats.add(solves=1)
+        if not np.all(np.isfinite(evaluate(start)[0])):
+            return {'x': start.tolist(), 'objective_value': np.nan, 'success': False, 'iterations': 0}
+
+        from scipy.optimize import least_squares
+        lower, upper = np.array(bounds, dtype=float).T
+        result = least_squares(lambda x: evaluate(x)[0], start, jac=lambda x: evaluate(x)[1],
+                               bounds=(lower, upper), x_scale='jac')
+        self.stats.add(iterations=result.njev)
+        return {
+            'x': result.x.tolist(),
+            'objective_value': float(2 * result.cost),
+            'success': bool(result.success),
+            'iterations': int(result.njev)
         }
 
+    def solve_multistart(self, objective_func, bounds: List[Tuple], params: Dict, names: List[str],
+                         jac=None, n_starts: int = 16, tolerance: float = 1e-6,
+                         seed: Optional[int] = None, executor=None) -> Dict:
+        """
+        Multi-start solve: runs SLSQP from Latin hypercube starts and stops as soon
+        as one start reaches an objective <= tolerance, cancelling starts that have
+        not begun. With an executor (e.g. a ProcessPoolExecutor, which needs a
+        picklable objective_func) the starts run in parallel.
+        """
+        starts = self.latin_hypercube_starts(bounds, n_starts, seed)
+        runs = []
+        if executor is None:
+            for start in starts:
+                runs.append(self.solve_local(objective_func, start, bounds, params, jac))
+                if self.reached_tolerance(runs[-1], tolerance):
+                    break
+        else:
+            pending = {executor.submit(self.solve_local, objective_func, start, bounds, params, jac)
+                       for start in starts}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                runs.extend(future.result() for future in done)
+                if any(self.reached_tolerance(run, tolerance) for run in runs):
+                    for future in pending:
+                        future.cancel()
+                    break
+        return self.summarize_starts(runs, names, n_starts, tolerance)
+
+    @staticmethod
+    def reached_tolerance(run: Dict, tolerance: float) -> bool:
+        return run['success'] and run['objective_value'] <= tolerance
+
+    @staticmethod
+    def summarize_starts(runs: List[Dict], names: List[str], n_starts: int, tolerance: float) -> Dict:
+        """
+        Best start plus the spread (min/max/std per variable) of the converged
+        starts, i.e. how well determined the solution is.
+        """
+        finite = [run for run in runs if np.isfinite(run['objective_value'])]
+        best = min(finite or runs, key=lambda run: run['objective_value'])
+        converged = [run for run in finite if run['success']]
+        solutions = np.array([run['x'] for run in converged or [best]])
+
+        result = {'success': best['success']}
+        result.update(zip(names, best['x']))
+        result.update({
+            'objective_value': best['objective_value'],
+            'starts_requested': n_starts,
+            'starts_run': len(runs),
+            'starts_converged': len(converged),
+            'starts_within_tolerance': sum(1 for run in runs if SolverEngine.reached_tolerance(run, tolerance)),
+            'spread': {
+                name: {'min': float(column.min()), 'max': float(column.max()), 'std': float(column.std())}
+                for name, column in zip(names, solutions.T)
+            }
+        })
+        return result
+
+
 # Example usage and test cases
 def main():
     # Initialize the simulation engine
@@ -336,10 +1705,12 @@ def main():
     bounds_option1 = [(5.0, 30.0)]  # Reasonable bounds for v/v%
 
     result_option1 = solver.solve_option1(
-        config_A.option1_objective,
+        config_A.option1_least_squares,
         initial_guess_option1,
         bounds_option1,
-        params_option1
+        params_option1,
+        jac=True,
+        squared=True
     )
 
     if result_option1['success']:
@@ -374,10 +1745,12 @@ def main():
     ]
 
     result_option2 = solver.solve_option2(
-        config_A.option2_objective,
+        config_A.option2_least_squares,
         initial_guess_option2,
         bounds_option2,
-        params_option2
+        params_option2,
+        jac=True,
+        residuals=config_A.option2_residuals
     )
 
     if result_option2['success']:
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import math
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream',
+}
+
+
+def json_safe(value):
+    """
+    Recursively replaces NaN/inf with None so the payload is strict JSON.
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def format_event(event: str, payload: Dict, fmt: str) -> str:
+    """
+    Encodes one event as an NDJSON line ({"event": ..., **payload}) or an SSE frame.
+    """
+    payload = json_safe(payload)
+    if fmt == 'sse':
+        return f"event: {event}\ndata: {json.dumps(payload, separators=(',', ':'))}\n\n"
+    return json.dumps({'event': event, **payload}, separators=(',', ':')) + '\n'
+
+
+def event_message(event: str, payload: Dict) -> Dict:
+    """
+    One event as a strict-JSON message ({"event": ..., **payload}), e.g. for a WebSocket.
+    """
+    return json_safe({'event': event, **payload})
+
+
+async def coalesce(queue: asyncio.Queue, debounce: float, max_delay: float) -> List:
+    """
+    Waits for the next item of `queue`, then keeps collecting items until none
+    arrives for `debounce` seconds or `max_delay` seconds have passed since the
+    first, and returns them all (a burst of updates becomes one batch).
+    """
+    items = [await queue.get()]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_delay
+    while True:
+        timeout = min(debounce, deadline - loop.time())
+        if timeout <= 0:
+            return items
+        try:
+            items.append(await asyncio.wait_for(queue.get(), timeout))
+        except asyncio.TimeoutError:
+            return items
+
+
+async def run_ordered(jobs: Iterable[Callable[[], Awaitable]], window: int,
+                      is_cancelled: Callable[[], Awaitable[bool]]) -> AsyncIterator:
+    """
+    Runs job factories with at most `window` in flight and yields their results
+    in submission order. Stops early, cancelling whatever is still pending, when
+    is_cancelled() returns True (e.g. the client disconnected).
+    """
+    jobs = iter(jobs)
+    pending = deque()
+    try:
+        for job in jobs:
+            pending.append(asyncio.ensure_future(job()))
+            if len(pending) >= window:
+                break
+        while pending:
+            result = await pending.popleft()
+            if await is_cancelled():
+                return
+            for job in jobs:
+                pending.append(asyncio.ensure_future(job()))
+                break
+            yield result
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,122 @@
+import io
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from .simulation_engine import ConfigurationA_2Ex1S
+
+# Outputs written for every grid point, in column order.
+SWEEP_OUTPUTS = (
+    'extraction_recovery',
+    'loaded_organic',
+    'net_transfer',
+    'O_A_str',
+    'raffinate_E2',
+    'C1Cuor_Str',
+)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def sweep_dtype(axis_names: List[str]) -> np.dtype:
+    """
+    Structured dtype of a sweep result: one column per axis, then the outputs.
+    """
+    return np.dtype([(name, np.float64) for name in list(axis_names) + list(SWEEP_OUTPUTS)])
+
+
+def sweep_size(axes: List[Tuple[str, np.ndarray]]) -> int:
+    """
+    Number of points in the Cartesian grid of `axes`.
+    """
+    return int(np.prod([len(axis_values) for _, axis_values in axes]))
+
+
+def evaluate_sweep_chunk(config: ConfigurationA_2Ex1S, base_params: Dict, v_v_percent: float,
+                         axes: List[Tuple[str, np.ndarray]], start: int, stop: int) -> np.ndarray:
+    """
+    Evaluates grid rows [start, stop) of the Cartesian grid of `axes`.
+
+    Each axis is (parameter name, values); 'v_v_percent' or any key of
+    base_params may be swept. Rows are numbered in C order over the axes.
+    Returns a structured array (see sweep_dtype).
+    """
+    names = [name for name, _ in axes]
+    values = [np.asarray(axis_values, dtype=float) for _, axis_values in axes]
+    shape = tuple(len(axis_values) for axis_values in values)
+    flat_index = np.arange(start, stop)
+    grid_index = np.unravel_index(flat_index, shape)
+
+    params = dict(base_params)
+    params['v_v_percent'] = v_v_percent
+    chunk = np.empty(len(flat_index), dtype=sweep_dtype(names))
+    for name, axis_values, index in zip(names, values, grid_index):
+        params[name] = chunk[name] = axis_values[index]
+
+    results = config.simulate(params.pop('v_v_percent'), params)
+    for output in SWEEP_OUTPUTS:
+        chunk[output] = np.broadcast_to(results[output], chunk.shape)
+    return chunk
+
+
+def iter_sweep_chunks(config: ConfigurationA_2Ex1S, base_params: Dict, v_v_percent: float,
+                      axes: List[Tuple[str, np.ndarray]],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[np.ndarray]:
+    """
+    Evaluates the Cartesian grid of `axes` over `base_params` in chunks, so only
+    one chunk of inputs and outputs is alive at a time. Yields structured arrays
+    of at most chunk_size rows.
+    """
+    total = sweep_size(axes)
+    for start in range(0, total, chunk_size):
+        yield evaluate_sweep_chunk(config, base_params, v_v_percent, axes,
+                                   start, min(start + chunk_size, total))
+
+
+def run_sweep(config: ConfigurationA_2Ex1S, base_params: Dict, v_v_percent: float,
+              axes: List[Tuple[str, np.ndarray]],
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    """
+    Evaluates the whole grid and returns it as one structured array, with rows in
+    C order of the axes (reshape to the axis lengths for an N-d response surface).
+    """
+    names = [name for name, _ in axes]
+    result = np.empty(sweep_size(axes), dtype=sweep_dtype(names))
+    position = 0
+    for chunk in iter_sweep_chunks(config, base_params, v_v_percent, axes, chunk_size):
+        result[position:position + len(chunk)] = chunk
+        position += len(chunk)
+    return result
+
+
+def npy_header(dtype: np.dtype, rows: int) -> bytes:
+    """
+    The .npy header of a one-dimensional array of `rows` records of `dtype`;
+    followed by the records' raw bytes (chunk.tobytes()) it makes a .npy file.
+    """
+    buffer = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buffer, {
+        'descr': np.lib.format.dtype_to_descr(dtype),
+        'fortran_order': False,
+        'shape': (rows,)
+    })
+    return buffer.getvalue()
+
+
+def to_npy_bytes(array: np.ndarray) -> bytes:
+    """
+    Serializes an array in NumPy .npy format (readable with np.load).
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def chunk_to_columns(chunk: np.ndarray) -> Dict[str, List]:
+    """
+    Converts a structured chunk to JSON-ready columns, with NaN as None.
+    """
+    return {
+        name: np.where(np.isfinite(chunk[name]), chunk[name], None).tolist()
+        for name in chunk.dtype.names
+    }
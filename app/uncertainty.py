@@ -0,0 +1,133 @@
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from .simulation_engine import CIRCUIT_FIELDS, ConfigurationA_2Ex1S
+
+# Outputs summarized over the samples.
+UNCERTAINTY_OUTPUTS = (
+    'raffinate_E2',
+    'extraction_recovery',
+    'loaded_organic',
+    'O_A_str',
+)
+
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular')
+# Inputs that may be given a distribution: the operating v/v% and the circuit parameters.
+UNCERTAIN_INPUTS = ('v_v_percent',) + CIRCUIT_FIELDS
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+# Samples per chunk. Fixed, because every chunk draws from its own seed.
+CHUNK_SIZE = 65536
+
+
+def check_distribution(name: str, spec: Dict, nominal: Dict):
+    """
+    Validates the distribution of input `name` (see draw); raises ValueError.
+    """
+    if name not in UNCERTAIN_INPUTS or name not in nominal:
+        raise ValueError(f"Unknown uncertain input '{name}'.")
+    kind = spec.get('distribution', 'normal')
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution '{kind}' for '{name}'. Must be one of {', '.join(DISTRIBUTIONS)}.")
+    low, high = spec.get('low'), spec.get('high')
+    if kind == 'normal':
+        if spec.get('std') is None or spec['std'] < 0:
+            raise ValueError(f"The normal distribution of '{name}' needs a non-negative std.")
+    elif low is None or high is None:
+        raise ValueError(f"The {kind} distribution of '{name}' needs low and high.")
+    if low is not None and high is not None and low > high:
+        raise ValueError(f"The distribution of '{name}' has low > high.")
+    if kind == 'triangular':
+        mode = nominal[name] if spec.get('mode') is None else spec['mode']
+        if not low <= mode <= high or low == high:
+            raise ValueError(f"The triangular distribution of '{name}' needs low <= mode <= high and low < high.")
+
+
+def draw(spec: Dict, nominal: float, size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draws `size` values of one input. spec has 'distribution' ('normal',
+    'uniform' or 'triangular') and its parameters: mean and std for a normal
+    distribution (clipped to low/high when given), low and high for a uniform
+    one, low, mode and high for a triangular one. The mean and the mode
+    default to the nominal value.
+    """
+    kind = spec.get('distribution', 'normal')
+    low, high = spec.get('low'), spec.get('high')
+    if kind == 'uniform':
+        return rng.uniform(low, high, size)
+    if kind == 'triangular':
+        return rng.triangular(low, nominal if spec.get('mode') is None else spec['mode'], high, size)
+    values = rng.normal(nominal if spec.get('mean') is None else spec['mean'], spec['std'], size)
+    if low is not None or high is not None:
+        np.clip(values, low, high, out=values)
+    return values
+
+
+def evaluate_uncertainty_chunk(config: ConfigurationA_2Ex1S, nominal: Dict, distributions: Dict[str, Dict],
+                               seed: np.random.SeedSequence, size: int,
+                               plant_loading: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Draws `size` samples of the uncertain inputs from `seed` and simulates them
+    in one vectorized pass; the other inputs stay at their nominal values.
+    Returns one array per output in UNCERTAINTY_OUTPUTS.
+    """
+    rng = np.random.default_rng(seed)
+    params = dict(nominal)
+    # Sorted, so the draws do not depend on the order of the request
+    for name in sorted(distributions):
+        params[name] = draw(distributions[name], nominal[name], size, rng)
+    results = config.simulate(params.pop('v_v_percent'), params, plant_loading=plant_loading)
+    return {output: np.broadcast_to(results[output], (size,)) for output in UNCERTAINTY_OUTPUTS}
+
+
+def summarize(values: np.ndarray, percentiles: Sequence[float]) -> Dict:
+    """
+    Mean, standard deviation and percentiles of the finite values.
+    """
+    finite = values[np.isfinite(values)]
+    keys = [f'{q:g}' for q in percentiles]
+    if not finite.size:
+        return {'finite': 0, 'mean': None, 'std': None, 'percentiles': dict.fromkeys(keys)}
+    return {
+        'finite': int(finite.size),
+        'mean': float(finite.mean()),
+        'std': float(finite.std()),
+        'percentiles': dict(zip(keys, np.percentile(finite, percentiles).tolist()))
+    }
+
+
+def propagate(config: ConfigurationA_2Ex1S, nominal: Dict, distributions: Dict[str, Dict], samples: int,
+              seed: Optional[int] = None, percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+              plant_loading: bool = False) -> Dict:
+    """
+    Monte Carlo propagation through Configuration A. Draws `samples` values of
+    each input in `distributions` (name -> spec, see draw) around the
+    `nominal` inputs, which include v_v_percent, and returns per output the
+    nominal value and the summary of the samples (see summarize).
+
+    Samples are evaluated in chunks of CHUNK_SIZE, so only the outputs are kept
+    for every sample. Chunk i draws from the i-th child of SeedSequence(seed):
+    the result depends only on the seed and the sample count. The entropy is
+    returned as 'seed', so an unseeded run can be repeated.
+    """
+    for name, spec in distributions.items():
+        check_distribution(name, spec, nominal)
+    if not all(0 <= q <= 100 for q in percentiles):
+        raise ValueError("Percentiles must be between 0 and 100.")
+
+    seed_sequence = np.random.SeedSequence(seed)
+    outputs = {output: np.empty(samples) for output in UNCERTAINTY_OUTPUTS}
+    for index, chunk_seed in enumerate(seed_sequence.spawn(-(-samples // CHUNK_SIZE))):
+        start = index * CHUNK_SIZE
+        stop = min(start + CHUNK_SIZE, samples)
+        chunk = evaluate_uncertainty_chunk(config, nominal, distributions, chunk_seed, stop - start, plant_loading)
+        for output, values in chunk.items():
+            outputs[output][start:stop] = values
+
+    params = dict(nominal)
+    point = config.simulate(params.pop('v_v_percent'), params, plant_loading=plant_loading)
+    summary = {}
+    for output, values in outputs.items():
+        value = float(point[output])
+        summary[output] = dict(summarize(values, percentiles), nominal=value if np.isfinite(value) else None)
+    return {'samples': samples, 'seed': seed_sequence.entropy, 'outputs': summary}
@@ -0,0 +1,633 @@
+"""
+Benchmark suite for the SimSXCu engines and web APIs.
+
+    python -m benchmarks.run                          # everything, written to benchmark-results.json
+    python -m benchmarks.run --only solve sweep       # benchmarks whose name starts with a prefix
+    python -m benchmarks.run --baseline baseline.json # compare against an earlier run
+
+Run from the repository root. Every benchmark uses a fixed workload (fixed
+seeds, fresh engines) and is timed over several repeats after a warm-up.
+HTTP benchmarks start the app under a local uvicorn and report p50/p99
+latency and throughput. Results are written as JSON; with --baseline each
+benchmark present in both runs is compared, and the run exits with status 1
+when any of them got slower by more than --threshold.
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import scipy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS: Dict[str, Callable[[argparse.Namespace], Dict]] = {}
+# Measurements compared against the baseline (lower is better).
+COMPARED_METRICS = ('seconds_per_op', 'p99_seconds')
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark. It receives the parsed options and returns its measurements.
+    """
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def time_workload(fn: Callable[[], object], options: argparse.Namespace, ops: int = 1) -> Dict:
+    """
+    Times fn after one warm-up call. The number of calls per repeat is chosen so
+    a repeat takes at least 0.2 s; timings are reported per operation, where one
+    call performs `ops` operations (grid points, cases, ...).
+    """
+    fn()
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    times = [elapsed / number / ops for elapsed in timer.repeat(repeat=options.repeat, number=number)]
+    median = statistics.median(times)
+    return {
+        'seconds_per_op': median,
+        'min_seconds': min(times),
+        'mean_seconds': statistics.mean(times),
+        'stdev_seconds': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'ops_per_second': 1 / median,
+        'ops_per_call': ops,
+        'calls_per_repeat': number,
+        'repeat': options.repeat,
+    }
+
+
+# --- Engine benchmarks ---
+
+def _engines():
+    # Same kernels as the service (SIMSXCU_KERNELS)
+    from app.main import sim_engine
+    from app.simulation_engine import ConfigurationA_2Ex1S, SimSXCu
+    sim = SimSXCu()
+    sim.use_kernels(sim_engine.kernels)
+    return sim, ConfigurationA_2Ex1S(sim)
+
+
+def _solver():
+    # A fresh solver per solve, so runs are not warm-started by earlier ones
+    from app.simulation_engine import SolverEngine
+    return SolverEngine()
+
+
+def _designer_params() -> Dict:
+    from app.main import DesignerParams
+    return DesignerParams().dict()
+
+
+def _metallurgist_params() -> Dict:
+    from app.main import MetallurgistParams
+    return MetallurgistParams().dict()
+
+
+def _metallurgist_guess(params: Dict) -> List[float]:
+    return [params['initial_guess_vv'], params['initial_guess_sr'],
+            params['initial_guess_mef1e'], params['initial_guess_mef2e']]
+
+
+@benchmark('equilibrium.extraction_scalar')
+def bench_extraction_scalar(options):
+    sim, _ = _engines()
+    return time_workload(lambda: sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0), options)
+
+
+@benchmark('equilibrium.stripping_scalar')
+def bench_stripping_scalar(options):
+    sim, _ = _engines()
+    return time_workload(lambda: sim.stripping_equilibrium(30.0, 190.0, 10.0, 3.0), options)
+
+
+@benchmark('equilibrium.extraction_scalar_cached')
+def bench_extraction_scalar_cached(options):
+    sim, _ = _engines()
+    sim.enable_cache()
+    return time_workload(lambda: sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0), options)
+
+
+@benchmark('equilibrium.extraction_array')
+def bench_extraction_array(options):
+    sim, _ = _engines()
+    rng = np.random.default_rng(0)
+    size = 100_000
+    PLS_Cu = rng.uniform(1.0, 4.0, size)
+    C_org = rng.uniform(0.5, 5.0, size)
+    return time_workload(lambda: sim.extraction_equilibrium_array(PLS_Cu, 1.6, 10.0, C_org), options, ops=size)
+
+
+@benchmark('solve.option1_A')
+def bench_option1_A(options):
+    from app.main import SOLVE_BOUNDS
+    _, config = _engines()
+    params = _designer_params()
+    return time_workload(lambda: _solver().solve_option1(
+        config.option1_least_squares, [params['initial_vv_guess']], SOLVE_BOUNDS['designer'], params,
+        jac=True, residual=config.option1_balance), options)
+
+
+@benchmark('solve.option1_A_slsqp')
+def bench_option1_A_slsqp(options):
+    from app.main import SOLVE_BOUNDS
+    _, config = _engines()
+    params = _designer_params()
+    return time_workload(lambda: _solver().solve_option1(
+        config.option1_least_squares, [params['initial_vv_guess']], SOLVE_BOUNDS['designer'], params,
+        jac=True, squared=True), options)
+
+
+@benchmark('solve.option2_A')
+def bench_option2_A(options):
+    from app.main import SOLVE_BOUNDS
+    _, config = _engines()
+    params = _metallurgist_params()
+    return time_workload(lambda: _solver().solve_option2(
+        config.option2_least_squares, _metallurgist_guess(params), SOLVE_BOUNDS['metallurgist'], params,
+        jac=True, residuals=config.option2_residuals), options)
+
+
+@benchmark('solve.option1_flowsheet_B')
+def bench_option1_flowsheet_B(options):
+    from app.flowsheet import Flowsheet
+    from app.main import SOLVE_BOUNDS
+    sim, _ = _engines()
+    flowsheet = Flowsheet.for_configuration(sim, 'B')
+    params = _designer_params()
+    return time_workload(lambda: _solver().solve_option1(
+        flowsheet.option1_least_squares, [params['initial_vv_guess']], SOLVE_BOUNDS['designer'], params,
+        jac=True, residual=flowsheet.option1_residual), options)
+
+
+@benchmark('solve.option2_flowsheet_B')
+def bench_option2_flowsheet_B(options):
+    from app.flowsheet import Flowsheet
+    from app.main import SOLVE_BOUNDS
+    sim, _ = _engines()
+    flowsheet = Flowsheet.for_configuration(sim, 'B')
+    params = _metallurgist_params()
+    return time_workload(lambda: _solver().solve_option2(
+        flowsheet.option2_least_squares, _metallurgist_guess(params), SOLVE_BOUNDS['metallurgist'], params,
+        jac=True, residuals=flowsheet.option2_residuals), options)
+
+
+def _designer_cases(config_id: str, size: int) -> List:
+    from app.main import SolveRequest
+    rng = np.random.default_rng(0)
+    return [SolveRequest(mode='designer', config=config_id,
+                         params={'PLS_Cu': float(PLS_Cu), 'SR': float(SR)})
+            for PLS_Cu, SR in zip(rng.uniform(1.0, 4.0, size), rng.uniform(80.0, 95.0, size))]
+
+
+@benchmark('batch.designer_A')
+def bench_batch_designer_A(options):
+    from app.main import run_batch
+    cases = _designer_cases('A', 1000)
+    return time_workload(lambda: run_batch(cases), options, ops=len(cases))
+
+
+@benchmark('batch.designer_B')
+def bench_batch_designer_B(options):
+    from app.main import run_batch
+    cases = _designer_cases('B', 100 if options.quick else 500)
+    return time_workload(lambda: run_batch(cases), options, ops=len(cases))
+
+
+@benchmark('sweep.A')
+def bench_sweep_A(options):
+    from app.sweep import run_sweep
+    _, config = _engines()
+    params = _designer_params()
+    side = 300 if options.quick else 1000
+    axes = [('v_v_percent', np.linspace(5.0, 30.0, side)), ('PLS_Cu', np.linspace(1.0, 4.0, side))]
+    return time_workload(lambda: run_sweep(config, params, 10.0, axes), options, ops=side * side)
+
+
+@benchmark('uncertainty.A')
+def bench_uncertainty_A(options):
+    from app.uncertainty import propagate
+    _, config = _engines()
+    nominal = dict(_designer_params(), v_v_percent=10.0)
+    distributions = {'PLS_Cu': {'std': 0.2}, 'PLS_Ac': {'std': 0.15, 'low': 0.0},
+                     'Mef1e': {'distribution': 'triangular', 'low': 85.0, 'high': 98.0},
+                     'Mef2e': {'distribution': 'uniform', 'low': 90.0, 'high': 99.0}}
+    samples = 100_000 if options.quick else 1_000_000
+    return time_workload(lambda: propagate(config, nominal, distributions, samples, seed=0),
+                         options, ops=samples)
+
+
+@benchmark('session.update')
+def bench_session_update(options):
+    # One what-if tweak: a mixer efficiency change recomputes the stages after E2
+    from app.session import CircuitSession
+    _, config = _engines()
+    inputs = _designer_params()
+    inputs['v_v_percent'] = inputs.pop('initial_vv_guess')
+    session = CircuitSession(config, inputs)
+    values = itertools.cycle(np.linspace(90.0, 99.0, 1000).tolist())
+    return time_workload(lambda: session.update({'Mef2e': next(values)}), options)
+
+
+@benchmark('historian.windows')
+def bench_historian_windows(options):
+    # Rolling Option 2 fits over one day of minute records (window 60, step 15)
+    from app.historian import fit_windows, rolling_windows
+    _, config = _engines()
+    rng = np.random.default_rng(0)
+    records = 1440
+    chunk = {'PLS_Cu': rng.normal(3.0, 0.05, records), 'PLS_Ac': rng.normal(6.0, 0.05, records),
+             'raffinate_Cu_target': rng.normal(0.14, 0.01, records),
+             'stripped_organic_Cu_target': rng.normal(3000.0, 50.0, records)}
+    windows = (records - 60) // 15 + 1
+
+    def fit():
+        for _ in fit_windows(config, rolling_windows(iter([chunk]), 60, 15), {'ML_plant': 2.0}):
+            pass
+
+    return time_workload(fit, options, ops=windows)
+
+
+@benchmark('transient.24h')
+def bench_transient_24h(options):
+    # 24 h after a PLS grade step, 5 min steps, at 1 and 100 scenarios
+    from app.dynamics import MixerSettlerDynamics
+    _, config = _engines()
+    params = _designer_params()
+    params['v_v_percent'] = params.pop('initial_vv_guess')
+    model = MixerSettlerDynamics(config)
+    scenarios = 1 if options.quick else 100
+    steps = [(1.0, 'PLS_Cu', np.linspace(2.0, 3.5, scenarios))]
+    return time_workload(lambda: model.run(params, steps, 24.0), options, ops=scenarios)
+
+
+@benchmark('run_store.get')
+def bench_run_store_get(options):
+    # Lookup of a previously solved case among 10,000 stored runs
+    import tempfile
+    from app.response_cache import SolveResultCache
+    from app.run_store import RunStore
+    params = _designer_params()
+    result = {'success': True, 'v_v_percent': 8.66, 'objective_value': 1e-12, 'iterations': 9,
+              'message': 'Optimization terminated successfully'}
+    with tempfile.TemporaryDirectory() as directory:
+        store = RunStore(os.path.join(directory, 'runs.sqlite3'))
+        keys = []
+        for PLS_Cu in np.linspace(1.0, 6.0, 10000).tolist():
+            case = dict(params, PLS_Cu=PLS_Cu)
+            keys.append(SolveResultCache.make_key('designer', case))
+            store.add(keys[-1], 'designer', 'A', case, result)
+        store.flush()
+        lookups = itertools.cycle(keys)
+        try:
+            return time_workload(lambda: store.get(next(lookups)), options)
+        finally:
+            store.close()
+
+
+# --- Startup benchmarks ---
+
+# Run in a fresh interpreter: import time of the module and peak RSS afterwards.
+_IMPORT_PROBE = """
+import resource, sys, time
+started = time.perf_counter()
+__import__(sys.argv[1])
+print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure_import(module: str, options: argparse.Namespace) -> Dict:
+    """
+    Cold import time of `module` (median over fresh interpreters) and the
+    worker's peak RSS after importing it.
+    """
+    samples = []
+    for _ in range(options.repeat + 1):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_PROBE, module], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.split()
+        samples.append((float(output[0]), int(output[1])))
+    # The first interpreter warms the OS file cache and is not counted
+    times = [elapsed for elapsed, _ in samples[1:]]
+    median = statistics.median(times)
+    return {
+        'seconds_per_op': median,
+        'min_seconds': min(times),
+        'mean_seconds': statistics.mean(times),
+        'ops_per_second': 1 / median,
+        'max_rss_mib': max(rss for _, rss in samples[1:]) / 1024,
+        'repeat': options.repeat,
+    }
+
+
+@benchmark('startup.import_app')
+def bench_import_app(options):
+    return measure_import('app.main', options)
+
+
+@benchmark('startup.import_backend')
+def bench_import_backend(options):
+    return measure_import('backend.main', options)
+
+
+# --- HTTP benchmarks ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(app_path: str, env: Optional[Dict[str, str]] = None, startup_timeout: float = 60.0) -> Iterator[int]:
+    """
+    Runs `app_path` under uvicorn on a free local port and yields the port.
+    """
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', app_path, '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=ROOT, env=dict(os.environ, **(env or {})),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'uvicorn exited with status {process.returncode} while starting {app_path}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'{app_path} did not start within {startup_timeout:g} s')
+                time.sleep(0.1)
+        yield port
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def http_load(port: int, path: str, bodies: List[Dict], concurrency: int, warmup: int = 5) -> Dict:
+    """
+    POSTs every body to path with `concurrency` keep-alive connections and
+    reports latency percentiles of the successful (2xx) responses and the
+    throughput. Other statuses and dropped connections count as errors.
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+    for body in bodies[:warmup]:
+        connection = _post(connection, path, body)[0]
+    connection.close()
+
+    next_index = itertools.count()
+    lock = threading.Lock()
+    latencies: List[float] = []
+    errors = [0]
+
+    def worker():
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        while True:
+            with lock:
+                index = next(next_index)
+            if index >= len(bodies):
+                break
+            started = time.perf_counter()
+            connection, status = _post(connection, path, bodies[index])
+            elapsed = time.perf_counter() - started
+            with lock:
+                if 200 <= status < 300:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+        connection.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    if not latencies:
+        raise RuntimeError(f'all {len(bodies)} requests to {path} failed')
+    percentiles = np.percentile(latencies, [50, 90, 99])
+    return {
+        'seconds_per_op': float(percentiles[0]),
+        'p50_seconds': float(percentiles[0]),
+        'p90_seconds': float(percentiles[1]),
+        'p99_seconds': float(percentiles[2]),
+        'mean_seconds': statistics.mean(latencies),
+        'throughput_rps': len(latencies) / wall,
+        'requests': len(bodies),
+        'errors': errors[0],
+        'concurrency': concurrency,
+    }
+
+
+def _post(connection: http.client.HTTPConnection, path: str, body: Dict):
+    """
+    Sends one request and returns (connection, status). A dropped connection is
+    replaced and reported as status 0.
+    """
+    try:
+        connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return connection, response.status
+    except (OSError, http.client.HTTPException):
+        connection.close()
+        return http.client.HTTPConnection(connection.host, connection.port, timeout=connection.timeout), 0
+
+
+def _app_env(options: argparse.Namespace) -> Dict[str, str]:
+    # Queue every in-flight request instead of shedding load with 429s
+    return {'SIMSXCU_SOLVER_MAX_PENDING': str(4 * options.concurrency), 'SIMSXCU_SOLVER_TIMEOUT': '300'}
+
+
+def _request_count(options: argparse.Namespace, full: int) -> int:
+    return max(full // 5, 20) if options.quick else full
+
+
+@benchmark('http.solve_designer_B')
+def bench_http_solve(options):
+    # Distinct inputs per request, so every request is solved (result cache misses)
+    rng = np.random.default_rng(0)
+    bodies = [{'mode': 'designer', 'config': 'B', 'params': {'PLS_Cu': float(PLS_Cu)}}
+              for PLS_Cu in rng.uniform(1.0, 4.0, _request_count(options, 200))]
+    with serve('app.main:app', _app_env(options)) as port:
+        return http_load(port, '/api/v1/solve', bodies, options.concurrency)
+
+
+@benchmark('http.solve_metallurgist_B')
+def bench_http_solve_metallurgist(options):
+    rng = np.random.default_rng(0)
+    bodies = [{'mode': 'metallurgist', 'config': 'B', 'params': {'PLS_Cu': float(PLS_Cu)}}
+              for PLS_Cu in rng.uniform(2.0, 3.0, _request_count(options, 50))]
+    with serve('app.main:app', _app_env(options)) as port:
+        return http_load(port, '/api/v1/solve', bodies, options.concurrency, warmup=1)
+
+
+@benchmark('http.solve_cached')
+def bench_http_solve_cached(options):
+    bodies = [{'mode': 'designer', 'config': 'B', 'params': {}}] * _request_count(options, 1000)
+    with serve('app.main:app', _app_env(options)) as port:
+        return http_load(port, '/api/v1/solve', bodies, options.concurrency)
+
+
+def _backend_bodies(option: int, count: int) -> List[Dict]:
+    rng = np.random.default_rng(0)
+    return [{'option': option, 'config': 'A', 'parameters': {'PLS_Cu': float(PLS_Cu)}}
+            for PLS_Cu in rng.uniform(1.0, 4.0, count)]
+
+
+@benchmark('http.backend_simulate_option1')
+def bench_http_backend_option1(options):
+    with serve('backend.main:app') as port:
+        return http_load(port, '/api/v1/simulate', _backend_bodies(1, _request_count(options, 500)),
+                         options.concurrency)
+
+
+@benchmark('http.backend_simulate_option2')
+def bench_http_backend_option2(options):
+    with serve('backend.main:app') as port:
+        return http_load(port, '/api/v1/simulate', _backend_bodies(2, _request_count(options, 1000)),
+                         options.concurrency)
+
+
+# --- Running and comparing ---
+
+def environment() -> Dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    from app.main import sim_engine
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'kernels': 'numpy' if sim_engine.kernels is None else 'numba',
+    }
+
+
+def run_benchmarks(names: List[str], options: argparse.Namespace) -> Dict:
+    results = {}
+    for name in names:
+        print(f'{name} ...', end=' ', flush=True)
+        try:
+            results[name] = BENCHMARKS[name](options)
+        except Exception as e:
+            results[name] = {'error': f'{type(e).__name__}: {e}'}
+            print(f'failed ({results[name]["error"]})')
+            continue
+        print(_describe(results[name]))
+    return {'environment': environment(), 'results': results}
+
+
+def _describe(result: Dict) -> str:
+    if 'p99_seconds' in result:
+        return (f"p50 {result['p50_seconds'] * 1e3:.2f} ms, p99 {result['p99_seconds'] * 1e3:.2f} ms, "
+                f"{result['throughput_rps']:.1f} req/s, {result['errors']}/{result['requests']} errors")
+    return f"{_format_seconds(result['seconds_per_op'])}/op ({result['ops_per_second']:.4g} op/s)"
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e3), ('us', 1e6)):
+        if seconds * scale >= 1:
+            return f'{seconds * scale:.3g} {unit}'
+    return f'{seconds * 1e9:.3g} ns'
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """
+    Compares every metric of COMPARED_METRICS present in both runs. A ratio
+    (current / baseline) above 1 + threshold is a regression.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        for metric in COMPARED_METRICS:
+            if metric not in result or metric not in reference:
+                continue
+            ratio = result[metric] / reference[metric]
+            status = ('regression' if ratio > 1 + threshold
+                      else 'improvement' if ratio < 1 / (1 + threshold) else 'ok')
+            rows.append({'benchmark': name, 'metric': metric, 'baseline': reference[metric],
+                         'current': result[metric], 'ratio': ratio, 'status': status})
+    return rows
+
+
+def print_comparison(rows: List[Dict], current: Dict, baseline: Dict):
+    mismatched = [key for key in ('python', 'cpu_count', 'numpy', 'scipy', 'kernels')
+                  if current['environment'].get(key) != baseline['environment'].get(key)]
+    if mismatched:
+        print(f"warning: baseline was recorded with a different {', '.join(mismatched)}")
+    width = max([len(row['benchmark']) for row in rows] + [9])
+    print(f"{'benchmark':<{width}}  {'metric':<14}  {'baseline':>10}  {'current':>10}  {'ratio':>6}  status")
+    for row in rows:
+        print(f"{row['benchmark']:<{width}}  {row['metric']:<14}  {_format_seconds(row['baseline']):>10}  "
+              f"{_format_seconds(row['current']):>10}  {row['ratio']:>6.2f}  {row['status']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run the SimSXCu benchmark suite.')
+    parser.add_argument('--only', nargs='+', metavar='PREFIX', help='run benchmarks whose name starts with a prefix')
+    parser.add_argument('--output', default='benchmark-results.json', help='where to write the results')
+    parser.add_argument('--baseline', help='earlier results to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='relative slowdown reported as a regression (default 0.2)')
+    parser.add_argument('--repeat', type=int, default=5, help='timed repeats per benchmark')
+    parser.add_argument('--concurrency', type=int, default=8, help='parallel connections for HTTP benchmarks')
+    parser.add_argument('--quick', action='store_true', help='smaller workloads and fewer repeats')
+    parser.add_argument('--list', action='store_true', help='list the benchmarks and exit')
+    options = parser.parse_args(argv)
+    if options.quick:
+        options.repeat = min(options.repeat, 3)
+
+    names = [name for name in BENCHMARKS
+             if not options.only or any(name.startswith(prefix) for prefix in options.only)]
+    if options.list:
+        print('\n'.join(names))
+        return 0
+
+    sys.path.insert(0, ROOT)
+    current = run_benchmarks(names, options)
+    with open(options.output, 'w') as handle:
+        json.dump(current, handle, indent=2)
+    print(f'Results written to {options.output}')
+
+    if options.baseline:
+        with open(options.baseline) as handle:
+            baseline = json.load(handle)
+        rows = compare(current, baseline, options.threshold)
+        print_comparison(rows, current, baseline)
+        if any(row['status'] == 'regression' for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
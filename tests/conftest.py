@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+# API tests solve in a thread pool in this process rather than in worker processes
+os.environ.setdefault('SIMSXCU_SOLVER_WORKERS', '0')
+
+from app.simulation_engine import ConfigurationA_2Ex1S, SimSXCu
+
+
+@pytest.fixture
+def config():
+    """Configuration A on the NumPy code, without memoization."""
+    sim = SimSXCu()
+    sim.use_kernels(None)
+    sim.disable_cache()
+    return ConfigurationA_2Ex1S(sim)
+
+
+@pytest.fixture
+def option1_params():
+    return {
+        'PLS_flow': 400, 'PLS_Cu': 2.5, 'PLS_Ac': 1.6, 'SR': 92, 'O_A_Ext': 1,
+        'Mef1e': 92, 'Mef2e': 95, 'SP_Cu': 30, 'SP_Ac': 190, 'AD_Cu': 50, 'Mef1s': 98
+    }
+
+
+@pytest.fixture
+def option2_params():
+    return {
+        'PLS_flow': 400, 'PLS_Cu': 2.5, 'PLS_Ac': 1.6, 'O_A_Ext': 1, 'ML_plant': 4.386,
+        'SP_Cu': 30, 'SP_Ac': 190, 'AD_Cu': 50, 'Mef1s': 98,
+        'raffinate_Cu_target': 0.28, 'stripped_organic_Cu_target': 1.8
+    }
+
+
+@pytest.fixture
+def feasible_designer_params():
+    """Designer inputs with a root of the Option 1 balance in [5, 30] v/v% for the chain and the flowsheets."""
+    return {'PLS_Cu': 7.07, 'PLS_Ac': 8.78, 'SR': 92.61, 'O_A_Ext': 0.97, 'SP_Cu': 33.51, 'AD_Cu': 34.26}
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import app.main as main
+
+
+@pytest.fixture
+def solve_calls(monkeypatch):
+    calls = []
+    run_solve = main.run_solve
+
+    def counting_solve(mode, params, config_id='A', *args, **kwargs):
+        calls.append((mode, config_id))
+        return run_solve(mode, params, config_id, *args, **kwargs)
+
+    monkeypatch.setattr(main, 'run_solve', counting_solve)
+    return calls
+
+
+def test_results_come_back_in_input_order(client):
+    cases = [
+        {'mode': 'designer', 'params': {'PLS_Cu': 2.0}, 'config': 'B'},
+        {'mode': 'metallurgist', 'params': {}, 'config': 'C'},
+        {'mode': 'designer', 'params': {'PLS_Cu': 3.0}},
+    ]
+    results = client.post('/api/v1/solve/batch', json={'cases': cases}).json()['results']
+
+    assert [result['index'] for result in results] == [0, 1, 2]
+    for case, result in zip(cases, results):
+        assert result['error'] is None
+        single = main.run_solve(case['mode'], case['params'], case.get('config', 'A'), warm_start=False)
+        assert result['result']['success'] == single['success']
+        assert result['result']['v_v_percent'] == pytest.approx(single['v_v_percent'], rel=1e-5)
+
+
+def test_identical_cases_are_solved_once(client, solve_calls):
+    case = {'mode': 'metallurgist', 'params': {'PLS_Cu': 2.4}, 'config': 'D'}
+    results = client.post('/api/v1/solve/batch', json={'cases': [case, case, case]}).json()['results']
+
+    assert solve_calls == [('metallurgist', 'D')]
+    assert [result['index'] for result in results] == [0, 1, 2]
+    assert results[0]['result'] == results[1]['result'] == results[2]['result']
+
+
+def test_designer_cases_are_solved_as_one_group_per_configuration(client, solve_calls):
+    cases = [{'mode': 'designer', 'params': {'PLS_Cu': 1.5 + 0.5 * i}, 'config': config}
+             for i in range(3) for config in ('A', 'E')]
+    results = client.post('/api/v1/solve/batch', json={'cases': cases}).json()['results']
+
+    assert solve_calls == []
+    assert all(result['result']['success'] for result in results)
+    for case, result in zip(cases, results):
+        single = main.run_solve('designer', case['params'], case['config'], warm_start=False)
+        assert result['result']['v_v_percent'] == pytest.approx(single['v_v_percent'], rel=1e-6)
+
+
+def test_a_failing_case_only_marks_its_own_entry(client):
+    cases = [
+        {'mode': 'designer', 'params': {}},
+        {'mode': 'planner', 'params': {}},
+        {'mode': 'designer', 'params': {}, 'config': 'Z'},
+        {'mode': 'metallurgist', 'params': {'ML_plant': 'high'}},
+        {'mode': 'metallurgist', 'params': {}},
+    ]
+    results = client.post('/api/v1/solve/batch', json={'cases': cases}).json()['results']
+
+    assert results[0]['result'] is not None and results[4]['result'] is not None
+    assert results[1]['error'] == main.INVALID_MODE_MESSAGE
+    assert results[2]['error'] == main.INVALID_CONFIG_MESSAGE
+    assert 'ML_plant' in results[3]['error']
+    assert all(result['result'] is None for result in results[1:4])
+
+
+def test_a_rejected_chunk_fails_only_its_cases(monkeypatch):
+    async def saturated(fn, *args, timeout=None):
+        raise HTTPException(status_code=429, detail='Solver pool is saturated.')
+
+    monkeypatch.setattr(main, 'run_in_pool', saturated)
+    cases = [main.SolveRequest(mode='designer', params={}) for _ in range(3)]
+    results = asyncio.run(main.run_batch_chunk(cases, 5))
+
+    assert [result.index for result in results] == [5, 6, 7]
+    assert all(result.error == 'Solver pool is saturated.' and result.result is None for result in results)
+
+
+def test_a_crashed_chunk_fails_only_its_cases(monkeypatch):
+    async def crashed(fn, *args, timeout=None):
+        raise RuntimeError('worker died')
+
+    monkeypatch.setattr(main, 'run_in_pool', crashed)
+    results = asyncio.run(main.run_batch_chunk([main.SolveRequest(mode='designer', params={})], 0))
+
+    assert results[0].error == 'An unexpected error occurred: worker died'
+
+
+def test_batch_size_is_limited(client):
+    cases = [{'mode': 'designer', 'params': {}}] * 10001
+    assert client.post('/api/v1/solve/batch', json={'cases': cases}).status_code == 422
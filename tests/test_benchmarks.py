@@ -0,0 +1,82 @@
+import argparse
+import json
+
+import pytest
+
+from benchmarks import run
+
+
+def results(**seconds):
+    return {'environment': {'python': '3.11', 'cpu_count': 4},
+            'results': {name: {'seconds_per_op': value} for name, value in seconds.items()}}
+
+
+def test_list_filters_by_prefix(capsys):
+    assert run.main(['--list', '--only', 'equilibrium', 'startup']) == 0
+    names = capsys.readouterr().out.split()
+    assert names and all(name.startswith(('equilibrium.', 'startup.')) for name in names)
+    assert set(names) == {name for name in run.BENCHMARKS if name.startswith(('equilibrium', 'startup'))}
+
+
+def test_time_workload():
+    calls = []
+    result = run.time_workload(lambda: calls.append(1), argparse.Namespace(repeat=2), ops=4)
+
+    assert result['repeat'] == 2 and result['ops_per_call'] == 4
+    # One warm-up call, then two repeats of the autoranged number of calls
+    assert len(calls) >= 1 + 2 * result['calls_per_repeat']
+    assert result['ops_per_second'] == pytest.approx(1 / result['seconds_per_op'])
+
+
+def test_compare():
+    current = results(faster=1.0, same=1.0, slower=1.3, new=1.0)
+    baseline = results(faster=2.0, same=1.1, slower=1.0, gone=1.0)
+    baseline['results']['http'] = {'p99_seconds': 0.1}
+    current['results']['http'] = {'p99_seconds': 0.1, 'seconds_per_op': 9.0}
+
+    rows = {row['benchmark']: row for row in run.compare(current, baseline, threshold=0.2)}
+    assert set(rows) == {'faster', 'same', 'slower', 'http'}
+    assert [rows[name]['status'] for name in ('faster', 'same', 'slower', 'http')] == [
+        'improvement', 'ok', 'regression', 'ok']
+    assert rows['slower']['ratio'] == pytest.approx(1.3)
+    assert rows['http']['metric'] == 'p99_seconds'
+
+
+def test_format_seconds():
+    assert run._format_seconds(2.5) == '2.5 s'
+    assert run._format_seconds(0.0123) == '12.3 ms'
+    assert run._format_seconds(4.2e-6) == '4.2 us'
+    assert run._format_seconds(3e-8) == '30 ns'
+
+
+def test_run_writes_results_and_flags_regressions(tmp_path, capsys):
+    output, baseline = tmp_path / 'results.json', tmp_path / 'baseline.json'
+    argv = ['--only', 'equilibrium.extraction_scalar', '--quick', '--repeat', '2', '--output', str(output)]
+    assert run.main(argv) == 0
+
+    written = json.loads(output.read_text())
+    assert set(written['results']) == {'equilibrium.extraction_scalar', 'equilibrium.extraction_scalar_cached'}
+    assert written['environment']['kernels'] in ('numpy', 'numba')
+    seconds = written['results']['equilibrium.extraction_scalar']['seconds_per_op']
+    assert 0 < seconds < 0.01
+
+    baseline.write_text(json.dumps(dict(written, results={
+        name: dict(result, seconds_per_op=result['seconds_per_op'] * 100)
+        for name, result in written['results'].items()})))
+    assert run.main(argv + ['--baseline', str(baseline)]) == 0
+    assert 'improvement' in capsys.readouterr().out
+
+    baseline.write_text(json.dumps(dict(written, results={
+        name: dict(result, seconds_per_op=result['seconds_per_op'] / 100)
+        for name, result in written['results'].items()})))
+    assert run.main(argv + ['--baseline', str(baseline)]) == 1
+    assert 'regression' in capsys.readouterr().out
+
+
+def test_failing_benchmark_is_recorded(monkeypatch, tmp_path):
+    def broken(options):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(run.BENCHMARKS, 'broken.benchmark', broken)
+    current = run.run_benchmarks(['broken.benchmark'], argparse.Namespace(repeat=1))
+    assert current['results']['broken.benchmark'] == {'error': 'RuntimeError: boom'}
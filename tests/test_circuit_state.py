@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from app.simulation_engine import CIRCUIT_FIELDS, CircuitState
+
+
+def test_from_params(option1_params):
+    state = CircuitState.from_params(dict(option1_params, initial_guess_vv=12.0))
+
+    assert state.PLS_Cu == 2.5 and state.Mef1s == 98
+    assert dict(state) == option1_params
+    assert CircuitState.from_params(state) is state
+
+
+def test_mapping_protocol(option2_params):
+    state = CircuitState.from_params(option2_params)
+
+    assert len(state) == len(option2_params)
+    # Fields in CIRCUIT_FIELDS order, unset ones skipped
+    assert list(state) == [name for name in CIRCUIT_FIELDS if name in option2_params]
+    assert state['ML_plant'] == 4.386 and state.get('SR') is None and 'SR' not in state
+    for name in ('SR', 'initial_guess_vv'):
+        with pytest.raises(KeyError):
+            state[name]
+    with pytest.raises(AttributeError):
+        state.SR
+    assert repr(CircuitState(PLS_Cu=2.5, SR=92)) == 'CircuitState(PLS_Cu=2.5, SR=92)'
+
+
+def test_unknown_fields_are_rejected():
+    state = CircuitState(PLS_Cu=2.5)
+    assert not hasattr(state, '__dict__')
+    with pytest.raises(AttributeError):
+        CircuitState(PLS_cu=2.5)
+    with pytest.raises(AttributeError):
+        state.initial_guess_vv = 12.0
+
+
+def test_objectives_accept_a_state_or_a_dict(config, option1_params, option2_params, feasible_designer_params):
+    params = dict(option1_params, **feasible_designer_params)
+    state = CircuitState.from_params(params)
+    for x in ([6.0], [10.0], [15.0]):
+        assert np.isfinite(config.option1_objective(x, state))
+        assert config.option1_objective(x, state) == config.option1_objective(x, params)
+        np.testing.assert_array_equal(config.option1_residual(x, state)[1], config.option1_residual(x, params)[1])
+
+    x = [15.0, 90.0, 92.0, 95.0]
+    residuals, jacobian = config.option2_residuals(x, CircuitState.from_params(option2_params))
+    expected_residuals, expected_jacobian = config.option2_residuals(x, option2_params)
+    np.testing.assert_array_equal(residuals, expected_residuals)
+    np.testing.assert_array_equal(jacobian, expected_jacobian)
+
+
+def test_array_state_evaluates_a_batch(config, option1_params, feasible_designer_params):
+    params = dict(option1_params, **feasible_designer_params)
+    pls_cu = np.array([6.5, 7.0, 7.5, 8.0])
+    v_v_percent = np.array([6.0, 9.0, 12.0, 15.0])
+    batch = config.option1_balance(v_v_percent, CircuitState.from_params(dict(params, PLS_Cu=pls_cu)))
+
+    assert batch.shape == (4,) and np.isfinite(batch).all()
+    for i in range(4):
+        single = config.option1_balance(v_v_percent[i], CircuitState.from_params(dict(params, PLS_Cu=pls_cu[i])))
+        assert batch[i] == pytest.approx(float(single), rel=1e-12)
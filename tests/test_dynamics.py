@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+import app.main as main
+from app.dynamics import TRANSIENT_OUTPUTS, MixerSettlerDynamics
+
+
+@pytest.fixture
+def params():
+    return dict(main.DesignerParams().dict(exclude={'initial_vv_guess'}), v_v_percent=10.0)
+
+
+def steady(config, params):
+    return config.simulate(params['v_v_percent'], params)
+
+
+def test_starts_and_ends_at_the_steady_state(config, params):
+    result = MixerSettlerDynamics(config).run(params, [(1.0, 'PLS_Cu', 3.0)], duration=12, points=13)
+
+    np.testing.assert_array_equal(result['time'], np.arange(13.0))
+    before, after = steady(config, params), steady(config, dict(params, PLS_Cu=3.0))
+    for name in TRANSIENT_OUTPUTS:
+        assert result[name].shape == (13, 1)
+        np.testing.assert_allclose(result[name][:2, 0], before[name], rtol=1e-12, equal_nan=True)
+        np.testing.assert_allclose(result[name][-1, 0], after[name], rtol=1e-9, equal_nan=True)
+    assert result['C2Cuor_Ext'][-1, 0] > result['C2Cuor_Ext'][0, 0]
+
+
+def test_step_works_through_the_holdups(config, params):
+    result = MixerSettlerDynamics(config).run(params, [(0.0, 'PLS_Cu', 3.0)], duration=2, points=121)
+    before, after = steady(config, params), steady(config, dict(params, PLS_Cu=3.0))
+
+    def progress(name):
+        return (result[name][:, 0] - before[name]) / (after[name] - before[name])
+
+    first, second = progress('C1Cuor_Ext'), progress('C2Cuor_Ext')
+    assert first[0] == second[0] == 0
+    # Each settler delays the change, so the downstream stage lags
+    assert np.all(np.diff(first) >= -1e-12) and 0 < first[30] < 1
+    assert np.all(second[1:60] < first[1:60])
+    assert first[-1] == pytest.approx(1, abs=1e-3)
+
+
+def test_organic_tank_is_a_first_order_lag(config, params):
+    # 200 m³ of organic at 400 m³/h: a residence time of 0.5 h
+    result = MixerSettlerDynamics(config).run(params, [(0.0, 'v_v_percent', 12.0)], duration=0.5, dt=1 / 600, points=2)
+    before, after = steady(config, params)['LO'], steady(config, dict(params, v_v_percent=12.0))['LO']
+    assert (result['LO'][-1, 0] - before) / (after - before) == pytest.approx(1 - np.exp(-1), rel=1e-6)
+
+
+def test_integrator_is_second_order(config, params):
+    model = MixerSettlerDynamics(config)
+    steps = [(0.5, 'PLS_Cu', 3.0), (1.0, 'v_v_percent', 12.0)]
+    reference = model.run(params, steps, duration=3, dt=1 / 960, points=37)
+    coarse, fine = (model.run(params, steps, duration=3, dt=dt, points=37) for dt in (1 / 24, 1 / 48))
+    for name in ('C1Cuor_Ext', 'C2Cuor_Ext', 'C1Cuor_Str'):
+        errors = [np.abs(result[name] - reference[name]).max() for result in (coarse, fine)]
+        assert errors[0] / errors[1] == pytest.approx(4, rel=0.1)
+
+
+def test_scenarios_are_integrated_together(config, params):
+    model = MixerSettlerDynamics(config)
+    together = model.run(params, [(1.0, 'PLS_Cu', [2.0, 3.0]), (2.0, 'PLS_flow', [400, 300])], duration=6, points=25)
+    for i, (pls_cu, pls_flow) in enumerate([(2.0, 400), (3.0, 300)]):
+        alone = model.run(params, [(1.0, 'PLS_Cu', pls_cu), (2.0, 'PLS_flow', pls_flow)], duration=6, points=25)
+        for name in TRANSIENT_OUTPUTS:
+            np.testing.assert_allclose(together[name][:, i], alone[name][:, 0], rtol=1e-12, equal_nan=True)
+
+
+def test_invalid_models(config, params):
+    with pytest.raises(ValueError, match='Unknown holdup'):
+        MixerSettlerDynamics(config, {'mixer_volumes': 40})
+    with pytest.raises(ValueError, match='at least one cell'):
+        MixerSettlerDynamics(config, cells=0)
+    with pytest.raises(ValueError, match="Unknown input 'pls_cu'"):
+        MixerSettlerDynamics(config).run(params, [(1.0, 'pls_cu', 3.0)], duration=2)
+
+
+def test_transient_endpoint(client, monkeypatch):
+    body = {'v_v_percent': 10.0, 'duration': 4, 'points': 9,
+            'steps': [{'time': 1, 'name': 'PLS_Cu', 'value': [2.0, 3.0, 3.5]}]}
+    response = client.post('/api/v1/transient', json=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result['time'] == [0, 0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4] and result['scenarios'] == 3
+    assert set(result['outputs']) == set(TRANSIENT_OUTPUTS)
+    assert np.array(result['outputs']['C2Cuor_Ext']).shape == (9, 3)
+    assert result['outputs']['raffinate_E2'][0][0] is None
+
+    monkeypatch.setattr(main, 'MAX_TRANSIENT_STEPS', 100)
+    assert client.post('/api/v1/transient', json=body).status_code == 400
+    monkeypatch.undo()
+    for change in ({'steps': body['steps'] + [{'time': 2, 'name': 'SR', 'value': [90, 91]}]},
+                   {'steps': [{'time': 1, 'name': 'ML_plant', 'value': 4}]},
+                   {'holdups': {'tank': 10}}):
+        assert client.post('/api/v1/transient', json=dict(body, **change)).status_code == 400
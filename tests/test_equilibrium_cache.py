@@ -0,0 +1,104 @@
+import pickle
+import threading
+
+import pytest
+
+from app.simulation_engine import EquilibriumCache, SimSXCu
+
+
+def test_lru_eviction():
+    cache = EquilibriumCache(maxsize=2)
+    computed = []
+
+    def compute(x):
+        computed.append(x)
+        return 2 * x
+
+    assert cache.get_or_compute('f', (1.0,), compute) == 2.0
+    cache.get_or_compute('f', (2.0,), compute)
+    # Touching 1.0 makes 2.0 the least recently used entry
+    cache.get_or_compute('f', (1.0,), compute)
+    cache.get_or_compute('f', (3.0,), compute)
+    cache.get_or_compute('f', (1.0,), compute)
+    cache.get_or_compute('f', (2.0,), compute)
+
+    assert computed == [1.0, 2.0, 3.0, 2.0]
+    assert cache.info() == {'hits': 2, 'misses': 4, 'size': 2, 'maxsize': 2, 'tolerance': 0.0}
+
+
+def test_names_are_part_of_the_key():
+    cache = EquilibriumCache()
+    assert cache.get_or_compute('f', (1.0,), lambda x: x + 1) == 2.0
+    assert cache.get_or_compute('g', (1.0,), lambda x: x - 1) == 0.0
+
+
+def test_quantized_keys():
+    cache = EquilibriumCache(tolerance=1e-3)
+    first = cache.get_or_compute('f', (2.5000, 10.0), lambda a, b: a * b)
+    # Within half a tolerance step of the same grid point
+    assert cache.get_or_compute('f', (2.50004, 10.0002), lambda a, b: a * b) == first
+    assert cache.get_or_compute('f', (2.5010, 10.0), lambda a, b: a * b) != first
+    assert cache.info()['hits'] == 1
+
+    exact = EquilibriumCache()
+    exact.get_or_compute('f', (2.5,), float)
+    exact.get_or_compute('f', (2.5 + 1e-15,), float)
+    assert exact.info()['hits'] == 0
+
+
+def test_clear_and_pickle():
+    cache = EquilibriumCache(maxsize=4)
+    cache.get_or_compute('f', (1.0,), float)
+    cache.get_or_compute('f', (1.0,), float)
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy.info() == cache.info()
+    assert copy.get_or_compute('f', (1.0,), lambda x: 99.0) == 1.0
+
+    cache.clear()
+    assert cache.info()['size'] == cache.info()['hits'] == cache.info()['misses'] == 0
+
+
+def test_shared_between_threads():
+    cache = EquilibriumCache(maxsize=50)
+
+    def work(offset):
+        for i in range(200):
+            cache.get_or_compute('f', (float((i + offset) % 80),), lambda x: x * x)
+
+    threads = [threading.Thread(target=work, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info['hits'] + info['misses'] == 800
+    assert info['size'] == 50
+
+
+def test_sim_memoizes_scalar_isotherms_only():
+    sim = SimSXCu()
+    expected = sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0)
+    sim.enable_cache(maxsize=16)
+
+    assert sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0) == expected
+    assert sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0) == expected
+    sim.stripping_equilibrium(30.0, 190.0, 10.0, 3.0)
+    sim.extraction_equilibrium_array([2.5, 2.6], 1.6, 10.0, 3.0)
+    assert sim.cache_info()['hits'] == 1
+    assert sim.cache_info()['misses'] == 2
+    # Cache hits are not counted as kernel evaluations
+    calls = sim.stats['equilibrium_calls']
+    sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0)
+    assert sim.stats['equilibrium_calls'] == calls
+
+    sim.disable_cache()
+    assert sim.cache_info() is None
+
+
+def test_quantized_sim_cache_stays_within_the_tolerance():
+    sim = SimSXCu()
+    sim.enable_cache(tolerance=1e-6)
+    sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0)
+    cached = sim.extraction_equilibrium(2.5 + 3e-7, 1.6, 10.0, 3.0)
+    exact = SimSXCu().extraction_equilibrium(2.5 + 3e-7, 1.6, 10.0, 3.0)
+    assert cached == pytest.approx(exact, abs=1e-5)
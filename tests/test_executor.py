@@ -0,0 +1,113 @@
+import asyncio
+import operator
+import os
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import app.main as main
+from app.executor import SolverPool, SolverPoolSaturated, SolverPoolTimeout, SolverPoolUnavailable
+
+
+@pytest.fixture
+def pool():
+    pool = SolverPool(max_workers=0, max_pending=2, timeout=5.0)
+    yield pool
+    pool.shutdown()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_runs_jobs_and_releases_them(pool):
+    assert asyncio.run(pool.run(operator.add, 2, 3)) == 5
+    wait_until(lambda: pool.pending == 0)
+
+
+def test_errors_propagate(pool):
+    with pytest.raises(ZeroDivisionError):
+        asyncio.run(pool.run(operator.truediv, 1, 0))
+    wait_until(lambda: pool.pending == 0)
+
+
+def test_saturated_pool_rejects_jobs(pool):
+    release = threading.Event()
+
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        assert pool.pending == 2
+        with pytest.raises(SolverPoolSaturated):
+            await pool.run(operator.add, 1, 1)
+        release.set()
+        assert await asyncio.gather(*running) == [True, True]
+
+    asyncio.run(scenario())
+    wait_until(lambda: pool.pending == 0)
+
+
+def test_timed_out_job_stays_pending_until_it_finishes(pool):
+    release = threading.Event()
+    with pytest.raises(SolverPoolTimeout, match='0.05 s'):
+        asyncio.run(pool.run(release.wait, timeout=0.05))
+    # The worker is still busy with it
+    assert pool.pending == 1
+    release.set()
+    wait_until(lambda: pool.pending == 0)
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv('SIMSXCU_SOLVER_WORKERS', '3')
+    monkeypatch.setenv('SIMSXCU_SOLVER_MAX_PENDING', '7')
+    monkeypatch.setenv('SIMSXCU_SOLVER_TIMEOUT', '2.5')
+    pool = SolverPool.from_env()
+    assert (pool.max_workers, pool.max_pending, pool.timeout) == (3, 7, 2.5)
+
+    monkeypatch.delenv('SIMSXCU_SOLVER_MAX_PENDING')
+    assert SolverPool.from_env().max_pending == 12
+
+
+def test_process_pool_recovers_from_a_dead_worker():
+    pool = SolverPool(max_workers=1, timeout=30.0)
+    try:
+        assert asyncio.run(pool.run(operator.mul, 6, 7)) == 42
+        with pytest.raises(SolverPoolUnavailable):
+            asyncio.run(pool.run(os._exit, 1))
+        # A new set of workers takes the next job
+        assert asyncio.run(pool.run(operator.mul, 6, 7)) == 42
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize('error, status', [
+    (SolverPoolSaturated('full'), 429),
+    (SolverPoolTimeout('slow'), 503),
+    (SolverPoolUnavailable('dead'), 503),
+])
+def test_pool_errors_map_to_http_errors(monkeypatch, error, status):
+    class FailingPool:
+        async def run(self, fn, *args, timeout=None):
+            raise error
+
+    monkeypatch.setattr(main, 'solver_pool', FailingPool())
+    with pytest.raises(HTTPException) as raised:
+        asyncio.run(main.run_in_pool(operator.add, 1, 2))
+    assert raised.value.status_code == status
+    assert raised.value.detail == str(error)
+    if status == 429:
+        assert raised.value.headers == {'Retry-After': '1'}
+
+
+def test_saturated_solve_returns_429(client, monkeypatch):
+    monkeypatch.setattr(main, 'result_cache', main.SolveResultCache(maxsize=0))
+    monkeypatch.setattr(main.solver_pool, 'max_pending', 0)
+    response = client.post('/api/v1/solve', json={'mode': 'designer', 'params': {'PLS_Cu': 2.2}})
+
+    assert response.status_code == 429
+    assert response.headers['retry-after'] == '1'
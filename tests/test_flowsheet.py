@@ -0,0 +1,170 @@
+import numpy as np
+import pytest
+
+from app.flowsheet import Flowsheet, build_configuration
+from app.simulation_engine import CircuitState, SimSXCu, SolverEngine
+
+CONFIGURATIONS = list(SimSXCu().configurations)
+DESIGNER = {'PLS_flow': 400.0, 'PLS_Cu': 2.5, 'PLS_Ac': 1.6, 'SR': 92.0, 'O_A_Ext': 1.0, 'Mef1e': 92.0,
+            'Mef2e': 95.0, 'SP_Cu': 30.0, 'SP_Ac': 190.0, 'AD_Cu': 50.0, 'Mef1s': 98.0}
+METALLURGIST = dict(DESIGNER, ML_plant=4.386, raffinate_Cu_target=0.28, stripped_organic_Cu_target=1.8)
+
+
+@pytest.fixture(scope='module')
+def sim():
+    return SimSXCu()
+
+
+def flowsheet(sim, config_id):
+    return Flowsheet.for_configuration(sim, config_id)
+
+
+def central_difference(fn, x, step=1e-6):
+    x = np.asarray(x, dtype=float)
+    columns = []
+    for i in range(x.size):
+        h = step * max(abs(x[i]), 1.0)
+        forward, backward = x.copy(), x.copy()
+        forward[i] += h
+        backward[i] -= h
+        columns.append((np.asarray(fn(forward)) - np.asarray(fn(backward))) / (2 * h))
+    return np.stack(columns, axis=-1)
+
+
+def test_layouts(sim):
+    for config_id in CONFIGURATIONS:
+        stages = build_configuration(config_id)
+        n_strip = sum(stage.kind == 'stripping' for stage in stages)
+        # The second configuration of each pair has two strip stages
+        assert n_strip == 'ABCDEFGHIJKLMNOPQR'.index(config_id) % 2 + 1
+    with pytest.raises(ValueError):
+        build_configuration('Z')
+
+
+@pytest.mark.parametrize('config_id', CONFIGURATIONS)
+def test_steady_state_closes_the_copper_balances(sim, config_id):
+    v_v_percent = np.linspace(6.0, 24.0, 7)
+    state = flowsheet(sim, config_id).solve(dict(DESIGNER, v_v_percent=v_v_percent))
+    Q_org = DESIGNER['O_A_Ext'] * DESIGNER['PLS_flow']
+    Q_electrolyte = Q_org / state['O_A_str']
+
+    assert state['converged'].all()
+    extracted = DESIGNER['PLS_flow'] * (DESIGNER['PLS_Cu'] - state['raffinate_Cu'])
+    np.testing.assert_allclose(Q_org * (state['loaded_organic'] - state['stripped_organic']), extracted,
+                               rtol=1e-8)
+    np.testing.assert_allclose(Q_electrolyte * (DESIGNER['AD_Cu'] - DESIGNER['SP_Cu']), extracted, rtol=1e-8)
+    assert ((state['raffinate_Cu'] > 0) & (state['raffinate_Cu'] < DESIGNER['PLS_Cu'])).all()
+
+
+@pytest.mark.parametrize('config_id', CONFIGURATIONS)
+def test_stage_equations_hold(sim, config_id):
+    model = flowsheet(sim, config_id)
+    state = model.solve(dict(DESIGNER, v_v_percent=12.0))
+    params = {key: np.asarray(value, dtype=float).reshape(1) for key, value in DESIGNER.items()}
+    params['v_v_percent'] = np.array([12.0])
+
+    residuals = model.residuals(state['state'].reshape(1, -1), params)
+    assert np.abs(residuals).max() < 1e-9
+
+
+@pytest.mark.parametrize('parallel, series', [('M', 'A'), ('N', 'B')])
+def test_two_parallel_circuits_match_one(sim, parallel, series):
+    # M/N are two A/B circuits side by side, each with half of both feeds
+    v_v_percent = np.linspace(6.0, 24.0, 7)
+    both = flowsheet(sim, parallel).solve(dict(DESIGNER, v_v_percent=v_v_percent))
+    one = flowsheet(sim, series).solve(dict(DESIGNER, v_v_percent=v_v_percent))
+
+    for product in ('raffinate_Cu', 'loaded_organic', 'stripped_organic', 'O_A_str'):
+        np.testing.assert_allclose(both[product], one[product], rtol=1e-9)
+
+
+def test_batch_solve_matches_single_points(sim):
+    model = flowsheet(sim, 'E')
+    PLS_Cu = np.array([1.5, 2.5, 3.5])
+    batch = model.solve(dict(DESIGNER, PLS_Cu=PLS_Cu, v_v_percent=10.0))
+    for i, value in enumerate(PLS_Cu):
+        single = model.solve(dict(DESIGNER, PLS_Cu=value, v_v_percent=10.0))
+        assert batch['loaded_organic'][i] == pytest.approx(float(single['loaded_organic']), rel=1e-9)
+
+
+def test_singular_jacobian_falls_back_per_point(sim, monkeypatch):
+    model = flowsheet(sim, 'A')
+    size = 2 * model.n_stages + 1
+    rng = np.random.default_rng(0)
+    jacobians = rng.normal(size=(3, size, size)) + 5 * np.eye(size)
+    jacobians[1] = 0.0
+    jacobians[1, :, 0] = 1.0
+    monkeypatch.setattr(model, '_jacobian', lambda x, r, p: jacobians)
+    r = rng.normal(size=(3, size))
+
+    step = model._newton_step(np.zeros((3, size)), r, {})
+    for i in (0, 2):
+        np.testing.assert_allclose(step[i], np.linalg.solve(jacobians[i], r[i]))
+    np.testing.assert_allclose(step[1], np.linalg.lstsq(jacobians[1], r[1], rcond=None)[0])
+
+
+@pytest.mark.parametrize('config_id', ['A', 'F', 'Q'])
+def test_sensitivities_match_finite_differences(sim, config_id):
+    model = flowsheet(sim, config_id)
+    names = ['v_v_percent', 'PLS_Cu', 'Mef1e', 'O_A_Ext']
+    point = dict(DESIGNER, v_v_percent=11.0)
+    _, derivatives = model.sensitivities(point, names)
+
+    x = np.array([point[name] for name in names])
+
+    def products(values):
+        state = model.solve(dict(point, **dict(zip(names, values))), tol=1e-12)
+        return [float(state[product]) for product in ('raffinate_Cu', 'loaded_organic', 'stripped_organic')]
+
+    expected = central_difference(products, x, step=1e-5)
+    for row, product in enumerate(('raffinate_Cu', 'loaded_organic', 'stripped_organic')):
+        np.testing.assert_allclose(derivatives[product], expected[row], rtol=1e-4, atol=1e-7)
+
+
+@pytest.mark.parametrize('config_id', ['A', 'K'])
+def test_objective_gradients(sim, config_id):
+    model = flowsheet(sim, config_id)
+    _, gradient = model.option1_least_squares([11.0], DESIGNER)
+    expected = central_difference(lambda x: model.option1_least_squares(x, DESIGNER)[0], [11.0], step=1e-5)
+    np.testing.assert_allclose(gradient, expected, rtol=1e-4)
+
+    x = [11.0, 90.0, 92.0, 95.0]
+    _, jacobian = model.option2_residuals(x, METALLURGIST)
+    expected = central_difference(lambda point: model.option2_residuals(point, METALLURGIST)[0], x, step=1e-5)
+    np.testing.assert_allclose(jacobian, expected, rtol=1e-4, atol=1e-7)
+
+
+def test_option1_residual_is_vectorized(sim):
+    model = flowsheet(sim, 'C')
+    v_v_percent = np.array([6.0, 9.0, 15.0])
+    residuals = model.option1_residual(v_v_percent, DESIGNER)
+    for v, residual in zip(v_v_percent, residuals):
+        assert residual == pytest.approx(float(model.option1_residual(v, DESIGNER)), rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize('config_id', CONFIGURATIONS)
+def test_designer_and_metallurgist_solves(sim, config_id):
+    model = flowsheet(sim, config_id)
+    solver = SolverEngine()
+    designer = solver.solve_option1(model.option1_least_squares, [10.0], [(5.0, 30.0)],
+                                    CircuitState.from_params(DESIGNER), jac=True,
+                                    residual=model.option1_residual, warm_start=False, squared=True)
+    assert designer['success']
+    assert abs(float(model.option1_residual(designer['v_v_percent'], DESIGNER))) < 1e-6
+
+    metallurgist = solver.solve_option2(model.option2_least_squares, [10.0, 90.0, 92.0, 95.0],
+                                        [(5.0, 30.0), (70.0, 100.0), (70.0, 100.0), (70.0, 100.0)],
+                                        CircuitState.from_params(METALLURGIST), jac=True, warm_start=False)
+    assert metallurgist['success']
+
+
+def test_solve_api_uses_the_flowsheet_for_every_configuration(client):
+    results = {}
+    for config_id in ('A', 'M', 'B'):
+        response = client.post('/api/v1/solve', json={'mode': 'designer', 'params': {}, 'config': config_id})
+        assert response.status_code == 200
+        results[config_id] = response.json()
+    assert results['A']['success']
+    # A and M are the same circuit, so the API reports the same optimum
+    assert results['M']['v_v_percent'] == pytest.approx(results['A']['v_v_percent'], rel=1e-6)
+    assert results['B']['v_v_percent'] != pytest.approx(results['A']['v_v_percent'], rel=1e-3)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from app.simulation_engine import CircuitState
+
+
+def central_difference(fn, x, step=1e-6):
+    """Jacobian of fn (scalar or vector valued) at x by central differences."""
+    x = np.asarray(x, dtype=float)
+    columns = []
+    for i in range(x.size):
+        h = step * max(abs(x[i]), 1.0)
+        forward, backward = x.copy(), x.copy()
+        forward[i] += h
+        backward[i] -= h
+        columns.append((np.asarray(fn(forward)) - np.asarray(fn(backward))) / (2 * h))
+    return np.stack(columns, axis=-1)
+
+
+@pytest.mark.parametrize('v_v_percent', [6.0, 10.0, 14.0, 18.0])
+def test_option1_residual_gradient(config, option1_params, v_v_percent):
+    residual, gradient = config.option1_residual([v_v_percent], option1_params)
+    assert np.isfinite(residual)
+    expected = central_difference(lambda x: config.option1_residual(x, option1_params)[0], [v_v_percent])
+
+    assert gradient.shape == (1,)
+    np.testing.assert_allclose(gradient, expected, rtol=1e-6, atol=1e-9)
+
+
+def test_option1_least_squares_gradient(config, option1_params):
+    value, gradient = config.option1_least_squares([12.0], option1_params)
+    residual, _ = config.option1_residual([12.0], option1_params)
+    expected = central_difference(lambda x: config.option1_least_squares(x, option1_params)[0], [12.0])
+
+    assert value == pytest.approx(residual ** 2)
+    np.testing.assert_allclose(gradient, expected, rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize('x', [
+    [10.0, 90.0, 92.0, 95.0],
+    [12.0, 75.0, 85.0, 99.0],
+    [25.0, 98.0, 72.0, 80.0],
+])
+def test_option2_residuals_jacobian(config, option2_params, x):
+    residuals, jacobian = config.option2_residuals(x, option2_params)
+    expected = central_difference(lambda point: config.option2_residuals(point, option2_params)[0], x)
+
+    assert residuals.shape == (3,)
+    assert jacobian.shape == (3, 4)
+    assert np.isfinite(jacobian).all()
+    np.testing.assert_allclose(jacobian, expected, rtol=1e-6, atol=1e-9)
+
+
+def test_option2_least_squares_gradient(config, option2_params):
+    x = [10.0, 90.0, 92.0, 95.0]
+    value, gradient = config.option2_least_squares(x, option2_params)
+    residuals, _ = config.option2_residuals(x, option2_params)
+    expected = central_difference(lambda point: config.option2_least_squares(point, option2_params)[0], x)
+
+    assert value == pytest.approx(residuals @ residuals)
+    np.testing.assert_allclose(gradient, expected, rtol=1e-6, atol=1e-9)
+
+
+def test_stage_chain_tangents_match_calculate_methods(config, option2_params):
+    # The chain's values are the calculate_* formulas; its tangents their derivatives
+    v_v_percent, SR, Mef1e, Mef2e = 10.0, 90.0, 92.0, 95.0
+    params = dict(option2_params, SR=SR, Mef1e=Mef1e, Mef2e=Mef2e)
+    results = config.simulate(v_v_percent, params, plant_loading=True)
+
+    def chain_at(x):
+        state = dict(option2_params, SR=x[1], Mef1e=x[2], Mef2e=x[3])
+        unit = np.eye(4)
+        LO = state['ML_plant'] * x[1] / 100
+        return config._stage_chain_with_tangents(
+            CircuitState.from_params(state), x[0], unit[0], LO, unit[1] * state['ML_plant'] / 100,
+            x[2], unit[2], x[3], unit[3], with_raffinate=True)
+
+    x = np.array([v_v_percent, SR, Mef1e, Mef2e])
+    chain = chain_at(x)
+    for name in ('C1Cuor_Ext', 'C2Cuor_Ext', 'raffinate_E2', 'O_A_str', 'C1Cuor_Str'):
+        value, tangent = chain[name]
+        assert value == pytest.approx(float(results[name]), rel=1e-12)
+        expected = central_difference(lambda point: chain_at(point)[name][0], x)
+        np.testing.assert_allclose(tangent, expected, rtol=1e-6, atol=1e-9)
+
+
+def test_option2_objective_value_is_on_the_abs_objective_scale(config, option2_params):
+    from app.simulation_engine import SolverEngine
+
+    guess, bounds = [10.0, 90.0, 92.0, 95.0], [(5.0, 30.0)] + [(70.0, 100.0)] * 3
+    result = SolverEngine().solve_option2(config.option2_least_squares, guess, bounds, option2_params,
+                                          jac=True, residuals=config.option2_residuals, warm_start=False)
+    x = [result['v_v_percent'], result['saturation_ratio'], result['mixer_eff1'], result['mixer_eff2']]
+
+    assert result['objective_value'] == pytest.approx(config.option2_objective(x, option2_params), rel=1e-9)
+    squared = SolverEngine().solve_option2(config.option2_least_squares, guess, bounds, option2_params,
+                                           jac=True, warm_start=False)
+    assert squared['objective_value'] == pytest.approx(config.option2_least_squares(x, option2_params)[0])
@@ -0,0 +1,126 @@
+import csv
+
+import numpy as np
+import pytest
+
+from app import historian
+from app.simulation_engine import ConfigurationA_2Ex1S, SimSXCu
+
+TRUTH = {'v_v_percent': 10.0, 'SR': 90.0, 'Mef1e': 92.0, 'Mef2e': 95.0}
+
+
+def synthetic_records(n=240, seed=1):
+    """Minute records simulated at TRUTH, with a varying PLS feed."""
+    rng = np.random.default_rng(seed)
+    PLS_Cu, PLS_Ac = rng.normal(2.5, 0.05, n), rng.normal(1.6, 0.03, n)
+    params = dict(historian.DEFAULT_PARAMS, PLS_Cu=PLS_Cu, PLS_Ac=PLS_Ac,
+                  SR=TRUTH['SR'], Mef1e=TRUTH['Mef1e'], Mef2e=TRUTH['Mef2e'])
+    results = ConfigurationA_2Ex1S(SimSXCu()).simulate(TRUTH['v_v_percent'], params, plant_loading=True)
+    return {
+        'timestamp': np.datetime64('2026-01-01T00:00') + np.arange(n).astype('timedelta64[m]'),
+        'PLS_Cu': PLS_Cu,
+        'PLS_Ac': PLS_Ac,
+        'raffinate_Cu': results['raffinate_E2'],
+        'stripped_organic_Cu': results['C1Cuor_Str'],
+    }
+
+
+@pytest.fixture
+def history_csv(tmp_path):
+    records = synthetic_records()
+    path = tmp_path / 'history.csv'
+    with open(path, 'w', newline='') as handle:
+        writer = csv.writer(handle)
+        writer.writerow(list(records))
+        for row in zip(*records.values()):
+            writer.writerow([str(value) for value in row])
+    return path
+
+
+def test_default_start_has_finite_residuals():
+    config = ConfigurationA_2Ex1S(SimSXCu())
+    params = dict(historian.DEFAULT_PARAMS, raffinate_Cu_target=0.28, stripped_organic_Cu_target=1.8)
+    residuals, _ = config.option2_window_residuals(historian.INITIAL_GUESS, params)
+
+    assert np.isfinite(residuals).all()
+
+
+def test_rolling_windows_across_chunks():
+    chunks = [{'a': np.arange(0, 7.0)}, {'a': np.arange(7.0, 10.0)}, {'a': np.arange(10.0, 23.0)}]
+    windows = list(historian.rolling_windows(iter(chunks), 5, 4))
+
+    assert [first for first, _ in windows] == [0, 4, 8, 12, 16]
+    for first, window in windows:
+        np.testing.assert_array_equal(window['a'], np.arange(first, first + 5.0))
+
+
+def test_end_to_end_csv(history_csv, tmp_path):
+    output = tmp_path / 'fits.csv'
+    historian.main([str(history_csv), str(output), '--window', '60', '--step', '30', '--chunk-size', '50'])
+
+    with open(output, newline='') as handle:
+        rows = list(csv.DictReader(handle))
+    assert len(rows) == (240 - 60) // 30 + 1
+    assert all(row['success'] == 'True' for row in rows)
+    assert all(int(row['iterations']) > 0 for row in rows)
+    assert rows[-1]['timestamp'] == '2026-01-01T03:59:00'
+    assert all(float(row['rms_residual']) < 1e3 for row in rows)
+
+
+def test_end_to_end_npy(history_csv, tmp_path):
+    output = tmp_path / 'fits.npy'
+    historian.main([str(history_csv), str(output), '--window', '60', '--step', '60'])
+    fits = np.load(output)
+
+    assert fits.dtype == historian.RESULT_DTYPE
+    assert len(fits) == 4
+    assert fits['success'].all()
+    np.testing.assert_array_equal(fits['first_record'], [0, 60, 120, 180])
+
+
+def test_failed_start_falls_back_to_latin_hypercube_starts():
+    # (8, 90, 90, 95) has non-finite residuals for these records
+    records = synthetic_records(120)
+    chunk = {'PLS_Cu': records['PLS_Cu'], 'PLS_Ac': records['PLS_Ac'],
+             'raffinate_Cu_target': records['raffinate_Cu'],
+             'stripped_organic_Cu_target': records['stripped_organic_Cu']}
+    config = ConfigurationA_2Ex1S(SimSXCu())
+    fits = np.array(list(historian.fit_windows(config, historian.rolling_windows(iter([chunk]), 60, 30),
+                                               initial_guess=(8.0, 90.0, 90.0, 95.0))))
+
+    assert fits['success'].all()
+    assert fits['starts'][0] > 1
+    # Later windows start from the first successful fit
+    assert (fits['starts'][1:] == 1).all()
+
+
+def test_without_restarts_a_dead_start_fails():
+    records = synthetic_records(60)
+    chunk = {'PLS_Cu': records['PLS_Cu'], 'PLS_Ac': records['PLS_Ac'],
+             'raffinate_Cu_target': records['raffinate_Cu'],
+             'stripped_organic_Cu_target': records['stripped_organic_Cu']}
+    config = ConfigurationA_2Ex1S(SimSXCu())
+    fits = list(historian.fit_windows(config, historian.rolling_windows(iter([chunk]), 60, 60),
+                                      initial_guess=(8.0, 90.0, 90.0, 95.0), restarts=0))
+
+    assert not fits[0]['success']
+    assert fits[0]['starts'] == 1
+
+
+def test_incomplete_windows_are_not_fitted():
+    chunk = {'PLS_Cu': np.full(10, np.nan), 'PLS_Ac': np.full(10, 1.6),
+             'raffinate_Cu_target': np.full(10, 0.25), 'stripped_organic_Cu_target': np.full(10, 1.8)}
+    config = ConfigurationA_2Ex1S(SimSXCu())
+    fit, = historian.fit_windows(config, historian.rolling_windows(iter([chunk]), 10, 10), min_records=5)
+
+    assert fit['records'] == 0
+    assert np.isnan(fit['v_v_percent'])
+    assert not fit['success']
+
+
+def test_missing_target_column(tmp_path):
+    path = tmp_path / 'history.csv'
+    path.write_text('timestamp,PLS_Cu,PLS_Ac,raffinate_Cu\n2026-01-01T00:00,2.5,1.6,0.2\n')
+
+    with pytest.raises(ValueError, match='stripped_organic_Cu'):
+        next(historian.read_csv_chunks(str(path)))
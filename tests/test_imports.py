@@ -0,0 +1,37 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(code):
+    """The heavy modules loaded by running code in a fresh interpreter."""
+    script = code + "\nimport json, sys\nprint(json.dumps(sorted(m for m in ('scipy', 'pandas') if m in sys.modules)))"
+    env = dict(os.environ, SIMSXCU_SOLVER_WORKERS='0')
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_importing_the_app_loads_neither_scipy_nor_pandas():
+    assert loaded_after('import app.main') == []
+
+
+def test_designer_solve_needs_only_numpy():
+    assert loaded_after(
+        "import app.main as main\n"
+        "main.run_solve('designer', main.DesignerParams().dict())") == []
+
+
+def test_metallurgist_solve_loads_scipy():
+    assert loaded_after(
+        "import app.main as main\n"
+        "main.run_solve('metallurgist', main.MetallurgistParams().dict())") == ['scipy']
+
+
+def test_requirements_do_not_pull_in_pandas():
+    for path in ('requirements.txt', os.path.join('backend', 'requirements.txt')):
+        with open(os.path.join(ROOT, path)) as requirements:
+            assert 'pandas' not in requirements.read()
@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+
+import pytest
+
+import app.main as main
+from app.instrumentation import LATENCY_BUCKETS, Metrics, PhaseTimer, SampledProfiler, measure_call
+from app.simulation_engine import SimSXCu, StatsCounter
+
+
+def test_stats_counter_records_per_thread():
+    stats = StatsCounter(calls=0)
+    other_done = threading.Event()
+
+    def other():
+        stats.add(calls=5)
+        other_done.set()
+
+    with StatsCounter.record() as outer:
+        stats.add(calls=1)
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        with StatsCounter.record() as inner:
+            stats.add(calls=2, seconds=0.5)
+
+    assert other_done.is_set()
+    assert stats == {'calls': 8, 'seconds': 0.5}
+    # Only this thread's increments, nested blocks included
+    assert outer == {'calls': 3, 'seconds': 0.5}
+    assert inner == {'calls': 2, 'seconds': 0.5}
+
+
+def test_measure_call_counts_engine_work():
+    sim = SimSXCu()
+    result, breakdown = measure_call(sim.extraction_equilibrium_array, ([2.5, 2.6, 2.7], 1.6, 10.0, 3.0))
+
+    assert len(result) == 3
+    assert breakdown['counts'] == {'equilibrium_calls': 1, 'equilibrium_points': 3}
+    assert breakdown['worker_seconds'] > 0
+    assert 'profile' not in breakdown
+
+
+def test_measure_call_writes_a_profile(tmp_path):
+    profile = {'profiler': 'cprofile', 'directory': str(tmp_path), 'label': 'test'}
+    result, breakdown = measure_call(sum, ([1, 2, 3],), profile)
+
+    assert result == 6
+    assert breakdown['profile'].endswith('.prof') and os.path.exists(breakdown['profile'])
+
+
+def test_profiler_sampling(monkeypatch):
+    assert SampledProfiler().sample('solve') is None
+    assert SampledProfiler(rate=1.0, directory='d').sample('solve') == {'profiler': 'cprofile', 'directory': 'd',
+                                                                        'label': 'solve'}
+    with pytest.raises(ValueError):
+        SampledProfiler(profiler='perf')
+    monkeypatch.setenv('SIMSXCU_PROFILE_RATE', '0.25')
+    assert SampledProfiler.from_env().rate == 0.25
+
+
+def test_phase_timer():
+    timer = PhaseTimer()
+    with timer.phase('a'):
+        pass
+    timer.add('a', 1.0)
+    timer.add('b', 2.0)
+    assert set(timer.phases) == {'a', 'b'} and 1.0 <= timer.phases['a'] < 1.1
+
+
+def test_metrics_render():
+    metrics = Metrics(prefix='test')
+    metrics.describe('events_total', 'counter', 'Events.')
+    metrics.describe('depth', 'gauge', 'Depth.')
+    metrics.describe('latency_seconds', 'histogram', 'Latency.')
+    metrics.inc('events_total', kind='a')
+    metrics.inc('events_total', 2, kind='a')
+    metrics.inc('events_total', kind='say "hi"\n')
+    metrics.set('depth', 1.5)
+    metrics.observe('latency_seconds', 0.003, route='/x')
+    metrics.observe('latency_seconds', 100.0, route='/x')
+    lines = metrics.render().splitlines()
+
+    assert '# TYPE test_events_total counter' in lines
+    assert 'test_events_total{kind="a"} 3' in lines
+    assert 'test_events_total{kind="say \\"hi\\"\\n"} 1' in lines
+    assert 'test_depth 1.5' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="0.0025"} 0' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="0.005"} 1' in lines
+    assert f'test_latency_seconds_bucket{{route="/x",le="{LATENCY_BUCKETS[-1]:g}"}} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/x",le="+Inf"} 2' in lines
+    assert 'test_latency_seconds_sum{route="/x"} 100.003' in lines
+    assert 'test_latency_seconds_count{route="/x"} 2' in lines
+
+
+def metric(text, name):
+    found = re.search(rf'^{re.escape(name)} (\S+)$', text, re.MULTILINE)
+    return float(found.group(1)) if found else 0.0
+
+
+def test_solve_timings_and_metrics(client, monkeypatch):
+    monkeypatch.setattr(main, 'result_cache', main.SolveResultCache(maxsize=0))
+    before = client.get('/metrics').text
+    response = client.post('/api/v1/solve?timings=true', json={'mode': 'metallurgist', 'params': {}, 'config': 'B'})
+    after = client.get('/metrics').text
+
+    timings = response.json()['timings']
+    assert {'validation', 'queue', 'engine', 'objective', 'solver'} <= set(timings['phases_ms'])
+    assert timings['counts']['objective_calls'] > 0 and timings['counts']['equilibrium_calls'] > 0
+    assert timings['total_ms'] >= timings['phases_ms']['validation'] > 0
+    for name in ('simsxcu_objective_calls_total', 'simsxcu_solver_iterations_total',
+                 'simsxcu_equilibrium_points_total'):
+        assert metric(after, name) > metric(before, name)
+    assert 'simsxcu_solver_pool_pending 0' in after.splitlines()
+    route = 'simsxcu_http_request_duration_seconds_count{method="POST",route="/api/v1/solve",status="200"}'
+    assert metric(after, route) == metric(before, route) + 1
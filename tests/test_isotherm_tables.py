@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from app.simulation_engine import IsothermTable, SimSXCu
+
+
+@pytest.fixture
+def sim():
+    return SimSXCu()
+
+
+def table(sim, kind='extraction', n_cu=129, n_org=257):
+    max_org = 1.2 * float(sim.calculate_AML_array(10.0))
+    if kind == 'extraction':
+        return IsothermTable(sim._extraction_equilibrium_closed_form, 1.6, 10.0, cu_range=(0.5, 10.0),
+                             org_range=(max_org / n_org, max_org), n_cu=n_cu, n_org=n_org)
+    return IsothermTable(sim._stripping_equilibrium_closed_form, 190.0, 10.0, cu_range=(0.0, 80.0),
+                         org_range=(max_org / n_org, max_org), n_cu=n_cu, n_org=n_org)
+
+
+def random_errors(sim, table, kind='extraction', n=50000):
+    rng = np.random.default_rng(0)
+    Cu = rng.uniform(*table.cu_range, n)
+    C_org = rng.uniform(*table.org_range, n)
+    closed_form = getattr(sim, f'_{kind}_equilibrium_closed_form')
+    return np.abs(table.evaluate(Cu, C_org) - closed_form(Cu, table.acid, 10.0, C_org))
+
+
+def test_grid_points_are_exact(sim):
+    extraction = table(sim, n_cu=17, n_org=33)
+    Cu, C_org = extraction.cu_grid[:, None], extraction.org_grid[None, :]
+    interpolated = extraction.evaluate(Cu, C_org)
+    defined = np.isfinite(interpolated)
+
+    np.testing.assert_array_equal(extraction.values, sim._extraction_equilibrium_closed_form(Cu, 1.6, 10.0, C_org))
+    np.testing.assert_allclose(interpolated[defined], extraction.values[defined], rtol=1e-12)
+    # Next to the undefined region a cell with a NaN corner interpolates to NaN
+    assert np.isnan(extraction.values).any() and defined.mean() > 0.5
+
+
+@pytest.mark.parametrize('kind', ['extraction', 'stripping'])
+def test_max_error_bounds_the_interpolation_error(sim, kind):
+    tabulated = table(sim, kind)
+    errors = random_errors(sim, tabulated, kind)
+
+    assert np.isfinite(errors).mean() > 0.5
+    assert np.nanmax(errors) <= 1.1 * tabulated.max_error
+
+
+def test_finer_grids_cut_the_error_by_about_four(sim):
+    coarse, fine = table(sim, 'stripping', 65, 129), table(sim, 'stripping', 129, 257)
+    assert 3.5 < coarse.max_error / fine.max_error < 4.5
+
+    # The extraction isotherm's slope is unbounded at the edge of its undefined
+    # region, so there only the typical error scales like that
+    coarse, fine = table(sim, 'extraction', 65, 129), table(sim, 'extraction', 129, 257)
+    ratio = (np.nanpercentile(random_errors(sim, coarse), 99) / np.nanpercentile(random_errors(sim, fine), 99))
+    assert 2.5 < ratio < 4.5
+
+
+def test_scalar_lookup_matches_the_array_lookup(sim):
+    extraction = table(sim)
+    rng = np.random.default_rng(1)
+    for Cu, C_org in zip(rng.uniform(*extraction.cu_range, 50), rng.uniform(*extraction.org_range, 50)):
+        assert extraction.contains_point(Cu, C_org)
+        assert extraction.evaluate_point(Cu, C_org) == pytest.approx(float(extraction.evaluate(Cu, C_org)),
+                                                                     rel=1e-12, abs=1e-14, nan_ok=True)
+    assert not extraction.contains_point(11.0, 1.0)
+    np.testing.assert_array_equal(extraction.contains([5.0, 11.0, 5.0], [1.0, 1.0, 100.0]), [True, False, False])
+
+
+def test_table_mode_in_the_engine(sim):
+    exact = sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0)
+    sim.enable_isotherm_tables(maxsize=2)
+    cached = sim.isotherm_table('extraction', 1.6, 10.0)
+
+    assert sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0) == pytest.approx(exact, abs=cached.max_error)
+    assert sim.extraction_equilibrium(2.5, 1.6, 10.0, 3.0) == cached.evaluate_point(2.5, 3.0)
+    # Arrays and points outside the table use the closed form
+    assert sim.extraction_equilibrium_array([2.5], 1.6, 10.0, [3.0])[0] == exact
+    assert sim.extraction_equilibrium(25.0, 1.6, 10.0, 3.0) == SimSXCu().extraction_equilibrium(25.0, 1.6, 10.0, 3.0)
+
+
+def test_tables_are_kept_in_an_lru(sim):
+    sim.enable_isotherm_tables(maxsize=2, n_cu=9, n_org=9)
+    first = sim.isotherm_table('extraction', 1.6, 10.0)
+    sim.isotherm_table('stripping', 190.0, 10.0)
+    assert sim.isotherm_table('extraction', 1.6, 10.0) is first
+    sim.isotherm_table('extraction', 1.6, 12.0)
+
+    assert len(sim.isotherm_tables) == 2
+    assert sim.isotherm_table('extraction', 1.6, 10.0) is first
+    assert ('Lix984N', 'stripping', 190.0, 10.0) not in sim.isotherm_tables
+    sim.disable_isotherm_tables()
+    assert sim.isotherm_tables is None
@@ -0,0 +1,92 @@
+import cmath
+
+import numpy as np
+import pytest
+
+from app.simulation_engine import SimSXCu
+
+
+def reference_equilibrium(Cu, Ac, v_v_percent, C_org, term1):
+    """The baseline scalar isotherm: complex where the closed form is undefined."""
+    term2 = (3.303 * v_v_percent - 3.0842 * C_org) ** 2 / C_org
+    A = -1.299 * Ac - 2 * Cu - 0.422 * term1 * term2
+    return (-A - cmath.sqrt(A ** 2 - 4 * (0.644 * Ac + Cu) ** 2)) / 2
+
+
+def reference_extraction(PLS_Cu, PLS_Ac, v_v_percent, C_org):
+    term1 = -28.511 * v_v_percent ** -1.746 * C_org + 11.711 * v_v_percent ** -0.646
+    return reference_equilibrium(PLS_Cu, PLS_Ac, v_v_percent, C_org, term1)
+
+
+def reference_stripping(SP_Cu, SP_Ac, v_v_percent, C_org):
+    term1 = (4.8579 / 1000 * v_v_percent - 0.19183) * C_org + 11.365 * v_v_percent ** -0.85
+    return reference_equilibrium(SP_Cu, SP_Ac, v_v_percent, C_org, term1)
+
+
+@pytest.fixture
+def sim():
+    sim = SimSXCu()
+    sim.disable_cache()
+    return sim
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    n = 500
+    return rng.uniform(0.5, 6.0, n), rng.uniform(0.5, 9.0, n), rng.uniform(5.0, 30.0, n), rng.uniform(0.1, 10.0, n)
+
+
+@pytest.mark.parametrize('kind, scale', [('extraction', 1), ('stripping', 50)])
+def test_arrays_match_the_scalar_formula(sim, points, kind, scale):
+    Cu, Ac, v_v_percent, C_org = points
+    Cu, Ac = Cu * scale, Ac * scale
+    array = getattr(sim, f'{kind}_equilibrium_array')(Cu, Ac, v_v_percent, C_org)
+    reference = {'extraction': reference_extraction, 'stripping': reference_stripping}[kind]
+
+    assert array.shape == Cu.shape
+    defined = 0
+    for i in range(len(Cu)):
+        expected = reference(Cu[i], Ac[i], v_v_percent[i], C_org[i])
+        if expected.imag == 0:
+            assert array[i] == pytest.approx(expected.real, rel=1e-12, abs=1e-12)
+            defined += 1
+        else:
+            # Complex in the baseline, NaN in the array version
+            assert np.isnan(array[i])
+    assert 0 < defined
+
+
+def test_scalar_methods_wrap_the_arrays(sim, points):
+    Cu, Ac, v_v_percent, C_org = (values[:20] for values in points)
+    extraction = sim.extraction_equilibrium_array(Cu, Ac, v_v_percent, C_org)
+    ML = sim.calculate_ML_array(Cu, Ac, v_v_percent, C_org)
+    for i in range(20):
+        value = sim.extraction_equilibrium(Cu[i], Ac[i], v_v_percent[i], C_org[i])
+        assert isinstance(value, float)
+        np.testing.assert_equal(value, extraction[i])
+        np.testing.assert_equal(sim.calculate_ML(Cu[i], Ac[i], v_v_percent[i], C_org[i]), ML[i])
+        np.testing.assert_equal(sim.stripping_equilibrium(30.0, 190.0, v_v_percent[i], C_org[i]),
+                                sim.stripping_equilibrium_array(30.0, 190.0, v_v_percent[i], C_org[i]))
+
+
+def test_inputs_broadcast(sim):
+    v_v_percent = np.linspace(5.0, 30.0, 6)[:, None]
+    C_org = np.linspace(0.5, 5.0, 4)
+    grid = sim.extraction_equilibrium_array(2.5, 1.6, v_v_percent, C_org)
+
+    assert grid.shape == (6, 4)
+    assert grid[2, 3] == sim.extraction_equilibrium(2.5, 1.6, float(v_v_percent[2, 0]), float(C_org[3]))
+
+
+def test_undefined_points_are_nan(sim):
+    values = sim.extraction_equilibrium_array([2.5, 2.5], [1.6, 1.6], [10.0, 10.0], [0.0, 3.0])
+    assert np.isnan(values[0]) and np.isfinite(values[1])
+    assert np.isnan(sim.calculate_AML_array(-1.0))
+    assert np.isnan(sim.extraction_equilibrium(2.5, 1.6, 10.0, 0.0))
+
+
+def test_aml(sim):
+    v_v_percent = np.array([5.0, 10.0, 20.0])
+    np.testing.assert_allclose(sim.calculate_AML_array(v_v_percent), 0.4108 * v_v_percent ** 1.1, rtol=1e-15)
+    assert sim.calculate_AML(10.0) == pytest.approx(0.4108 * 10.0 ** 1.1, rel=1e-15)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from app import kernels
+from app.simulation_engine import ConfigurationA_2Ex1S, SimSXCu
+
+compiled = pytest.mark.skipif(not kernels.AVAILABLE, reason="numba is not installed")
+
+
+@pytest.fixture
+def kernel_config():
+    """Configuration A on the kernels: compiled with numba, else their plain Python source."""
+    sim = SimSXCu()
+    sim.disable_cache()
+    if kernels.AVAILABLE:
+        kernels.warm_up()
+    sim.use_kernels(kernels)
+    return ConfigurationA_2Ex1S(sim)
+
+
+def test_select():
+    assert kernels.select('numpy') is None
+    with pytest.raises(ValueError):
+        kernels.select('fortran')
+    if kernels.AVAILABLE:
+        assert kernels.select('auto') is kernels
+    else:
+        assert kernels.select('auto') is None
+        with pytest.raises(RuntimeError):
+            kernels.select('numba')
+
+
+@pytest.mark.parametrize('v_v_percent', [6.0, 10.0, 14.0, 18.0])
+def test_option1_residual_matches_numpy(config, kernel_config, option1_params, v_v_percent):
+    residual, gradient = kernel_config.option1_residual([v_v_percent], option1_params)
+    expected_residual, expected_gradient = config.option1_residual([v_v_percent], option1_params)
+
+    assert residual == expected_residual
+    np.testing.assert_array_equal(gradient, expected_gradient)
+
+
+@pytest.mark.parametrize('x', [
+    [10.0, 90.0, 92.0, 95.0],
+    [12.0, 75.0, 85.0, 99.0],
+    [25.0, 98.0, 72.0, 80.0],
+    [8.0, 90.0, 90.0, 95.0],  # undefined raffinate: NaN in both
+])
+def test_option2_residuals_match_numpy(config, kernel_config, option2_params, x):
+    residuals, jacobian = kernel_config.option2_residuals(x, option2_params)
+    expected_residuals, expected_jacobian = config.option2_residuals(x, option2_params)
+
+    np.testing.assert_array_equal(residuals, expected_residuals)
+    np.testing.assert_array_equal(jacobian, expected_jacobian)
+
+
+@compiled
+def test_isotherm_arrays_match_numpy(config, kernel_config):
+    rng = np.random.default_rng(0)
+    v_v_percent = rng.uniform(5.0, 30.0, 1000)
+    C_org = rng.uniform(0.0, 8.0, 1000)
+    Cu, Ac = np.full(1000, 2.5), np.full(1000, 1.6)
+
+    np.testing.assert_array_equal(kernel_config.sim.extraction_equilibrium_array(Cu, Ac, v_v_percent, C_org),
+                                  config.sim.extraction_equilibrium_array(Cu, Ac, v_v_percent, C_org))
+    np.testing.assert_array_equal(
+        kernel_config.sim.stripping_equilibrium_array(Cu * 12, Ac * 120, v_v_percent, C_org),
+        config.sim.stripping_equilibrium_array(Cu * 12, Ac * 120, v_v_percent, C_org))
+
+
+@compiled
+def test_option1_balance_matches_numpy(config, kernel_config, option1_params):
+    v_v_percent = np.linspace(5.0, 30.0, 101)
+    params = {name: np.full_like(v_v_percent, value, dtype=float) for name, value in option1_params.items()}
+
+    np.testing.assert_array_equal(kernel_config.option1_balance(v_v_percent, params),
+                                  config.option1_balance(v_v_percent, params))
+
+
+def elementwise(kernel):
+    """A ufunc kernel: compiled with numba, else its plain Python source applied point by point."""
+    return kernel if kernels.AVAILABLE else np.vectorize(kernel, otypes=[float])
+
+
+# Compiled kernels match NumPy exactly; Python's float ** may differ from NumPy's in the last bit
+RTOL = 0.0 if kernels.AVAILABLE else 1e-14
+
+
+def test_isotherm_kernels_match_numpy(config):
+    rng = np.random.default_rng(1)
+    v_v_percent = rng.uniform(5.0, 30.0, 200)
+    C_org = rng.uniform(0.1, 8.0, 200)
+    Cu, Ac = rng.uniform(0.5, 6.0, 200), rng.uniform(0.5, 9.0, 200)
+
+    np.testing.assert_allclose(
+        elementwise(kernels.extraction_equilibrium)(Cu, Ac, v_v_percent, C_org,
+                                                    v_v_percent ** -1.746, v_v_percent ** -0.646),
+        config.sim.extraction_equilibrium_array(Cu, Ac, v_v_percent, C_org), rtol=RTOL)
+    np.testing.assert_allclose(
+        elementwise(kernels.stripping_equilibrium)(Cu * 12, Ac * 120, v_v_percent, C_org, v_v_percent ** -0.85),
+        config.sim.stripping_equilibrium_array(Cu * 12, Ac * 120, v_v_percent, C_org), rtol=RTOL)
+
+
+def test_option1_balance_kernel_matches_numpy(config, option1_params):
+    v_v_percent = np.linspace(5.0, 30.0, 101)
+    params = {name: np.full_like(v_v_percent, value, dtype=float) for name, value in option1_params.items()}
+    fields = [params[name] for name in ('PLS_Cu', 'PLS_Ac', 'O_A_Ext', 'Mef1e', 'Mef2e',
+                                        'SP_Cu', 'SP_Ac', 'AD_Cu', 'Mef1s')]
+    LO = config.sim.calculate_AML_array(v_v_percent) * params['SR'] / 100
+    powers = kernels.v_powers(v_v_percent, 3)
+
+    balance = elementwise(kernels.option1_balance)(*fields, v_v_percent, LO,
+                                                   powers[..., 0], powers[..., 1], powers[..., 2])
+    np.testing.assert_allclose(balance, config.option1_balance(v_v_percent, params), rtol=RTOL, atol=RTOL)
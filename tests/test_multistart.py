@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.simulation_engine import SolverEngine
+
+BOUNDS = [(0.0, 10.0), (-5.0, 5.0)]
+
+
+def bowl(x, params):
+    value = (x[0] - params['a']) ** 2 + (x[1] - params['b']) ** 2
+    return value, np.array([2 * (x[0] - params['a']), 2 * (x[1] - params['b'])])
+
+
+def test_latin_hypercube_starts():
+    starts = SolverEngine.latin_hypercube_starts(BOUNDS, 8, seed=3)
+
+    assert starts.shape == (8, 2)
+    # One start in each of the 8 strata of every variable
+    assert sorted(np.floor(starts[:, 0] / 10 * 8).astype(int)) == list(range(8))
+    assert sorted(np.floor((starts[:, 1] + 5) / 10 * 8).astype(int)) == list(range(8))
+    np.testing.assert_array_equal(starts, SolverEngine.latin_hypercube_starts(BOUNDS, 8, seed=3))
+
+
+def test_stops_at_the_first_start_within_tolerance():
+    result = SolverEngine().solve_multistart(bowl, BOUNDS, {'a': 3.0, 'b': 1.0}, ['x', 'y'], jac=True,
+                                             n_starts=8, tolerance=1e-6, seed=0)
+    assert result['success']
+    assert (result['starts_run'], result['starts_requested']) == (1, 8)
+    assert (result['x'], result['y']) == pytest.approx((3.0, 1.0), abs=1e-4)
+
+
+def test_runs_every_start_when_none_reaches_the_tolerance():
+    # The minimum is outside the bounds, at objective 1
+    params = {'a': 11.0, 'b': 0.0}
+    result = SolverEngine().solve_multistart(bowl, BOUNDS, params, ['x', 'y'], jac=True,
+                                             n_starts=6, tolerance=1e-6, seed=0)
+    assert result['starts_run'] == result['starts_converged'] == 6
+    assert result['starts_within_tolerance'] == 0
+    assert result['objective_value'] == pytest.approx(1.0, abs=1e-6)
+    assert result['spread']['x']['max'] - result['spread']['x']['min'] < 1e-4
+
+
+def test_parallel_starts_match_serial_ones():
+    params = {'a': 11.0, 'b': 2.0}
+    serial = SolverEngine().solve_multistart(bowl, BOUNDS, params, ['x', 'y'], jac=True, n_starts=4,
+                                             tolerance=0.0, seed=1)
+    with ThreadPoolExecutor(2) as executor:
+        parallel = SolverEngine().solve_multistart(bowl, BOUNDS, params, ['x', 'y'], jac=True, n_starts=4,
+                                                   tolerance=0.0, seed=1, executor=executor)
+    assert parallel['starts_run'] == 4
+    assert parallel['objective_value'] == pytest.approx(serial['objective_value'], abs=1e-9)
+
+
+def test_summary_prefers_finite_objectives():
+    runs = [
+        {'x': [1.0, 2.0], 'objective_value': np.nan, 'success': False, 'iterations': 1},
+        {'x': [3.0, 4.0], 'objective_value': 0.5, 'success': True, 'iterations': 5},
+        {'x': [5.0, 4.0], 'objective_value': 0.7, 'success': True, 'iterations': 5},
+        {'x': [9.0, 9.0], 'objective_value': 0.1, 'success': False, 'iterations': 5},
+    ]
+    summary = SolverEngine.summarize_starts(runs, ['x', 'y'], 10, tolerance=0.6)
+
+    assert (summary['x'], summary['objective_value'], summary['success']) == (9.0, 0.1, False)
+    assert summary['starts_converged'] == 2 and summary['starts_within_tolerance'] == 1
+    # The spread is over converged starts only
+    assert summary['spread']['x'] == {'min': 3.0, 'max': 5.0, 'std': 1.0}
+
+
+def test_multistart_endpoint(client):
+    request = {'mode': 'metallurgist', 'params': {}, 'config': 'B', 'n_starts': 4, 'seed': 7, 'tolerance': 0}
+    first = client.post('/api/v1/solve/multistart', json=request).json()
+    second = client.post('/api/v1/solve/multistart', json=request).json()
+
+    assert first['starts_run'] == 4
+    assert set(first['spread']) == {'v_v_percent', 'saturation_ratio', 'mixer_eff1', 'mixer_eff2'}
+    # The same seed gives the same starts, so the same answer
+    assert second == first
+
+
+@pytest.mark.parametrize('request_body', [
+    {'mode': 'planner', 'params': {}},
+    {'mode': 'designer', 'params': {}, 'config': 'Z'},
+    {'mode': 'designer', 'params': {'PLS_Cu': 'lots'}},
+])
+def test_invalid_multistart_requests(client, request_body):
+    assert client.post('/api/v1/solve/multistart', json=request_body).status_code == 400
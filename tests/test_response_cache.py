@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from app.response_cache import SolveResultCache
+
+
+def test_key_is_canonical():
+    assert SolveResultCache.make_key('designer', {'a': 400, 'b': 1.5}) \
+        == SolveResultCache.make_key('designer', {'b': 1.5, 'a': 400.0})
+    assert SolveResultCache.make_key('designer', {'a': 1}) != SolveResultCache.make_key('designer', {'a': 1}, 'B')
+    assert SolveResultCache.make_key('designer', {'a': 1}) \
+        != SolveResultCache.make_key('designer', {'a': 1}, trace=True)
+
+
+def test_lru_and_ttl(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr('app.response_cache.time.monotonic', lambda: now[0])
+    cache = SolveResultCache(maxsize=2, ttl=10.0)
+    cache.put('a', {'success': True})
+    cache.put('b', {'success': True})
+    cache.get('a')
+    cache.put('c', {'success': True})
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    now[0] = 11.0
+    assert cache.get('a') is None
+
+
+class Solve:
+    """A solve that waits until released and counts its runs."""
+
+    def __init__(self, result=None, error=None):
+        self.result = result if result is not None else {'success': True, 'x': 1.0}
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_misses_are_coalesced():
+    async def scenario():
+        cache = SolveResultCache()
+        solve = Solve()
+        callers = [asyncio.ensure_future(cache.get_or_solve('k', solve)) for _ in range(5)]
+        await asyncio.sleep(0)
+        solve.release.set()
+        results = await asyncio.gather(*callers)
+
+        assert solve.calls == 1
+        assert all(result is solve.result for result in results)
+        assert (cache.misses, cache.coalesced) == (1, 4)
+        assert await cache.get_or_solve('k', Solve()) is solve.result
+        assert cache.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_first_caller_does_not_cancel_the_others():
+    async def scenario():
+        cache = SolveResultCache()
+        solve = Solve()
+        first = asyncio.ensure_future(cache.get_or_solve('k', solve))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_solve('k', Solve()))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        solve.release.set()
+
+        assert await second is solve.result
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert solve.calls == 1
+        # The solve still completed and was cached
+        assert cache.get('k') is solve.result
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_the_solve():
+    async def scenario():
+        cache = SolveResultCache()
+        solve = Solve()
+        first = asyncio.ensure_future(cache.get_or_solve('k', solve))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_solve('k', Solve()))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        solve.release.set()
+
+        assert await first is solve.result
+        assert waiter.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_failures_are_shared_but_not_cached():
+    async def scenario():
+        cache = SolveResultCache()
+        failing = Solve(error=RuntimeError('pool broke'))
+        callers = [asyncio.ensure_future(cache.get_or_solve('k', failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        failing.release.set()
+        outcomes = await asyncio.gather(*callers, return_exceptions=True)
+        assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+        unsuccessful = Solve(result={'success': False})
+        unsuccessful.release.set()
+        assert await cache.get_or_solve('k', unsuccessful) == {'success': False}
+        assert cache.get('k') is None
+
+        retried = Solve()
+        retried.release.set()
+        assert await cache.get_or_solve('k', retried) is retried.result
+        assert cache.get('k') is retried.result
+
+    asyncio.run(scenario())
+
+
+def test_abandoned_failure_is_retrieved(caplog):
+    async def scenario():
+        cache = SolveResultCache()
+        failing = Solve(error=RuntimeError('lost'))
+        only = asyncio.ensure_future(cache.get_or_solve('k', failing))
+        await asyncio.sleep(0)
+        only.cancel()
+        failing.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert 'k' not in cache._inflight
+
+    asyncio.run(scenario())
+    assert 'never retrieved' not in caplog.text
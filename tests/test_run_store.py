@@ -0,0 +1,159 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from app.run_store import INDEXED_FIELDS, RunStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RunStore(str(tmp_path / 'runs.db'), batch_size=64, flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def add_run(store, key, mode='designer', config_id='A', success=True, **fields):
+    params = dict({'PLS_flow': 400.0, 'PLS_Cu': 2.5, 'PLS_Ac': 1.6, 'O_A_Ext': 1.0}, **fields)
+    result = {'success': success, 'v_v_percent': fields.get('v_v_percent', 10.0), 'objective_value': 0.0,
+              'iterations': 3}
+    store.add(key, mode, config_id, params, result, solve_seconds=0.01)
+    return result
+
+
+def test_get_sees_queued_and_written_runs(store):
+    result = add_run(store, 'a', PLS_Cu=2.0)
+    # Visible before the writer has committed it, and after
+    assert store.get('a') == result
+    store.flush()
+    assert store.get('a') == result
+    assert store.get('missing') is None
+    assert len(store) == 1
+
+
+def test_same_key_replaces_run(store):
+    add_run(store, 'a', PLS_Cu=2.0)
+    add_run(store, 'a', PLS_Cu=3.0)
+
+    runs = store.query()
+    assert len(runs) == 1
+    assert runs[0]['PLS_Cu'] == 3.0
+
+
+def test_range_query(store):
+    for i in range(20):
+        add_run(store, f'run-{i}', PLS_Cu=1.0 + 0.1 * i, success=i % 2 == 0,
+                mode='designer' if i < 10 else 'metallurgist')
+
+    runs = store.query({'PLS_Cu': (1.45, 2.05)})
+    assert sorted(run['PLS_Cu'] for run in runs) == pytest.approx([1.5, 1.6, 1.7, 1.8, 1.9, 2.0])
+    # Newest first
+    assert [run['PLS_Cu'] for run in runs] == sorted((run['PLS_Cu'] for run in runs), reverse=True)
+
+    assert len(store.query({'PLS_Cu': (None, 1.25)})) == 3
+    assert [run['PLS_Cu'] for run in store.query({'PLS_Cu': (1.45, 2.05)}, mode='metallurgist')] \
+        == pytest.approx([2.0])
+    assert all(run['success'] for run in store.query(success=True, limit=100))
+    assert len(store.query(limit=5, offset=18)) == 2
+    with pytest.raises(ValueError):
+        store.query({'SR': (0, 1)})
+
+
+def brute_force_nearest(runs, point, k):
+    fields = list(point)
+    values = np.array([[run[field] for field in fields] for run in runs])
+    scale = values.max(axis=0) - values.min(axis=0)
+    scale[scale == 0] = 1.0
+    distances = np.sqrt((((values - [point[field] for field in fields]) / scale) ** 2).sum(axis=1))
+    order = np.argsort(distances, kind='stable')[:k]
+    return [runs[i] for i in order], distances[order]
+
+
+@pytest.mark.parametrize('point', [
+    {'PLS_Cu': 2.5},
+    {'PLS_Cu': 1.1, 'PLS_Ac': 9.0},
+    {'PLS_Ac': 0.2, 'v_v_percent': 29.0},
+    {'PLS_Cu': 10.0, 'PLS_Ac': 5.0, 'v_v_percent': 5.0},
+])
+def test_nearest_is_exact(store, point):
+    rng = np.random.default_rng(0)
+    runs = []
+    for i in range(500):
+        fields = {'PLS_Cu': rng.uniform(0.5, 5.0), 'PLS_Ac': rng.uniform(0.5, 10.0),
+                  'v_v_percent': rng.uniform(5.0, 30.0)}
+        add_run(store, f'run-{i}', **fields)
+        runs.append(fields)
+
+    found = store.nearest(point, k=7)
+    expected, distances = brute_force_nearest(runs, point, 7)
+
+    assert [run['params']['PLS_Cu'] for run in found] == [run['PLS_Cu'] for run in expected]
+    np.testing.assert_allclose([run['distance'] for run in found], distances, rtol=1e-12)
+
+
+def test_nearest_scales_by_the_filtered_runs(store):
+    # Metallurgist runs spread PLS_Cu over 0-100; the designer runs only over 0-1
+    for i in range(11):
+        add_run(store, f'designer-{i}', PLS_Cu=i / 10, PLS_Ac=1.0)
+        add_run(store, f'metallurgist-{i}', mode='metallurgist', PLS_Cu=10.0 * i, PLS_Ac=1.0)
+
+    found = store.nearest({'PLS_Cu': 0.52}, k=2, mode='designer')
+
+    assert [run['PLS_Cu'] for run in found] == pytest.approx([0.5, 0.6])
+    np.testing.assert_allclose([run['distance'] for run in found], [0.02, 0.08], rtol=1e-9)
+    assert store.nearest({'PLS_Cu': 0.5}, mode='designer', config_id='B') == []
+    with pytest.raises(ValueError):
+        store.nearest({})
+
+
+def test_export(store):
+    for i in range(5):
+        add_run(store, f'run-{i}', PLS_Cu=1.0 + i, success=i != 2)
+
+    lines = ''.join(store.export('ndjson', chunk_size=2)).splitlines()
+    runs = [json.loads(line) for line in lines]
+    assert [run['PLS_Cu'] for run in runs] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert runs[2]['success'] is False
+    assert runs[0]['params']['PLS_Cu'] == 1.0
+
+    csv_text = ''.join(store.export('csv', success=True))
+    header, *rows = csv_text.splitlines()
+    assert header.split(',')[:4] == ['id', 'created', 'mode', 'config']
+    assert len(rows) == 4
+    assert set(INDEXED_FIELDS) <= set(header.split(','))
+
+    with pytest.raises(ValueError):
+        list(store.export('xml'))
+
+
+def test_writer_survives_a_failed_batch(store):
+    add_run(store, 'before')
+    store.flush()
+    # A row of the wrong arity makes its batch's INSERT fail
+    with store._pending_lock:
+        store._pending['broken'] = ('x',)
+    store._queue.put(('broken', ('x',)))
+
+    flushed = threading.Thread(target=store.flush)
+    flushed.start()
+    flushed.join(5)
+    assert not flushed.is_alive()
+    assert store.get('broken') is None
+
+    add_run(store, 'after')
+    assert len(store) == 2
+    assert store.get('after') is not None
+
+
+def test_runs_persist_across_stores(tmp_path):
+    path = str(tmp_path / 'runs.db')
+    first = RunStore(path)
+    add_run(first, 'a', PLS_Cu=2.0)
+    first.close()
+
+    second = RunStore(path)
+    try:
+        assert second.get('a')['success'] is True
+    finally:
+        second.close()
@@ -0,0 +1,71 @@
+import re
+
+import pytest
+
+import app.main as main
+from app.run_store import RunStore
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = RunStore(str(tmp_path / 'runs.db'), flush_interval=0.05)
+    monkeypatch.setattr(main, 'run_store', store)
+    monkeypatch.setattr(main, 'result_cache', main.SolveResultCache(maxsize=0))
+    yield store
+    store.close()
+
+
+def stored_hits(client):
+    found = re.search(r'^simsxcu_result_cache_events_total\{event="stored"\} (\S+)$',
+                      client.get('/metrics').text, re.MULTILINE)
+    return float(found.group(1)) if found else 0.0
+
+
+def test_batch_results_are_stored_with_validated_params(client, store):
+    cases = [{'mode': 'designer', 'params': {'PLS_Cu': 2.0 + 0.25 * i}} for i in range(4)]
+    cases.append({'mode': 'designer', 'params': {'PLS_Cu': 'not a number'}})
+    response = client.post('/api/v1/solve/batch', json={'cases': cases})
+
+    results = response.json()['results']
+    assert response.status_code == 200
+    assert all(set(result) == {'index', 'result', 'error'} for result in results)
+    assert results[4]['error'] is not None
+
+    runs = client.post('/api/v1/runs/query', json={'ranges': {'PLS_Cu': [1.9, 2.8]}}).json()['runs']
+    assert sorted(run['PLS_Cu'] for run in runs) == [2.0, 2.25, 2.5, 2.75]
+    # The stored inputs are the validated ones, defaults included
+    assert all(run['params']['PLS_Ac'] == 1.6 for run in runs)
+
+
+def test_solve_is_answered_from_the_store(client, store, feasible_designer_params):
+    params = feasible_designer_params
+    hits = stored_hits(client)
+    first = client.post('/api/v1/solve', json={'mode': 'designer', 'params': params}).json()
+    store.flush()
+    assert len(store) == 1
+
+    second = client.post('/api/v1/solve', json={'mode': 'designer', 'params': params}).json()
+    assert first['success']
+    assert second == first
+    assert stored_hits(client) == hits + 1
+
+
+def test_nearest_and_export_endpoints(client, store):
+    client.post('/api/v1/solve/batch', json={'cases': [
+        {'mode': 'designer', 'params': {'PLS_Cu': value}} for value in (1.5, 2.0, 2.5, 3.0)]})
+
+    nearest = client.post('/api/v1/runs/nearest', json={'point': {'PLS_Cu': 2.4}, 'k': 2}).json()['runs']
+    assert [run['PLS_Cu'] for run in nearest] == [2.5, 2.0]
+
+    export = client.get('/api/v1/runs/export', params={'format': 'ndjson'})
+    assert export.status_code == 200
+    assert len(export.text.splitlines()) == 4
+
+    assert client.post('/api/v1/runs/nearest', json={'point': {'SR': 1.0}}).status_code == 400
+    assert client.get('/api/v1/runs/export', params={'format': 'xml'}).status_code == 400
+
+
+def test_runs_endpoints_without_a_store(client, monkeypatch):
+    monkeypatch.setattr(main, 'run_store', None)
+
+    assert client.post('/api/v1/runs/query', json={}).status_code == 404
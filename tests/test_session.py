@@ -0,0 +1,133 @@
+import math
+
+import pytest
+
+import app.main as main
+from app.session import CircuitSession, DependencyGraph
+
+
+@pytest.fixture
+def inputs(option1_params):
+    return dict(option1_params, v_v_percent=10.0)
+
+
+@pytest.fixture
+def session_timing(monkeypatch):
+    # Wide enough that messages sent back to back always land in one batch
+    monkeypatch.setattr(main, 'SESSION_DEBOUNCE_SECONDS', 0.3)
+    monkeypatch.setattr(main, 'SESSION_MAX_DELAY_SECONDS', 2.0)
+
+
+def test_graph_recomputes_only_downstream_nodes():
+    calls = []
+    graph = DependencyGraph({'a': 1.0, 'b': 2.0})
+    graph.add('double_a', ('a',), lambda a: calls.append('double_a') or 2 * a)
+    graph.add('sign_b', ('b',), lambda b: calls.append('sign_b') or math.copysign(1.0, b))
+    graph.add('total', ('double_a', 'sign_b'), lambda x, y: calls.append('total') or x + y)
+    calls.clear()
+
+    changed, recomputed = graph.update({'a': 3.0})
+    assert changed == {'a': 3.0, 'double_a': 6.0, 'total': 7.0}
+    assert recomputed == calls == ['double_a', 'total']
+
+    # sign_b does not change, so total is not recomputed
+    changed, recomputed = graph.update({'b': 5.0})
+    assert changed == {'b': 5.0}
+    assert recomputed == ['sign_b']
+
+    assert graph.update({'a': 3.0}) == ({}, [])
+    with pytest.raises(ValueError, match='Unknown input total'):
+        graph.update({'total': 1.0})
+    with pytest.raises(ValueError, match='unknown c'):
+        graph.add('bad', ('c',), lambda c: c)
+
+
+def test_circuit_session_matches_simulate(config, inputs):
+    session = CircuitSession(config, inputs)
+    expected = config.simulate(10.0, inputs)
+    for name, value in session.state()['values'].items():
+        assert value == pytest.approx(float(expected[name]), rel=1e-12, nan_ok=True)
+
+    delta = session.update({'Mef1s': 90.0})
+    assert delta['inputs'] == {'Mef1s': 90.0}
+    assert delta['recomputed'] == ['C1Cuor_Str', 'net_transfer']
+    expected = config.simulate(10.0, dict(inputs, Mef1s=90.0))
+    for name, value in delta['values'].items():
+        assert value == pytest.approx(float(expected[name]), rel=1e-12)
+
+
+def test_session_sends_sequenced_coalesced_deltas(client, session_timing):
+    with client.websocket_connect('/api/v1/session') as websocket:
+        state = websocket.receive_json()
+        assert state['event'] == 'state'
+        assert state['inputs']['v_v_percent'] == 10.0
+
+        for PLS_Cu in (2.6, 2.7, 2.8):
+            websocket.send_json({'type': 'set', 'inputs': {'PLS_Cu': PLS_Cu}})
+        delta = websocket.receive_json()
+        assert delta['event'] == 'delta'
+        assert (delta['seq'], delta['coalesced']) == (1, 3)
+        assert delta['inputs'] == {'PLS_Cu': 2.8}
+        expected = main.config.simulate(10.0, dict(state['inputs'], PLS_Cu=2.8))
+        assert delta['values']['loaded_organic'] == pytest.approx(float(expected['loaded_organic']), rel=1e-12)
+
+        websocket.send_json({'type': 'set', 'inputs': {'SR': 90}})
+        delta = websocket.receive_json()
+        assert (delta['seq'], delta['coalesced']) == (2, 1)
+        assert 'LO' in delta['values']
+
+
+def test_session_reports_invalid_messages_and_carries_on(client, session_timing):
+    with client.websocket_connect('/api/v1/session') as websocket:
+        websocket.receive_json()
+        websocket.send_text('not json')
+        assert websocket.receive_json()['event'] == 'error'
+        websocket.send_json({'type': 'set', 'inputs': {'nope': 1}})
+        assert websocket.receive_json() == {'event': 'error', 'detail': "Unknown input 'nope'."}
+        websocket.send_json({'type': 'set', 'inputs': {'SR': 'high'}})
+        assert websocket.receive_json() == {'event': 'error', 'detail': "Input 'SR' must be a number."}
+
+        websocket.send_json({'type': 'set', 'inputs': {'SR': 90}})
+        delta = websocket.receive_json()
+        assert (delta['event'], delta['seq'], delta['inputs']) == ('delta', 1, {'SR': 90.0})
+
+
+def test_session_solve_moves_v_v_percent(client, session_timing, feasible_designer_params):
+    with client.websocket_connect('/api/v1/session') as websocket:
+        websocket.receive_json()
+        websocket.send_json({'type': 'set', 'inputs': feasible_designer_params})
+        websocket.send_json({'type': 'solve'})
+        changed = websocket.receive_json()
+        solved = websocket.receive_json()
+
+        assert (changed['seq'], solved['seq']) == (1, 2)
+        assert solved['solve']['success']
+        v_v_percent = solved['inputs']['v_v_percent']
+        assert v_v_percent == pytest.approx(solved['solve']['v_v_percent'])
+        params = main.DesignerParams(**feasible_designer_params).dict()
+        assert abs(float(main.config.option1_balance(v_v_percent, params))) < 1e-6
+
+
+def test_failed_solve_is_reported_and_the_session_carries_on(client, session_timing, monkeypatch):
+    def broken_solve(inputs):
+        raise RuntimeError('solver crashed')
+
+    monkeypatch.setattr(main, 'run_session_solve', broken_solve)
+    with client.websocket_connect('/api/v1/session') as websocket:
+        websocket.receive_json()
+        websocket.send_json({'type': 'solve'})
+        assert websocket.receive_json() == {'event': 'error', 'detail': 'An unexpected error occurred: solver crashed'}
+
+        websocket.send_json({'type': 'set', 'inputs': {'SR': 90}})
+        delta = websocket.receive_json()
+        assert (delta['event'], delta['seq']) == ('delta', 1)
+
+
+def test_unsuccessful_solve_leaves_the_inputs(client, session_timing):
+    with client.websocket_connect('/api/v1/session') as websocket:
+        websocket.receive_json()
+        # The chain's Option 1 balance has no root at the default inputs
+        websocket.send_json({'type': 'solve'})
+        delta = websocket.receive_json()
+        assert delta['solve']['success'] is False
+        assert delta['inputs'] == {} and delta['values'] == {}
@@ -0,0 +1,74 @@
+import math
+import pickle
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+import backend.main
+from backend.simulation_engine import SimulationEngine
+
+DEFAULTS = main.SimulationParameters().model_dump()
+
+
+def reference_aml_ml(v_v_percent, pls_ac, pls_cu):
+    """AML and ML as the former backend computed them."""
+    aml = 0.4108 * math.pow(v_v_percent, 1.1)
+    factor1 = -28.511 * math.pow(v_v_percent, -1.746) * aml + 11.711 * math.pow(v_v_percent, -0.646)
+    factor2 = math.pow(3.303 * v_v_percent - 3.0842 * aml, 2) / aml
+    return aml, pls_ac ** 2 / pls_cu - factor1 * factor2
+
+
+@pytest.fixture
+def backend_client():
+    with TestClient(backend.main.app) as client:
+        yield client
+
+
+def test_simulate_uses_the_shared_engine():
+    assert isinstance(main.legacy, SimulationEngine)
+    assert main.legacy.sim is main.sim_engine
+
+
+@pytest.mark.parametrize('v_v_percent', [1.0, 5.0, 8.66, 15.0, 30.0])
+@pytest.mark.parametrize('pls', [(1.6, 2.5), (8.78, 7.07)])
+def test_simulation_matches_the_former_backend(v_v_percent, pls):
+    pls_ac, pls_cu = pls
+    params = dict(DEFAULTS, v_v_percent=v_v_percent, PLS_Ac=pls_ac, PLS_Cu=pls_cu)
+    results = main.legacy.run_simulation(params)
+
+    aml, ml = reference_aml_ml(v_v_percent, pls_ac, pls_cu)
+    assert results['AML'] == pytest.approx(aml, rel=1e-12)
+    assert results['ML'] == pytest.approx(ml, rel=1e-12)
+    assert results['Raffinate Cu'] == pytest.approx(pls_cu * 0.08 * 0.05)
+    assert results['Extraction Recovery'] == pytest.approx(99.6)
+    assert results['Saturation Ratio'] == pytest.approx(DEFAULTS['SR'])
+
+
+def test_optimization_reports_an_unattainable_target():
+    results = main.legacy.run_optimization(dict(DEFAULTS, Mef1e=50, Mef2e=50))
+    assert results['Optimization Status'] == 'Failed: Unattainable Target'
+    assert results['v/v Percent'] == DEFAULTS['v_v_percent']
+    assert main.legacy.run_optimization(DEFAULTS)['v/v Percent'] == 1.0
+
+
+def test_backend_entry_point(backend_client, client):
+    assert backend_client.get('/').json() == {'message': 'Welcome to the SimSXCu Simulation Engine API'}
+
+    for option in (1, 2):
+        body = {'option': option, 'parameters': DEFAULTS}
+        response = backend_client.post('/api/v1/simulate', json=body)
+        assert response.status_code == 200
+        assert response.json() == client.post('/api/v1/simulate', json=body).json()
+    assert backend_client.post('/api/v1/simulate', json={'option': 3, 'parameters': DEFAULTS}).status_code == 422
+
+
+def test_static_files_do_not_depend_on_the_working_directory(client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert client.get('/static/script.js').status_code == 200
+    assert '<html' in client.get('/').text.lower()
+
+
+def test_engine_survives_pickling():
+    engine = pickle.loads(pickle.dumps(main.sim_engine))
+    assert engine.calculate_AML(8.66) == main.sim_engine.calculate_AML(8.66)
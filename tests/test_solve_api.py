@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import app.main as main
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = main.SolveResultCache()
+    monkeypatch.setattr(main, 'result_cache', cache)
+    return cache
+
+
+def test_successful_solve_is_cached_with_an_etag(client, cache, feasible_designer_params):
+    body = {'mode': 'designer', 'params': feasible_designer_params}
+    first = client.post('/api/v1/solve', json=body)
+    etag = first.headers['etag']
+
+    assert first.json()['success']
+    assert first.headers['cache-control'] == 'no-cache'
+    assert client.post('/api/v1/solve', json=body).json() == first.json()
+    assert cache.hits == 1
+    revalidated = client.post('/api/v1/solve', json=body, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+
+
+def test_failed_solve_is_not_cached_and_renders_nan_as_null(client, cache):
+    # Advance below spent electrolyte Cu: the balance is undefined, the objective NaN
+    body = {'mode': 'designer', 'params': {'AD_Cu': 20}}
+    response = client.post('/api/v1/solve', json=body)
+
+    assert response.status_code == 200
+    assert response.json()['success'] is False
+    assert response.json()['objective_value'] is None
+    assert cache.get(main.solve_key('designer', body['params'],
+                                    main.DesignerParams(AD_Cu=20).dict(), 'A')) is None
+
+
+def test_timings_responses_have_no_etag(client, cache, feasible_designer_params):
+    response = client.post('/api/v1/solve', params={'timings': 'true'},
+                           json={'mode': 'designer', 'params': feasible_designer_params})
+
+    assert 'etag' not in response.headers
+    assert response.headers['cache-control'] == 'no-store'
+    assert 'timings' in response.json()
+
+
+def test_invalid_requests(client):
+    assert client.post('/api/v1/solve', json={'mode': 'other', 'params': {}}).status_code == 400
+    assert client.post('/api/v1/solve', json={'mode': 'designer', 'params': {}, 'config': 'Z'}).status_code == 400
+
+
+def test_metallurgist_objective_value_is_the_sum_of_absolute_residuals(client, cache):
+    from app.flowsheet import Flowsheet
+
+    response = client.post('/api/v1/solve', json={'mode': 'metallurgist', 'params': {}, 'config': 'B'})
+    result = response.json()
+    flowsheet = Flowsheet.for_configuration(main.sim_engine, 'B')
+    x = [result['v_v_percent'], result['saturation_ratio'], result['mixer_eff1'], result['mixer_eff2']]
+    residuals, _ = flowsheet.option2_residuals(x, main.MetallurgistParams().dict())
+
+    assert result['success']
+    assert result['objective_value'] == pytest.approx(np.abs(residuals).sum(), rel=1e-9)
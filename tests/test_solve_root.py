@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.simulation_engine import SolverEngine
+
+
+def shifted(x, params):
+    return x - params['c']
+
+
+def test_linear_roots_on_known_brackets():
+    c = np.array([0.5, 3.0, 7.25, 9.999])
+    result = SolverEngine.solve_root(shifted, (0.0, 10.0), {'c': c}, xtol=1e-10)
+
+    assert result['converged'].all()
+    assert result['bracketed'].all()
+    np.testing.assert_allclose(result['x'], c, atol=1e-10)
+    np.testing.assert_allclose(result['residual'], result['x'] - c)
+
+
+def test_nonlinear_root_and_sign():
+    # Decreasing residual: the bracket orientation must not matter
+    c = np.array([2.0, 5.0, 30.0])
+    result = SolverEngine.solve_root(lambda x, p: p['c'] - x ** 2, (0.0, 10.0), {'c': c}, xtol=1e-12)
+
+    assert result['converged'].all()
+    np.testing.assert_allclose(result['x'], np.sqrt(c), atol=1e-11)
+
+
+def test_root_needs_fewer_iterations_than_bisection():
+    result = SolverEngine.solve_root(lambda x, p: np.exp(x) - p['c'], (-5.0, 5.0),
+                                     {'c': np.array([2.0])}, xtol=1e-12)
+    scan_width = 10.0 / 15
+    bisection = int(np.ceil(np.log2(scan_width / 2e-12)))
+
+    assert result['converged'][0]
+    assert abs(result['x'][0] - np.log(2.0)) <= 1e-12
+    assert result['iterations'][0] < bisection
+
+
+def test_exact_root_on_the_scan_grid():
+    # 0, 2/3, ..., 10: c = 2.0 lies on the grid and needs no refinement
+    result = SolverEngine.solve_root(shifted, (0.0, 10.0), {'c': np.array([2.0])})
+
+    assert result['converged'][0]
+    assert result['x'][0] == 2.0
+    assert result['residual'][0] == 0.0
+
+
+def test_no_root_in_bracket():
+    result = SolverEngine.solve_root(shifted, (0.0, 10.0), {'c': np.array([-1.0, 12.0, 4.0])})
+
+    np.testing.assert_array_equal(result['bracketed'], [False, False, True])
+    np.testing.assert_array_equal(result['converged'], [False, False, True])
+    # Unbracketed cases report the scan point with the smallest residual
+    np.testing.assert_allclose(result['x'][:2], [0.0, 10.0])
+    np.testing.assert_allclose(result['residual_min'][:2], [1.0, -12.0])
+    np.testing.assert_allclose(result['residual_max'][:2], [11.0, -2.0])
+
+
+def test_nearest_bracket_to_the_initial_guess():
+    # Roots at 1, 4 and 7; the guess picks one
+    def cubic(x, params):
+        return (x - 1) * (x - 4) * (x - 7)
+
+    guesses = np.array([0.5, 4.4, 8.0])
+    result = SolverEngine.solve_root(cubic, (0.0, 9.5), {'c': np.zeros(3)}, initial_guess=guesses,
+                                     scan_points=20, xtol=1e-10)
+
+    assert result['converged'].all()
+    np.testing.assert_allclose(result['x'], [1.0, 4.0, 7.0], atol=1e-9)
+
+
+def test_undefined_residual_stops_the_case():
+    # NaN to the right of 3: the scan never sees a sign change there
+    def undefined_above(x, params):
+        return np.where(x > params['c'], np.nan, x - 1.0)
+
+    result = SolverEngine.solve_root(undefined_above, (0.0, 10.0), {'c': np.array([3.0, 0.5])})
+
+    np.testing.assert_array_equal(result['bracketed'], [True, False])
+    np.testing.assert_allclose(result['x'][0], 1.0, atol=1e-8)
+    assert not result['converged'][1]
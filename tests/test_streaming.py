@@ -0,0 +1,161 @@
+import asyncio
+import json
+import math
+
+import pytest
+
+import app.main as main
+from app.streaming import coalesce, event_message, format_event, json_safe, run_ordered
+
+
+def test_json_safe_replaces_non_finite_floats():
+    value = {'a': [1.0, math.nan, (math.inf, 2)], 'b': {'c': -math.inf}, 'd': 'text', 'e': None}
+    assert json_safe(value) == {'a': [1.0, None, [None, 2]], 'b': {'c': None}, 'd': 'text', 'e': None}
+
+
+def test_format_event():
+    payload = {'done': 1, 'value': math.nan}
+    assert format_event('progress', payload, 'ndjson') == '{"event":"progress","done":1,"value":null}\n'
+    assert format_event('progress', payload, 'sse') == 'event: progress\ndata: {"done":1,"value":null}\n\n'
+    assert event_message('error', {'detail': 'x', 'value': math.inf}) == {'event': 'error', 'detail': 'x',
+                                                                         'value': None}
+
+
+def test_coalesce_collects_a_burst():
+    async def scenario():
+        queue = asyncio.Queue()
+        for item in range(3):
+            queue.put_nowait(item)
+
+        async def late():
+            await asyncio.sleep(0.2)
+            queue.put_nowait('late')
+
+        asyncio.ensure_future(late())
+        first = await coalesce(queue, debounce=0.05, max_delay=1.0)
+        second = await coalesce(queue, debounce=0.05, max_delay=1.0)
+        return first, second
+
+    assert asyncio.run(scenario()) == ([0, 1, 2], ['late'])
+
+
+def test_coalesce_stops_at_max_delay():
+    async def scenario():
+        queue = asyncio.Queue()
+
+        async def steady():
+            for item in range(100):
+                queue.put_nowait(item)
+                await asyncio.sleep(0.01)
+
+        feeder = asyncio.ensure_future(steady())
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        items = await coalesce(queue, debounce=0.05, max_delay=0.1)
+        elapsed = loop.time() - started
+        feeder.cancel()
+        return items, elapsed
+
+    items, elapsed = asyncio.run(scenario())
+    assert items == list(range(len(items))) and 3 <= len(items) < 100
+    assert elapsed < 0.5
+
+
+def test_run_ordered_yields_in_submission_order_within_the_window():
+    running, peak = 0, 0
+
+    def job(value, delay):
+        async def run():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(delay)
+            running -= 1
+            return value
+        return run
+
+    async def never_cancelled():
+        return False
+
+    async def scenario():
+        jobs = [job(i, delay) for i, delay in enumerate([0.05, 0.01, 0.03, 0.0, 0.02, 0.01])]
+        return [value async for value in run_ordered(jobs, 2, never_cancelled)]
+
+    assert asyncio.run(scenario()) == [0, 1, 2, 3, 4, 5]
+    assert peak == 2
+
+
+def test_run_ordered_stops_and_cancels_when_the_client_leaves():
+    started, cancelled = [], []
+
+    def job(value):
+        async def run():
+            started.append(value)
+            try:
+                await asyncio.sleep({0: 0.01, 1: 0.05}.get(value, 5.0))
+            except asyncio.CancelledError:
+                cancelled.append(value)
+                raise
+            return value
+        return run
+
+    async def scenario():
+        results = []
+        checks = 0
+
+        async def is_cancelled():
+            nonlocal checks
+            checks += 1
+            return checks > 1
+
+        async for value in run_ordered((job(i) for i in range(10)), 3, is_cancelled):
+            results.append(value)
+        await asyncio.sleep(0)
+        return results
+
+    # The first result goes out; the client is gone before the second
+    assert asyncio.run(scenario()) == [0]
+    assert started == [0, 1, 2, 3]
+    assert sorted(cancelled) == [2, 3]
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_batch_stream(client, monkeypatch):
+    monkeypatch.setattr(main, 'BATCH_STREAM_CHUNK_SIZE', 2)
+    cases = [{'mode': 'designer', 'params': {'PLS_Cu': 2.0 + 0.1 * i}} for i in range(4)]
+    cases.append({'mode': 'planner', 'params': {}})
+    events = ndjson(client.post('/api/v1/solve/batch/stream', json={'cases': cases}))
+
+    assert events[0] == {'event': 'start', 'total': 5}
+    results = [event for event in events if event['event'] == 'result']
+    assert [result['index'] for result in results] == [0, 1, 2, 3, 4]
+    assert all(set(result) == {'event', 'index', 'result', 'error'} for result in results)
+    assert results[4]['error'] == main.INVALID_MODE_MESSAGE
+    assert [event['done'] for event in events if event['event'] == 'progress'] == [2, 4, 5]
+    assert events[-1] == {'event': 'end', 'done': 5, 'total': 5}
+
+    batch = client.post('/api/v1/solve/batch', json={'cases': cases}).json()['results']
+    assert [result['result'] for result in results] == [result['result'] for result in batch]
+
+
+def test_batch_stream_as_sse(client):
+    response = client.post('/api/v1/solve/batch/stream?format=sse',
+                           json={'cases': [{'mode': 'designer', 'params': {}}]})
+    frames = response.text.strip().split('\n\n')
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert [frame.split('\n')[0] for frame in frames] == ['event: start', 'event: result', 'event: progress',
+                                                          'event: end']
+
+
+def test_failed_sweep_chunk_ends_the_stream_with_an_error(client, monkeypatch):
+    def broken_chunk(*args):
+        raise RuntimeError('chunk failed')
+
+    monkeypatch.setattr(main, 'run_sweep_chunk', broken_chunk)
+    events = ndjson(client.post('/api/v1/sweep/stream', json={'axes': [{'name': 'PLS_Cu', 'values': [2.0, 3.0]}]}))
+
+    assert [event['event'] for event in events] == ['start', 'error']
+    assert events[1] == {'event': 'error', 'status': 500, 'detail': 'An unexpected error occurred: chunk failed'}
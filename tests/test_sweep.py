@@ -0,0 +1,113 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+import app.main as main
+from app.sweep import chunk_to_columns, iter_sweep_chunks, run_sweep, sweep_dtype, sweep_size, to_npy_bytes
+
+AXES = [
+    {'name': 'PLS_Cu', 'start': 1.5, 'stop': 3.5, 'num': 5},
+    {'name': 'v_v_percent', 'values': [8.0, 10.0, 12.0]},
+]
+
+
+@pytest.fixture
+def base_params():
+    return main.DesignerParams().dict()
+
+
+def grid_axes():
+    return [('PLS_Cu', np.linspace(1.5, 3.5, 5).tolist()), ('v_v_percent', [8.0, 10.0, 12.0])]
+
+
+def test_sweep_rows_match_single_simulations(config, base_params):
+    result = run_sweep(config, base_params, 10.0, grid_axes(), chunk_size=4)
+
+    assert result.dtype == sweep_dtype(['PLS_Cu', 'v_v_percent'])
+    assert len(result) == sweep_size(grid_axes()) == 15
+    # Rows are in C order: the last axis varies fastest
+    assert result['v_v_percent'][:3].tolist() == [8.0, 10.0, 12.0]
+    for row in result[[0, 7, 14]]:
+        expected = config.simulate(row['v_v_percent'], dict(base_params, PLS_Cu=row['PLS_Cu']))
+        assert row['loaded_organic'] == pytest.approx(expected['loaded_organic'], rel=1e-12, nan_ok=True)
+        assert row['O_A_str'] == pytest.approx(expected['O_A_str'], rel=1e-12, nan_ok=True)
+
+
+def test_chunking_does_not_change_the_result(config, base_params):
+    whole = run_sweep(config, base_params, 10.0, grid_axes(), chunk_size=64)
+    chunks = list(iter_sweep_chunks(config, base_params, 10.0, grid_axes(), chunk_size=4))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 4, 3]
+    assert np.concatenate(chunks).tobytes() == whole.tobytes()
+
+
+def test_chunk_to_columns_renders_nan_as_none():
+    chunk = np.zeros(2, dtype=sweep_dtype(['PLS_Cu']))
+    chunk['O_A_str'] = [1.0, np.nan]
+    columns = chunk_to_columns(chunk)
+
+    assert list(columns) == list(chunk.dtype.names)
+    assert columns['O_A_str'] == [1.0, None]
+
+
+def test_npy_endpoint_returns_the_grid(client, config, base_params):
+    response = client.post('/api/v1/sweep', json={'axes': AXES})
+
+    assert response.status_code == 200
+    assert response.headers['x-sweep-shape'] == '5,3'
+    assert int(response.headers['content-length']) == len(response.content)
+    expected = run_sweep(main.config, base_params, 10.0, grid_axes())
+    assert response.content == to_npy_bytes(expected)
+    result = np.load(io.BytesIO(response.content))
+    assert result.shape == (15,)
+    np.testing.assert_array_equal(result.reshape(5, 3)['PLS_Cu'][:, 0], np.linspace(1.5, 3.5, 5))
+
+
+def test_stream_ndjson(client, base_params):
+    response = client.post('/api/v1/sweep/stream', json={'axes': AXES, 'chunk_size': 4})
+    events = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    assert events[0] == {'event': 'start', 'total': 15, 'shape': [5, 3]}
+    chunks = [event for event in events if event['event'] == 'chunk']
+    assert [chunk['start'] for chunk in chunks] == [0, 4, 8, 12]
+    assert [event['done'] for event in events if event['event'] == 'progress'] == [4, 8, 12, 15]
+    assert events[-1] == {'event': 'end', 'done': 15, 'total': 15}
+
+    expected = chunk_to_columns(run_sweep(main.config, base_params, 10.0, grid_axes()))
+    for name, values in expected.items():
+        streamed = [value for chunk in chunks for value in chunk['columns'][name]]
+        assert streamed == values
+
+
+def test_stream_sse(client):
+    response = client.post('/api/v1/sweep/stream?format=sse', json={'axes': AXES, 'chunk_size': 8})
+    frames = response.text.strip().split('\n\n')
+
+    assert response.headers['content-type'].startswith('text/event-stream')
+    names = [frame.split('\n')[0] for frame in frames]
+    assert names == ['event: start', 'event: chunk', 'event: progress', 'event: chunk', 'event: progress',
+                     'event: end']
+    assert json.loads(frames[-1].split('\n')[1][len('data: '):]) == {'done': 15, 'total': 15}
+
+
+@pytest.mark.parametrize('endpoint', ['/api/v1/sweep', '/api/v1/sweep/stream'])
+@pytest.mark.parametrize('axes, detail', [
+    ([{'name': 'PLS_Cu', 'values': [1.0]}, {'name': 'PLS_Cu', 'values': [2.0]}], 'more than once'),
+    ([{'name': 'nope', 'values': [1.0]}], "Unknown sweep axis 'nope'"),
+    ([{'name': 'PLS_Cu', 'start': 1.0}], 'needs either values or start/stop/num'),
+    (AXES, 'Sweep has 15 points; the limit is 10.'),
+])
+def test_invalid_sweeps_are_rejected(client, monkeypatch, endpoint, axes, detail):
+    monkeypatch.setattr(main, 'MAX_SWEEP_POINTS', 10)
+    response = client.post(endpoint, json={'axes': axes})
+
+    assert response.status_code == 400
+    assert detail in response.json()['detail']
+
+
+def test_invalid_stream_format(client):
+    response = client.post('/api/v1/sweep/stream?format=xml', json={'axes': AXES})
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+import pytest
+
+import app.main as main
+from app.simulation_engine import SolverEngine, SolverTrace
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = main.SolveResultCache()
+    monkeypatch.setattr(main, 'result_cache', cache)
+    return cache
+
+
+def test_trace_keeps_the_last_points():
+    trace = SolverTrace('SLSQP', max_points=3)
+    for i in range(5):
+        trace.record([i, i + 1], 10.0 - i)
+
+    report = trace.report(nfev=7, njev=5, status=0, message='done')
+    assert report['nit'] == 5
+    assert report['truncated'] == 2
+    assert [point['iteration'] for point in report['history']] == [3, 4, 5]
+    assert report['history'][-1] == {'iteration': 5, 'x': [4.0, 5.0], 'objective': 6.0}
+    assert (report['method'], report['nfev'], report['njev'], report['message']) == ('SLSQP', 7, 5, 'done')
+
+
+def test_designer_solve_trace(client, cache, feasible_designer_params):
+    body = {'mode': 'designer', 'params': feasible_designer_params}
+    traced = client.post('/api/v1/solve', params={'trace': 'true'}, json=body).json()
+    plain = client.post('/api/v1/solve', json=body).json()
+
+    assert 'trace' not in plain
+    trace = traced.pop('trace')
+    assert traced == plain
+    assert trace['method'] == 'ITP' and trace['status'] == 0
+    assert trace['nit'] == traced['iterations'] == len(trace['history'])
+    assert trace['history'][-1]['x'] == [pytest.approx(traced['v_v_percent'])]
+    assert cache.misses == 2
+
+
+def test_metallurgist_solve_trace_is_returned_not_printed(config, option2_params, capsys):
+    solver = SolverEngine()
+    guess, bounds = [15.0, 90.0, 92.0, 95.0], main.SOLVE_BOUNDS['metallurgist']
+    result = solver.solve_option2(config.option2_least_squares, guess, bounds, option2_params, jac=True,
+                                  residuals=config.option2_residuals, trace=True, warm_start=False)
+
+    assert capsys.readouterr().out == ''
+    trace = result['trace']
+    assert trace['method'] == 'SLSQP'
+    # One point per callback, i.e. per major SLSQP iteration
+    assert 0 < trace['nit'] == len(trace['history']) + trace['truncated']
+    assert trace['nfev'] >= trace['nit']
+    assert all(len(point['x']) == 4 for point in trace['history'])
+    assert 'trace' not in solver.solve_option2(config.option2_least_squares, guess, bounds, option2_params,
+                                               jac=True, warm_start=False)
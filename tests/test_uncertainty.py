@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+import app.main as main
+from app import uncertainty
+from app.uncertainty import UNCERTAINTY_OUTPUTS, check_distribution, draw, propagate
+
+
+@pytest.fixture
+def nominal(option2_params):
+    # A metallurgist operating point: every output is defined around it
+    return dict(option2_params, v_v_percent=15.0, SR=90.0, Mef1e=92.0, Mef2e=95.0)
+
+
+NOISE = {'PLS_Cu': {'distribution': 'normal', 'std': 0.2},
+         'Mef1e': {'distribution': 'uniform', 'low': 88, 'high': 94}}
+
+
+def test_same_seed_same_result(config, nominal):
+    first = propagate(config, nominal, NOISE, 1000, seed=7)
+    assert first == propagate(config, nominal, {name: NOISE[name] for name in reversed(NOISE)}, 1000, seed=7)
+    assert first['seed'] == 7
+    assert first['outputs'] != propagate(config, nominal, NOISE, 1000, seed=8)['outputs']
+
+    unseeded = propagate(config, nominal, NOISE, 1000)
+    assert propagate(config, nominal, NOISE, 1000, seed=unseeded['seed']) == unseeded
+
+
+def test_summary_matches_the_samples(config, nominal, monkeypatch):
+    # Several chunks, the last one partial
+    monkeypatch.setattr(uncertainty, 'CHUNK_SIZE', 300)
+    result = propagate(config, nominal, NOISE, 1000, seed=3, percentiles=[5, 50, 95], plant_loading=True)
+
+    seeds = np.random.SeedSequence(3).spawn(4)
+    chunks = [uncertainty.evaluate_uncertainty_chunk(config, nominal, NOISE, seed, size, plant_loading=True)
+              for seed, size in zip(seeds, (300, 300, 300, 100))]
+    for output in UNCERTAINTY_OUTPUTS:
+        values = np.concatenate([chunk[output] for chunk in chunks])
+        summary = result['outputs'][output]
+        assert summary['finite'] == np.isfinite(values).sum() == 1000
+        assert summary['mean'] == pytest.approx(values.mean())
+        assert list(summary['percentiles']) == ['5', '50', '95']
+        assert list(summary['percentiles'].values()) == pytest.approx(np.percentile(values, [5, 50, 95]).tolist())
+        assert summary['percentiles']['5'] <= summary['nominal'] <= summary['percentiles']['95']
+
+
+def test_without_spread_every_sample_is_the_nominal_point(config, nominal):
+    result = propagate(config, nominal, {'PLS_Cu': {'std': 0.0}}, 100, seed=0, plant_loading=True)
+    for summary in result['outputs'].values():
+        assert summary['std'] == pytest.approx(0, abs=1e-12)
+        assert list(summary['percentiles'].values()) == pytest.approx([summary['nominal']] * 5, rel=1e-12)
+
+
+def test_draw():
+    rng = np.random.default_rng(0)
+    clipped = draw({'distribution': 'normal', 'std': 5, 'low': 0, 'high': 1}, 0.5, 1000, rng)
+    assert clipped.min() == 0 and clipped.max() == 1
+    uniform = draw({'distribution': 'uniform', 'low': 2, 'high': 3}, 0, 1000, rng)
+    assert 2 <= uniform.min() and uniform.max() < 3
+    triangular = draw({'distribution': 'triangular', 'low': 2, 'high': 3}, 2.9, 10000, rng)
+    assert triangular.mean() == pytest.approx((2 + 2.9 + 3) / 3, abs=0.01)
+
+
+@pytest.mark.parametrize('name, spec, message', [
+    ('initial_guess_vv', {'std': 1}, 'Unknown uncertain input'),
+    ('PLS_Cu', {'distribution': 'lognormal', 'std': 1}, 'Unknown distribution'),
+    ('PLS_Cu', {'distribution': 'normal'}, 'non-negative std'),
+    ('PLS_Cu', {'distribution': 'uniform', 'low': 1}, 'needs low and high'),
+    ('PLS_Cu', {'distribution': 'uniform', 'low': 3, 'high': 1}, 'low > high'),
+    ('PLS_Cu', {'distribution': 'triangular', 'low': 1, 'high': 2}, 'low <= mode <= high'),
+])
+def test_invalid_distributions(nominal, name, spec, message):
+    nominal['initial_guess_vv'] = 15.0
+    with pytest.raises(ValueError, match=message):
+        check_distribution(name, spec, nominal)
+
+
+def test_uncertainty_endpoint(client, feasible_designer_params):
+    body = {'mode': 'designer', 'params': feasible_designer_params, 'samples': 2000, 'seed': 11,
+            'distributions': {'PLS_Cu': {'std': 0.1}, 'Mef2e': {'distribution': 'triangular', 'low': 90, 'high': 97}}}
+    response = client.post('/api/v1/uncertainty', json=body)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result['solve']['success'] and result['seed'] == 11
+    assert set(result['outputs']) == set(UNCERTAINTY_OUTPUTS)
+    assert client.post('/api/v1/uncertainty', json=body).json() == result
+
+    given = client.post('/api/v1/uncertainty', json=dict(body, operating_point=result['operating_point'])).json()
+    assert 'solve' not in given and given['outputs'] == result['outputs']
+
+
+def test_invalid_uncertainty_requests(client, monkeypatch):
+    body = {'mode': 'designer', 'params': {}, 'operating_point': {'v_v_percent': 12}, 'samples': 100,
+            'distributions': {'PLS_Cu': {'std': 0.1}}}
+    monkeypatch.setattr(main, 'MAX_UNCERTAINTY_SAMPLES', 1000)
+
+    for change in ({'mode': 'operator'}, {'samples': 1001}, {'percentiles': [50, 101]},
+                   {'distributions': {'ML_plant': {'std': 0.1}}},
+                   {'mode': 'metallurgist', 'operating_point': {'v_v_percent': 12}}):
+        assert client.post('/api/v1/uncertainty', json=dict(body, **change)).status_code == 400
+    assert client.post('/api/v1/uncertainty', json=dict(body, distributions={})).status_code == 422
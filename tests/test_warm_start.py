@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from app.flowsheet import Flowsheet
+from app.simulation_engine import SimSXCu, SolutionIndex, SolverEngine
+
+GUESS = [10.0, 90.0, 92.0, 95.0]
+BOUNDS = [(5.0, 30.0)] + [(70.0, 100.0)] * 3
+
+
+@pytest.fixture(scope='module')
+def flowsheet():
+    return Flowsheet.for_configuration(SimSXCu(), 'B')
+
+
+def test_nearest_uses_normalized_features():
+    index = SolutionIndex()
+    # The second feature spreads 1000x wider, so it must not dominate the distance
+    for i, (a, b) in enumerate([(0.0, 0.0), (1.0, 0.0), (0.0, 1000.0), (1.0, 1000.0)]):
+        index.add('p', np.array([a, b]), np.array([float(i)]))
+    index.add('other', np.array([0.0, 0.0]), np.array([99.0]))
+
+    assert [s[0] for s in index.nearest('p', np.array([0.9, 100.0]), k=2)] == [1.0, 0.0]
+    assert [s[0] for s in index.nearest('other', np.array([5.0, 5.0]), k=3)] == [99.0]
+    assert index.nearest('missing', np.array([0.0, 0.0])) == []
+    assert len(index) == 5
+
+
+def test_oldest_solutions_are_dropped():
+    index = SolutionIndex(max_size=2)
+    for i in range(3):
+        index.add('p', np.array([float(i)]), np.array([float(i)]))
+    assert [s[0] for s in index.nearest('p', np.array([0.0]), k=3)] == [1.0, 2.0]
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'index.npz')
+    index = SolutionIndex(path=path, save_every=2)
+    index.add('p', np.array([1.0, 2.0]), np.array([3.0]))
+    index.add('q', np.array([4.0]), np.array([5.0, 6.0]))
+
+    # Saved automatically after save_every additions
+    loaded = SolutionIndex(path=path)
+    assert len(loaded) == 2
+    np.testing.assert_array_equal(loaded.nearest('q', np.array([4.0]))[0], [5.0, 6.0])
+
+
+def test_index_seeds_a_nearby_solve(flowsheet, option2_params):
+    solver = SolverEngine(SolutionIndex())
+    first = solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS, option2_params, jac=True)
+    second = solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS,
+                                  dict(option2_params, PLS_Cu=2.51), jac=True)
+
+    assert first['success'] and second['success']
+    assert first['start'] == {'source': 'initial_guess', 'x': GUESS}
+    assert second['start']['source'] == 'index'
+    assert second['start']['x'] == pytest.approx([first['v_v_percent'], first['saturation_ratio'],
+                                                  first['mixer_eff1'], first['mixer_eff2']])
+    assert second['iterations'] < first['iterations']
+
+
+def test_explicit_start_is_not_warm_started(flowsheet, option2_params):
+    solver = SolverEngine(SolutionIndex())
+    solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS, option2_params, jac=True)
+    result = solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS, option2_params,
+                                  jac=True, warm_start=False)
+    assert result['start'] == {'source': 'initial_guess', 'x': GUESS}
+
+
+def test_continuation_only_inside_the_block(flowsheet, option2_params):
+    solver = SolverEngine()
+    with solver.continuation():
+        solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS, option2_params, jac=True)
+        inside = solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS,
+                                      dict(option2_params, PLS_Cu=2.51), jac=True)
+    outside = solver.solve_option2(flowsheet.option2_least_squares, GUESS, BOUNDS,
+                                   dict(option2_params, PLS_Cu=2.52), jac=True)
+
+    assert inside['start']['source'] == 'continuation'
+    assert outside['start']['source'] == 'initial_guess'
+
+
+def test_problem_key_ignores_initial_guesses(flowsheet, option2_params):
+    key, features = SolverEngine._problem_key(flowsheet.option2_least_squares,
+                                              dict(option2_params, initial_guess_vv=12.0))
+    assert key == SolverEngine._problem_key(flowsheet.option2_least_squares, option2_params)[0]
+    assert len(features) == len(option2_params)
+    assert flowsheet.name in key
+
+
+def test_api_warm_starts_only_without_an_explicit_guess(client, monkeypatch):
+    import app.main as main
+
+    monkeypatch.setattr(main, 'solver', SolverEngine(SolutionIndex()))
+    monkeypatch.setattr(main, 'result_cache', main.SolveResultCache(maxsize=0))
+
+    def solve(params):
+        return client.post('/api/v1/solve', json={'mode': 'metallurgist', 'params': params, 'config': 'C'}).json()
+
+    solve({})
+    assert solve({'PLS_Cu': 2.49})['start']['source'] == 'index'
+    assert solve({'PLS_Cu': 2.48, 'initial_guess_vv': 10.0})['start']['source'] == 'initial_guess'
@@ -0,0 +1,41 @@
+import numpy as np
+
+RECORDS = {
+    'PLS_Cu': np.array([2.5, 2.4, 2.7, 2.55, 2.3]),
+    'PLS_Ac': np.array([1.6, 1.7, 1.5, 1.65, 1.8]),
+    'ML_plant': np.array([4.386, 4.3, 4.45, 4.4, 4.25]),
+    'raffinate_Cu_target': np.array([0.28, 0.26, 0.31, 0.29, 0.25]),
+    'stripped_organic_Cu_target': np.array([1.8, 1.75, 1.85, 1.8, 1.7]),
+}
+X = [10.0, 90.0, 92.0, 95.0]
+
+
+def record(option2_params, i):
+    return dict(option2_params, **{name: values[i] for name, values in RECORDS.items()})
+
+
+def test_window_matches_per_record_residuals(config, option2_params):
+    params = dict(option2_params, **RECORDS)
+    residuals, jacobian = config.option2_window_residuals(X, params)
+
+    n = len(RECORDS['PLS_Cu'])
+    assert residuals.shape == (3 * n,)
+    assert jacobian.shape == (3 * n, 4)
+    for i in range(n):
+        expected_residuals, expected_jacobian = config.option2_residuals(X, record(option2_params, i))
+        np.testing.assert_allclose(residuals[3 * i:3 * i + 3], expected_residuals, rtol=1e-12)
+        np.testing.assert_allclose(jacobian[3 * i:3 * i + 3], expected_jacobian, rtol=1e-12, atol=1e-15)
+
+
+def test_window_of_one_record(config, option2_params):
+    residuals, jacobian = config.option2_window_residuals(X, option2_params)
+    expected_residuals, expected_jacobian = config.option2_residuals(X, option2_params)
+
+    np.testing.assert_allclose(residuals, expected_residuals, rtol=1e-12)
+    np.testing.assert_allclose(jacobian, expected_jacobian, rtol=1e-12, atol=1e-15)
+
+
+def test_window_residuals_fixed_values(config, option2_params):
+    residuals, _ = config.option2_window_residuals(X, dict(option2_params, **RECORDS))
+
+    np.testing.assert_allclose(residuals[:3], [3.86810102, -0.0509157169, 2834.60745], rtol=1e-8)